@@ -0,0 +1,54 @@
+import time
+
+import numpy as np
+
+from compas_vibro.vibro import calculate_wavenumbers_np
+from compas_vibro.vibro import calculate_distance_matrix_np
+from compas_vibro.vibro import calculate_pressure_batch_np
+from compas_vibro.vibro import calculate_pressure_blocked_np
+from compas_vibro.vibro import calculate_pressure_numba
+from compas_vibro.vibro import calculate_rayleigh_rad_power_batch_np
+
+
+# Times the numba radiation kernel against the NumPy engines, for a growing
+# number of radiating faces on a jittered flat plate. The numba kernel runs
+# on all threads available to numba (NUMBA_NUM_THREADS).
+
+rho = 1.225
+c = 340.
+freqs = np.arange(20., 520., 20.)
+ks = calculate_wavenumbers_np(freqs, c)
+
+rng = np.random.RandomState(0)
+calculate_pressure_numba(ks[:2], rho, c, np.ones(4), rng.rand(4, 3), np.ones((2, 4)) + 0j)
+
+print('{0:>8} {1:>10} {2:>10} {3:>10} {4:>10}'.format('faces', 'dense', 'blocked', 'numba', 'rel. err'))
+for n in [20, 40, 60, 80]:
+    m = n * n
+    x, y = np.meshgrid(np.arange(n) * .05, np.arange(n) * .05)
+    xyz = np.column_stack((x.ravel(), y.ravel(), np.zeros(m)))
+    xyz[:, :2] += rng.rand(m, 2) * 1e-3
+    s = np.full(m, .0025)
+    V = rng.randn(ks.shape[0], m) + 1j * rng.randn(ks.shape[0], m)
+
+    t0 = time.time()
+    if m <= 4000:
+        D = calculate_distance_matrix_np(xyz)
+        P0 = calculate_pressure_batch_np(ks, rho, c, s, D, V)
+        dense = '{0:10.2f}'.format(time.time() - t0)
+    else:
+        P0 = None
+        dense = '{0:>10}'.format('-')
+
+    t0 = time.time()
+    P1 = calculate_pressure_blocked_np(ks, rho, c, s, xyz, V)
+    blocked = time.time() - t0
+
+    t0 = time.time()
+    P2 = calculate_pressure_numba(ks, rho, c, s, xyz, V)
+    numba = time.time() - t0
+
+    W1 = calculate_rayleigh_rad_power_batch_np(s, P1, V)[1]
+    W2 = calculate_rayleigh_rad_power_batch_np(s, P2, V)[1]
+    err = np.max(np.abs(W2 - W1) / np.abs(W1))
+    print('{0:8d} {1} {2:10.2f} {3:10.2f} {4:10.1e}'.format(m, dense, blocked, numba, err))
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+"""Stand-in for MAPDL.exe, to run the ANSYS workflows without ANSYS.
+
+It takes the same arguments as ``ansys_launch_process`` passes to ANSYS,
+reads the nodes, point loads, frequencies and damping of the command file
+and writes the harmonic displacement files the readers expect. Every node
+responds like a single degree of freedom oscillator to each load, scaled by
+``exp(-d)`` with ``d`` the distance to the loaded node.
+
+    ansys_launch_process(structure, exe='scripts/fake_ansys.py')
+
+Environment variables:
+    FAKE_ANSYS_FREQUENCY  natural frequency in Hz, 50 by default.
+    FAKE_ANSYS_DELAY      seconds to sleep, to emulate the solver run time.
+"""
+from __future__ import print_function
+
+import os
+import re
+import sys
+import time
+import argparse
+
+import numpy as np
+
+
+AXES = {'FX': 0, 'FY': 1, 'FZ': 2}
+
+
+def parse_command_file(filename):
+    nodes = {}
+    loads = {}
+    steps = []
+    freqs = {}
+    selected = {}
+    damping = 0.
+    for line in open(filename):
+        line = line.split('!')[0].strip()
+        if line.startswith('N,'):
+            a = line.split(',')
+            nodes[int(a[1])] = [float(x) for x in a[2:5]]
+        elif line.startswith('F,'):
+            a = line.split(',')
+            if a[2] in AXES:
+                loads.setdefault(int(a[1]), [0., 0., 0.])[AXES[a[2]]] += float(a[3])
+        elif line.startswith('FDELE'):
+            loads = {}
+        elif line.startswith('LSWRITE'):
+            steps.append(dict(loads))
+        elif line.startswith('DMPRAT'):
+            damping = float(line.split(',')[1])
+        m = re.match(r'(freq_list\d+|nodesArr)\((\d+)\)\s*=\s*(.*)', line)
+        if m:
+            values = [float(x) for x in m.group(3).split(',') if x.strip()]
+            target = freqs if m.group(1) != 'nodesArr' else selected
+            for i, x in enumerate(values):
+                target[int(m.group(2)) + i] = x
+    freq_list = [freqs[i] for i in sorted(freqs)]
+    selected = [int(selected[i]) for i in sorted(selected)] or sorted(nodes)
+    return nodes, steps or [loads], freq_list, damping, selected
+
+
+def harmonic_response(nodes, loads, freq_list, damping, selected, f0):
+    # complex displacements (n_freq x n_selected x 3)
+    xyz = np.array([nodes[n] for n in selected])
+    w0 = 2 * np.pi * f0
+    w = 2 * np.pi * np.asarray(freq_list)
+    h = 1. / (w0 ** 2 - w ** 2 + 2j * damping * w0 * w)
+    U = np.zeros((len(freq_list), len(selected), 3), dtype=complex)
+    for n, force in loads.items():
+        g = np.exp(-np.linalg.norm(xyz - nodes[n], axis=1))
+        U += h[:, None, None] * g[None, :, None] * np.array(force)[None, None, :]
+    return U
+
+
+def write_row(fh, first, values):
+    fh.write('{:8.0f}'.format(first) + ''.join(',{:12.5E}'.format(x) for x in values) + '\n')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-dir')
+    parser.add_argument('-j')
+    parser.add_argument('-i')
+    parser.add_argument('-o')
+    args, _ = parser.parse_known_args(argv)
+
+    delay = float(os.environ.get('FAKE_ANSYS_DELAY', 0))
+    if delay:
+        time.sleep(delay)
+    f0 = float(os.environ.get('FAKE_ANSYS_FREQUENCY', 50.))
+
+    text = open(args.i).read()
+    nodes, steps, freq_list, damping, selected = parse_command_file(args.i)
+    if not os.path.isdir(args.dir):
+        os.makedirs(args.dir)
+
+    if 'case_%lstep%' in text:
+        for i, loads in enumerate(steps):
+            U = harmonic_response(nodes, loads, freq_list, damping, selected, f0)
+            with open(os.path.join(args.dir, 'case_{}.txt'.format(i + 1)), 'w') as fh:
+                for fi in range(len(freq_list)):
+                    for j, n in enumerate(selected):
+                        write_row(fh, n, np.concatenate((U[fi, j].real, U[fi, j].imag)))
+    else:
+        U = harmonic_response(nodes, steps[-1], freq_list, damping, selected, f0)
+        for j, n in enumerate(selected):
+            for part, values in (('real', U[:, j].real), ('imag', U[:, j].imag)):
+                with open(os.path.join(args.dir, 'node_{}_{}.txt'.format(part, n)), 'w') as fh:
+                    for fi, f in enumerate(freq_list):
+                        write_row(fh, f, values[fi])
+
+    with open(args.o, 'w') as fh:
+        fh.write('fake_ansys: {} nodes, {} frequencies, {} load steps\n'.format(
+            len(nodes), len(freq_list), len(steps)))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
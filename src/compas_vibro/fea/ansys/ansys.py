@@ -12,6 +12,7 @@ from compas_vibro.structure.step import StaticStep
 from compas_vibro.structure.step import ModalStep
 from compas_vibro.structure.step import HarmonicStep
 from compas_vibro.structure.step import HarmonicFieldStep
+from compas_vibro.structure.load import PointLoad
 
 from compas_vibro.fea.ansys.write import write_command_file_static
 from compas_vibro.fea.ansys.write import write_command_file_modal
@@ -27,6 +28,7 @@ from compas_vibro.fea.ansys.read import read_modal_displacements
 from compas_vibro.fea.ansys.read import read_harmonic_displacements
 from compas_vibro.fea.ansys.read import read_harmonic_displacements_field
 from compas_vibro.fea.ansys.read import read_modal_coordinates
+from compas_vibro.fea.ansys.read import read_harmonic_mobility
 from compas_vibro.fea.ansys.read import read_static_displacements
 from compas_vibro.fea.ansys.read import read_static_stresses
 from compas_vibro.fea.ansys.read import read_principal_stresses
@@ -43,6 +45,7 @@ __all__ = ['ansys_static',
            'ansys_modal',
            'ansys_modal_prestressed',
            'ansys_harmonic',
+           'ansys_harmonic_mobility',
            'ansys_harmonic_super',
            'ansys_harmonic_field']
 
@@ -102,7 +105,7 @@ def ansys_modal_prestressed(structure, fields, num_modes, license='default'):
     return structure
 
 
-def ansys_harmonic(structure, freq_list, fields='all', damping=0.02, selected_nodes=None):
+def ansys_harmonic(structure, freq_list, fields='all', damping=0.02, selected_nodes=None, exe=None):
 
     # # add harmonic step --------------------------------------------------------
     loads = [structure.loads[lk].name for lk in structure.loads]
@@ -116,11 +119,53 @@ def ansys_harmonic(structure, freq_list, fields='all', damping=0.02, selected_no
 
     # analyse and extraxt results ----------------------------------------------
     write_command_file_harmonic(structure, fields, selected_nodes)
-    ansys_launch_process(structure, cpus=4, license=license, delete=True)
+    ansys_launch_process(structure, cpus=4, license=license, delete=True, exe=exe)
     extract_data(structure, fields, 'harmonic', selected_nodes=selected_nodes)
     return structure
 
 
+def ansys_harmonic_mobility(structure, freq_list, inc_nodes, rad_nodes, fx, fy, fz, damping=0.02,
+                            license='default', exe=None):
+    """Mobility tensor (n_freq x n_inc x n_rad) from one harmonic job, with a
+    point load at each incident node as its own load step.
+
+    The temporary point loads are removed from the structure afterwards and
+    its harmonic step is restored, so later analyses do not see them.
+    """
+    previous_step = structure.step['harmonic']
+    previous_order = getattr(structure, 'steps_order', None)
+    names = []
+    for i, nk in enumerate(inc_nodes):
+        load = PointLoad(name='mobility_load_{}'.format(i), nodes=[nk], x=fx, y=fy, z=fz, xx=0, yy=0, zz=0)
+        structure.add(load)
+        names.append(load.name)
+
+    # # add harmonic step --------------------------------------------------------
+    step = HarmonicStep(name=structure.name + '_harmonic',
+                        displacements=list(structure.displacements.keys()),
+                        loads=names,
+                        freq_list=freq_list,
+                        damping=damping)
+    structure.add(step)
+    structure.steps_order = [structure.name + '_harmonic']
+
+    # analyse and extraxt results ----------------------------------------------
+    try:
+        write_command_file_harmonic(structure, ['u'], rad_nodes, load_cases=[[name] for name in names])
+        ansys_launch_process(structure, cpus=4, license=license, delete=True, exe=exe)
+        out_path = os.path.join(structure.path, structure.name + '_output')
+        H = read_harmonic_mobility(out_path, freq_list, len(names), [fx, fy, fz])
+    finally:
+        for name in names:
+            del structure.loads[name]
+        structure.step['harmonic'] = previous_step
+        if previous_order is None:
+            del structure.steps_order
+        else:
+            structure.steps_order = previous_order
+    return H
+
+
 def ansys_harmonic_super(structure, num_modes, freq_list, fields='all', damping=0.02):
 
     # add modal step -----------------------------------------------------------
@@ -259,7 +304,7 @@ def extract_data(structure, fields, results_type, selected_nodes=None):
     return structure
 
 
-def ansys_launch_process(structure, cpus=2, license='default', delete=True):
+def ansys_launch_process(structure, cpus=2, license='default', delete=True, exe=None):
     """ Launches an analysis using Ansys.
 
     Parameters:
@@ -268,6 +313,7 @@ def ansys_launch_process(structure, cpus=2, license='default', delete=True):
         cpus (int): Number of CPU cores to use.
         license (str): Type of Ansys license.
         delete (Bool): Path to the Ansys input file.
+        exe (str): Ansys executable, to bypass the default MAPDL.exe.
 
     Returns:
         None
@@ -280,7 +326,7 @@ def ansys_launch_process(structure, cpus=2, license='default', delete=True):
     elif delete:
         delete_result_files(path, name)
 
-    ansys_path = 'MAPDL.exe'
+    ansys_path = exe or 'MAPDL.exe'
     inp_path = os.path.join(path, name + '.txt')
     work_dir = os.path.join(path, name + '_output')
 
@@ -299,12 +345,10 @@ def ansys_launch_process(structure, cpus=2, license='default', delete=True):
     else:
         lic_str = 'ansys'
 
-    launch_string = '\"' + ansys_path + '\" -g -p ' + lic_str + ' -np ' + str(cpus)
-    launch_string += ' -dir \"' + work_dir
-    launch_string += '\" -j \"' + name + '\" -s read -l en-us -b -i \"'
-    launch_string += inp_path + ' \" -o \"' + out_path + '\"'
-    # print(launch_string)
-    subprocess.call(launch_string)
+    launch_args = [ansys_path, '-g', '-p', lic_str, '-np', str(cpus), '-dir', work_dir, '-j', name,
+                   '-s', 'read', '-l', 'en-us', '-b', '-i', inp_path, '-o', out_path]
+    # print(launch_args)
+    subprocess.call(launch_args)
 
 
 def delete_result_files(path, name):
@@ -6,6 +6,11 @@ import os
 import re
 from compas.geometry import length_vector
 
+try:
+    import numpy as np
+except:
+    pass
+
 
 __author__     = ['Tomas Mendez Echenagucia <tmendeze@uw.edu>']
 __copyright__  = 'Copyright 2020, Design Machine Group - University of Washington'
@@ -16,7 +21,9 @@ __all__ = ['read_harmonic_displacements',
            'read_modal_displacements',
            'read_modal_freq',
            'read_modal_coordinates',
-           'read_harmonic_displacements_field']
+           'read_harmonic_displacements_field',
+           'read_load_case_displacements',
+           'read_harmonic_mobility']
 
 
 def read_harmonic_displacements(structure, path, freq_list, selected_nodes=None):
@@ -86,6 +93,32 @@ def read_harmonic_displacements_field(structure, path, freq_list):
     return hd
 
 
+def read_load_case_displacements(path, num_cases, num_freqs):
+    """Complex displacements (n_cases x n_freq x n_nodes x 3) of a multi load
+    case harmonic analysis, see ``write_load_case_displacements``.
+    """
+    U = []
+    for i in range(num_cases):
+        data = np.loadtxt(os.path.join(path, 'case_{}.txt'.format(i + 1)), delimiter=',', ndmin=2)
+        data = data.reshape(num_freqs, -1, 7)
+        U.append(data[:, :, 1:4] + 1j * data[:, :, 4:7])
+    return np.array(U)
+
+
+def read_harmonic_mobility(path, freq_list, num_cases, force):
+    """Mobility tensor (n_freq x n_cases x n_nodes) of a multi load case
+    harmonic analysis with one point load of components ``force`` per case.
+
+    Velocities are computed as in ``Result.velocity_array`` and divided by
+    the magnitude of the load.
+    """
+    U = read_load_case_displacements(path, num_cases, len(freq_list))
+    x = np.linalg.norm(U.real, axis=3) + 1j * np.linalg.norm(U.imag, axis=3)
+    f = np.asarray(freq_list, dtype=np.float64)
+    H = 2 * np.pi * f[None, :, None] * x * 1j / length_vector(force)
+    return np.ascontiguousarray(np.transpose(H, (1, 0, 2)))
+
+
 def read_modal_displacements(out_path, mode):
     disp_dict = {'ux': {}, 'uy': {}, 'uz': {}}
 
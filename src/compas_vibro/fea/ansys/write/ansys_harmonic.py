@@ -17,6 +17,7 @@ from .ansys_steps import write_loadstep
 from .ansys_steps import write_solve_step
 
 from .ansys_loads import write_loads
+from .ansys_loads import write_delete_loads
 
 
 __author__     = ['Tomas Mendez Echenagucia <tmendeze@uw.edu>']
@@ -27,7 +28,14 @@ __email__      = 'tmendeze@uw.edu'
 __all__ = ['write_command_file_harmonic']
 
 
-def write_command_file_harmonic(structure, fields, selected_nodes):
+def write_command_file_harmonic(structure, fields, selected_nodes, load_cases=None):
+    """Writes the command file of a full harmonic analysis.
+
+    With ``load_cases``, a list of lists of load names, every case is written
+    as its own load step and all of them are solved in one job. The
+    displacements of ``selected_nodes`` (all nodes by default) are written
+    per case, see ``write_load_case_displacements``.
+    """
     path = structure.path
     filename = structure.name + '.txt'
     
@@ -37,6 +45,14 @@ def write_command_file_harmonic(structure, fields, selected_nodes):
     write_elements(structure, path, filename)
     write_harmonic_solve(structure, path, filename)
     write_constraints(structure, 'harmonic', path, filename)
+    if load_cases:
+        for case in load_cases:
+            write_delete_loads(path, filename)
+            write_loads(structure, 'harmonic', path, filename, loads=case)
+            write_loadstep(structure, path, filename)
+        write_solve_step(structure, path, filename, num_steps=len(load_cases))
+        write_load_case_displacements(structure, path, filename, len(load_cases), selected_nodes)
+        return
     write_loads(structure, 'harmonic', path, filename)
     write_loadstep(structure, path, filename)
     write_solve_step(structure, path, filename)
@@ -165,3 +181,50 @@ def write_freq_displacements(structure, path, filename, selected_nodes):
     fh.write('!\n')
     fh.close()
 
+
+def write_load_case_displacements(structure, path, filename, num_cases, selected_nodes):
+    # one file per load case, case_{i}.txt, with a row per frequency and node:
+    # node, real ux, uy, uz, imag ux, uy, uz
+    freq_list = structure.step['harmonic'].freq_list
+    out_path = os.path.join(path, structure.name + '_output')
+    if selected_nodes:
+        nkeys = list(selected_nodes)
+    else:
+        nkeys = sorted(structure.nodes)
+
+    n = 10
+    nkeys_ = [nkeys[i:i + n] for i in range(0, len(nkeys), n)]
+
+    fh = open(os.path.join(path, filename), 'a')
+    fh.write('/POST1 \n')
+    fh.write('nSelNodes = {}\n'.format(len(nkeys)))
+    fh.write('*dim,nodesArr,array,nSelNodes\n')
+    for i, nks in enumerate(nkeys_):
+        fh.write('nodesArr({}) = '.format(i * n + 1) + ', '.join([str(nk + 1) for nk in nks]) + '\n')
+    fh.write('*dim,caseU,array,nSelNodes,7\n')
+
+    fh.write('*do,lstep,1,{}   ! loop over load cases \n'.format(num_cases))
+    fh.write('*cfopen,' + out_path + '/case_%lstep%,txt \n')
+    fh.write('*do,sstep,1,{}   ! loop over frequencies \n'.format(len(freq_list)))
+    fh.write('SET,lstep,sstep,,0 \n')
+    fh.write('*do,j,1,nSelNodes \n')
+    fh.write('caseU(j,1) = nodesArr(j) \n')
+    fh.write('*get,caseU(j,2),NODE,nodesArr(j),U,X \n')
+    fh.write('*get,caseU(j,3),NODE,nodesArr(j),U,Y \n')
+    fh.write('*get,caseU(j,4),NODE,nodesArr(j),U,Z \n')
+    fh.write('*enddo \n')
+    fh.write('SET,lstep,sstep,,1 \n')
+    fh.write('*do,j,1,nSelNodes \n')
+    fh.write('*get,caseU(j,5),NODE,nodesArr(j),U,X \n')
+    fh.write('*get,caseU(j,6),NODE,nodesArr(j),U,Y \n')
+    fh.write('*get,caseU(j,7),NODE,nodesArr(j),U,Z \n')
+    fh.write('*enddo \n')
+    fh.write('*vwrite,caseU(1,1),\',\' ,caseU(1,2),\',\' ,caseU(1,3),\',\' ,caseU(1,4),\',\' ,')
+    fh.write('caseU(1,5),\',\' ,caseU(1,6),\',\' ,caseU(1,7) \n')
+    fh.write('(F8.0, A, E12.5, A, E12.5, A, E12.5, A, E12.5, A, E12.5, A, E12.5)  \n')
+    fh.write('*enddo \n')
+    fh.write('*cfclose\n')
+    fh.write('*enddo \n')
+    fh.write('!\n')
+    fh.write('!\n')
+    fh.close()
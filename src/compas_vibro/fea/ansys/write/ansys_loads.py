@@ -29,9 +29,10 @@ def add_load_to_ploads(structure, pload, load, factor):
     return pload
 
 
-def write_loads(structure, step_type, output_path, filename):
+def write_loads(structure, step_type, output_path, filename, loads=None):
     
-    loads = structure.step[step_type].loads
+    if loads is None:
+        loads = structure.step[step_type].loads
     factor = 1
 
     pload = {}
@@ -56,6 +57,13 @@ def write_loads(structure, step_type, output_path, filename):
             write_combined_point_loads(pload, output_path, filename)
         
 
+def write_delete_loads(output_path, filename):
+    cFile = open(os.path.join(output_path, filename), 'a')
+    cFile.write('FDELE, ALL, ALL \n')
+    cFile.write('!\n')
+    cFile.close()
+
+
 def write_fields_loads(structure, index, output_path, filename):
     fields = structure.loads[list(structure.loads.keys())[0]].fields
     freq = list(fields.keys())[index]
@@ -21,9 +21,9 @@ def write_loadstep(structure, output_path, filename):
     cFile.close()
 
 
-def write_solve_step(structure, output_path, filename):
+def write_solve_step(structure, output_path, filename, num_steps=1):
     cFile = open(os.path.join(output_path, filename), 'a')
     cFile.write('! \n')
-    cFile.write('LSSOLVE, 1, 1, 1! \n')
+    cFile.write('LSSOLVE, 1, {}, 1! \n'.format(num_steps))
     cFile.write('!\n')
     cFile.close()
@@ -6,4 +6,6 @@ __copyright__  = 'Copyright 2020, Design Machine Group - University of Washingto
 __license__    = 'MIT License'
 __email__      = 'tmendeze@uw.edu'
 
-from .gmsh_remesh import *
\ No newline at end of file
+from .gmsh_remesh import *
+from .scheduler import *
+
@@ -0,0 +1,120 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import os
+import pickle
+
+try:
+    from concurrent.futures import ProcessPoolExecutor
+    from concurrent.futures import ThreadPoolExecutor
+    from concurrent.futures import as_completed
+except:
+    pass
+
+try:
+    from os import cpu_count
+except ImportError:
+    # Python 2
+    from multiprocessing import cpu_count
+
+try:
+    from multiprocessing import get_context
+except ImportError:
+    # Python 2, whose executors have no mp_context and fork their workers
+    get_context = None
+
+
+__author__     = ['Tomas Mendez Echenagucia <tmendeze@uw.edu>']
+__copyright__  = 'Copyright 2020, Design Machine Group - University of Washington'
+__license__    = 'MIT License'
+__email__      = 'tmendeze@uw.edu'
+
+
+__all__ = ['job_workers',
+           'isolated_structure',
+           'run_jobs',
+           ]
+
+
+def job_workers(workers=None, cpus_per_job=1, licenses=None):
+    """Number of FE jobs to run at once, ``workers`` or as many as the cores
+    allow with ``cpus_per_job`` each, and no more than ``licenses``.
+    """
+    num = max(1, (cpu_count() or 1) // max(1, cpus_per_job))
+    if workers:
+        num = min(num, workers)
+    if licenses:
+        num = min(num, licenses)
+    return max(1, num)
+
+
+def isolated_structure(structure, name, path):
+    """Copy of a structure, without its results, with its own name and work
+    folder, so that its analyses do not touch the files of other jobs.
+    """
+    results = structure.results
+    structure.results = {}
+    try:
+        copy = pickle.loads(pickle.dumps(structure))
+    finally:
+        structure.results = results
+    copy.name = name
+    copy.path = path
+    if not os.path.isdir(path):
+        os.makedirs(path)
+    return copy
+
+
+def run_jobs(function, jobs, workers=1, pool='process', output=True):
+    """Runs ``function(*job)`` for every job, ``workers`` at a time.
+
+    Processes are spawned rather than forked, as in
+    ``calculate_pressure_parallel_np``, where the interpreter allows it. With
+    one worker the jobs run in this process. The first job to fail raises its
+    error here, once the jobs already running have finished.
+
+    Parameters
+    ----------
+    function : callable
+        Module level function, so that it can be sent to worker processes.
+    jobs : list
+        Arguments of each job.
+    workers : int
+        Number of jobs at once, see ``job_workers``.
+    pool : str
+        ``'process'`` or ``'thread'``.
+    output : bool
+        Print a line as each job finishes.
+
+    Returns
+    -------
+    list
+        Results, in the order of ``jobs``.
+    """
+    if workers <= 1:
+        results = []
+        for i, job in enumerate(jobs):
+            results.append(function(*job))
+            if output:
+                print('Finished job {}/{}'.format(i + 1, len(jobs)))
+        return results
+
+    if pool == 'process':
+        if get_context is None:
+            executor = ProcessPoolExecutor(max_workers=workers)
+        else:
+            executor = ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn'))
+    elif pool == 'thread':
+        executor = ThreadPoolExecutor(max_workers=workers)
+    else:
+        raise NameError('This pool type is not implemented')
+
+    results = [None] * len(jobs)
+    with executor:
+        futures = {executor.submit(function, *job): i for i, job in enumerate(jobs)}
+        for done, future in enumerate(as_completed(futures)):
+            results[futures[future]] = future.result()
+            if output:
+                print('Finished job {}/{}'.format(done + 1, len(jobs)))
+    return results
@@ -8,3 +8,4 @@ __license__    = 'MIT License'
 __email__      = 'tmendeze@uw.edu'
 
 from .linalg_numba import *
+from .radiation_numba import *
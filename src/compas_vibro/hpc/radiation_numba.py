@@ -0,0 +1,104 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+from numba import f8
+from numba import i8
+from numba import c16
+from numba import jit
+from numba import prange
+
+from numpy import complex128
+from numpy import cos
+from numpy import pi
+from numpy import sin
+from numpy import sqrt
+from numpy import zeros
+
+
+__all__ = [
+    'rayleigh_pressure_numba',
+]
+
+
+# ---------------------------------------------------------------------------------------------------
+# Rayleigh integral
+# ---------------------------------------------------------------------------------------------------
+
+@jit(c16[:, :](f8[:], f8, f8, f8[:], f8[:, :], c16[:, :], c16[:, :], i8),
+     nogil=True, nopython=True, parallel=True, cache=True)
+def rayleigh_pressure_numba(ks, rho, c, s, xyz, Q, V, anchor):
+    """Face pressures of the Bai and Tsao radiation matrix, Z * v, for several
+    frequencies, without assembling Z.
+
+    Rows are processed in parallel. Each distance is computed once and used
+    for all frequencies, and the Green's function, the self term and the
+    product with the velocities are accumulated in the same pass. For a
+    uniform sweep the phase term of each pair is stepped from one frequency
+    to the next and evaluated exactly every ``anchor`` frequencies.
+
+    Parameters
+    ----------
+    ks : array
+        Wavenumbers (n_freq,).
+    rho : float
+        Density of air.
+    c : float
+        Speed of sound.
+    s : array
+        Face areas (n_faces,).
+    xyz : array
+        Face centers (n_faces x 3).
+    Q : array
+        Face areas times velocities, transposed (n_faces x n_freq).
+    V : array
+        Face velocities (n_freq x n_faces).
+    anchor : int
+        Frequencies between exact evaluations of the phase term, 1 for
+        non uniform sweeps.
+
+    Returns
+    -------
+    array
+        Complex face pressures (n_freq x n_faces).
+    """
+    nf = ks.shape[0]
+    m = xyz.shape[0]
+    P = zeros((nf, m), dtype=complex128)
+    dk = 0.0
+    if nf > 1:
+        dk = ks[1] - ks[0]
+
+    for i in prange(m):
+        re = zeros(nf)
+        im = zeros(nf)
+        for j in range(m):
+            if j == i:
+                continue
+            dx = xyz[i, 0] - xyz[j, 0]
+            dy = xyz[i, 1] - xyz[j, 1]
+            dz = xyz[i, 2] - xyz[j, 2]
+            r = sqrt(dx * dx + dy * dy + dz * dz)
+            er = cos(dk * r)
+            ei = -sin(dk * r)
+            gr = 0.0
+            gi = 0.0
+            for f in range(nf):
+                if f % anchor == 0:
+                    a = ks[f] * r
+                    gr = cos(a) / r
+                    gi = -sin(a) / r
+                else:
+                    tr = gr * er - gi * ei
+                    gi = gr * ei + gi * er
+                    gr = tr
+                q = Q[j, f]
+                re[f] += gr * q.real - gi * q.imag
+                im[f] += gr * q.imag + gi * q.real
+        for f in range(nf):
+            k = ks[f]
+            t = k * sqrt(s[i] / pi)
+            d = 0.5 * t * t - 1j * 8.0 / 3.0 / pi * t
+            P[f, i] = rho * c * (1j * k / 2.0 / pi * (re[f] + 1j * im[f]) + d * V[f, i])
+
+    return P
@@ -66,19 +66,97 @@ class Result(object):
             d.append(length_vector([dx, dy, dz]))
         return max(d)
 
+    @property
+    def displacements(self):
+        return self._displacements
+
+    @displacements.setter
+    def displacements(self, displacements):
+        self._displacements = displacements
+        self.displacements_changed()
+
+    def displacements_changed(self):
+        """Drops the arrays memoized from the displacements. Assigning
+        ``displacements`` does it, call it after editing them in place.
+        """
+        self.__dict__.pop('_arrays', None)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop('_arrays', None)
+        return state
+
+    def __setstate__(self, state):
+        # results pickled before displacements was a property
+        if 'displacements' in state:
+            state['_displacements'] = state.pop('displacements')
+        self.__dict__.update(state)
+
+    def _array_cache(self):
+        # memoized arrays, see displacements_changed
+        return self.__dict__.setdefault('_arrays', {})
+
+    def displacement_array(self, nkeys=None):
+        """Complex harmonic displacements of the nodes (n_nodes x 3).
+
+        Parameters
+        ----------
+        nkeys : list, optional
+            Node keys of the rows, all nodes with results by default.
+
+        Returns
+        -------
+        array
+            Displacements, ``real + 1j * imag`` for each axis.
+        """
+        if nkeys is None:
+            nkeys = sorted(self.displacements)
+        cache = self._array_cache()
+        key = ('u', tuple(nkeys))
+        if key not in cache:
+            U = np.empty((len(nkeys), 3), dtype=np.complex128)
+            for i, nkey in enumerate(nkeys):
+                re = self.displacements[nkey]['real']
+                im = self.displacements[nkey]['imag']
+                U[i] = (re['x'] + 1j * im['x'], re['y'] + 1j * im['y'], re['z'] + 1j * im['z'])
+            cache[key] = U
+        return cache[key]
+
+    def velocity_array(self, nkeys=None):
+        """Complex node velocities (n_nodes), as in ``compute_node_velocities``.
+        """
+        if nkeys is None:
+            nkeys = sorted(self.displacements)
+        cache = self._array_cache()
+        key = ('v', tuple(nkeys))
+        if key not in cache:
+            U = self.displacement_array(nkeys)
+            x = np.linalg.norm(U.real, axis=1) + 1j * np.linalg.norm(U.imag, axis=1)
+            cache[key] = 2 * np.pi * float(self.frequency) * x * 1j
+        return cache[key]
+
     def compute_node_velocities(self):
-        for nkey in self.displacements:
-            vr = self.displacements[nkey]['real']
-            vi = self.displacements[nkey]['imag']
-
-            vr = [vr['x'], vr['y'], vr['z']]
-            vi = [vi['x'], vi['y'], vi['z']]
-
-            real_l = (vr[0] ** 2 + vr[1] ** 2 + vr[2] ** 2) ** 0.5
-            imag_l = (vi[0] ** 2 + vi[1] ** 2 + vi[2] ** 2) ** 0.5
-            x = real_l + (imag_l * 1j)
-            v = 2 * np.pi * float(self.frequency) * x * 1j
-            self.velocities[nkey] = v
+        nkeys = sorted(self.displacements)
+        if len(self.velocities) == len(nkeys) and ('v', tuple(nkeys)) in self._array_cache():
+            return
+        self.velocities = dict(zip(nkeys, self.velocity_array(nkeys).tolist()))
+
+
+def node_displacement_array(results, nkeys):
+    """Complex harmonic displacements (n_freq x n_nodes x 3) of a list of results.
+    """
+    return np.stack([result.displacement_array(nkeys) for result in results])
+
+
+def node_velocity_array(results, nkeys):
+    """Complex node velocities (n_freq x n_nodes) of a list of results, in one
+    broadcast over all frequencies.
+    """
+    U = node_displacement_array(results, nkeys)
+    f = np.array([float(result.frequency) for result in results])
+    x = np.linalg.norm(U.real, axis=2) + 1j * np.linalg.norm(U.imag, axis=2)
+    return 2 * np.pi * f[:, None] * x * 1j
+
 
 if __name__ == '__main__':
     pass
@@ -18,6 +18,7 @@ from compas_vibro.fea.ansys.ansys import ansys_static
 from compas_vibro.fea.ansys.ansys import ansys_modal
 from compas_vibro.fea.ansys.ansys import ansys_modal_prestressed
 from compas_vibro.fea.ansys.ansys import ansys_harmonic
+from compas_vibro.fea.ansys.ansys import ansys_harmonic_mobility
 from compas_vibro.fea.ansys.ansys import ansys_harmonic_super
 from compas_vibro.fea.ansys.ansys import ansys_harmonic_field
 
@@ -293,12 +294,19 @@ class Structure(NodeMixins, ElementMixins, ObjectMixins):
 
     def analyze_harmonic(self, freq_list, fields, damping=.02, backend='ansys', exe=None, selected_nodes=None):
         if backend == 'ansys':
-            ansys_harmonic(self, freq_list, fields, damping=damping, selected_nodes=selected_nodes)
+            ansys_harmonic(self, freq_list, fields, damping=damping, selected_nodes=selected_nodes, exe=exe)
         elif backend == 'opensees':
             opensees_harmonic(self, freq_list, fields=fields, damping=damping, exe=exe)
         else:
             raise NameError('This backend is not implemented')
         
+    def analyze_harmonic_mobility(self, freq_list, fx, fy, fz, damping=.02, backend='ansys', exe=None):
+        if backend == 'ansys':
+            return ansys_harmonic_mobility(self, freq_list, self.incident_nodes(), self.radiating_nodes(),
+                                           fx, fy, fz, damping=damping, exe=exe)
+        else:
+            raise NameError('This backend is not implemented yet')
+
     def analyze_harmonic_super(self, num_modes, freq_list, fields, damping=.02, backend='ansys'):
         self.compute_mass()
         if backend == 'ansys':
@@ -368,8 +376,11 @@ class Structure(NodeMixins, ElementMixins, ObjectMixins):
             mass = 0
         return mass
 
-    def compute_rad_power(self):
-        compute_rad_power_structure(self)
+    def compute_rad_power(self, engine=None, max_memory=None, tol=1e-4, precision='double', workers=None,
+                          pool='process', elements_per_wavelength=None, output=False):
+        return compute_rad_power_structure(self, engine=engine, max_memory=max_memory, tol=tol,
+                                           precision=precision, workers=workers, pool=pool,
+                                           elements_per_wavelength=elements_per_wavelength, output=output)
 
     @staticmethod
     def from_obj(filename, output=True):
@@ -11,3 +11,15 @@ from .rayleigh import *
 from .loads import *
 from .utilities import *
 from .mobility import *
+from .cache import *
+from .hmatrix import *
+from .fft_radiation import *
+from .treecode import *
+from .radiation_modes import *
+from .incremental import *
+from .chebyshev import *
+from .receivers import *
+from .parallel import *
+from .workspace import *
+from .coarsening import *
+from .modal_radiation import *
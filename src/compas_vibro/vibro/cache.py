@@ -0,0 +1,160 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import os
+import hashlib
+from collections import OrderedDict
+
+try:
+    import numpy as np
+except:
+    pass
+
+from compas_vibro.vibro.utilities import calculate_distance_matrix_np
+from compas_vibro.vibro.utilities import make_area_matrix
+
+
+__author__     = ['Tomas Mendez Echenagucia <tmendeze@uw.edu>']
+__copyright__  = 'Copyright 2020, Design Machine Group - University of Washington'
+__license__    = 'MIT License'
+__email__      = 'tmendeze@uw.edu'
+
+
+__all__ = ['GeometryCache',
+           'GEOMETRY_CACHE',
+           'geometry_key',
+           'cached_distance_matrix_np',
+           'cached_area_matrix',
+           ]
+
+
+def geometry_key(*arrays):
+    """Hash of the float64 bytes of the given arrays (face centers, areas...).
+    """
+    h = hashlib.sha1()
+    for a in arrays:
+        a = np.ascontiguousarray(a, dtype=np.float64)
+        h.update(str(a.shape).encode('utf-8'))
+        h.update(a.tobytes())
+    return h.hexdigest()
+
+
+class GeometryCache(object):
+    """Least recently used cache of geometry matrices (distance and area
+    matrices), keyed on a hash of the geometry they are computed from.
+
+    Arrays are handed out read-only, since they are shared between callers.
+
+    Parameters
+    ----------
+    max_memory : int
+        Bytes kept in memory before the least recently used arrays are evicted.
+    path : str, optional
+        Folder of an on-disk tier. Arrays are also written there and read
+        back on a memory miss, so they survive between runs.
+    max_disk : int
+        Bytes of ``.npy`` files kept in ``path`` before the least recently
+        used ones are deleted.
+    """
+
+    def __init__(self, max_memory=2 ** 30, path=None, max_disk=2 ** 32):
+        self.max_memory = max_memory
+        self.path       = path
+        self.max_disk   = max_disk
+        self.data       = OrderedDict()
+        self.nbytes     = 0
+        self.hits       = 0
+        self.misses     = 0
+
+    def __str__(self):
+        return 'GeometryCache {0} arrays, {1} bytes, {2} hits, {3} misses'.format(
+            len(self.data), self.nbytes, self.hits, self.misses)
+
+    def __contains__(self, key):
+        return key in self.data or (self.path is not None and os.path.exists(self._filename(key)))
+
+    def _filename(self, key):
+        return os.path.join(self.path, '{}.npy'.format(key))
+
+    def get(self, key):
+        if key in self.data:
+            self.data[key] = self.data.pop(key)
+            self.hits += 1
+            return self.data[key]
+        if self.path is not None and os.path.exists(self._filename(key)):
+            self.hits += 1
+            A = np.load(self._filename(key))
+            os.utime(self._filename(key), None)
+            self._store(key, A)
+            return A
+        self.misses += 1
+        return None
+
+    def put(self, key, A):
+        A = np.asarray(A)
+        if self.path is not None:
+            if not os.path.isdir(self.path):
+                os.makedirs(self.path)
+            np.save(self._filename(key), A)
+            self._evict_disk()
+        self._store(key, A)
+        return A
+
+    def _evict_disk(self):
+        # least recently used files first, reads touch their files
+        files = [os.path.join(self.path, name) for name in os.listdir(self.path) if name.endswith('.npy')]
+        files = sorted((os.path.getmtime(f), os.path.getsize(f), f) for f in files)
+        nbytes = sum(size for _, size, _ in files)
+        for _, size, f in files:
+            if nbytes <= self.max_disk:
+                break
+            os.remove(f)
+            nbytes -= size
+
+    def _store(self, key, A):
+        A.flags.writeable = False
+        if key in self.data:
+            self.nbytes -= self.data.pop(key).nbytes
+        self.data[key] = A
+        self.nbytes += A.nbytes
+        while self.nbytes > self.max_memory and self.data:
+            _, A_ = self.data.popitem(last=False)
+            self.nbytes -= A_.nbytes
+
+    def clear(self):
+        self.data.clear()
+        self.nbytes = 0
+
+    def cached(self, name, function, *arrays):
+        key = '{}_{}'.format(name, geometry_key(*arrays))
+        A = self.get(key)
+        if A is None:
+            A = self.put(key, function(*arrays))
+        return A
+
+
+GEOMETRY_CACHE = GeometryCache()
+
+
+def cached_distance_matrix_np(face_centers, cache=None, precision='double'):
+    """``calculate_distance_matrix_np`` through a ``GeometryCache``,
+    ``GEOMETRY_CACHE`` by default. With ``precision='single'`` a float32 copy
+    is cached instead, at half the memory.
+    """
+    if cache is None:
+        cache = GEOMETRY_CACHE
+    if precision == 'single':
+        def distance_single(xyz):
+            return calculate_distance_matrix_np(xyz).astype(np.float32)
+        return cache.cached('distance_single', distance_single, face_centers)
+    return cache.cached('distance', calculate_distance_matrix_np, face_centers)
+
+
+def cached_area_matrix(face_areas, cache=None):
+    """``make_area_matrix`` through a ``GeometryCache``, ``GEOMETRY_CACHE``
+    by default.
+    """
+    if cache is None:
+        cache = GEOMETRY_CACHE
+    return cache.cached('area', make_area_matrix, face_areas)
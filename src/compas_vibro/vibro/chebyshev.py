@@ -0,0 +1,261 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+try:
+    import numpy as np
+except:
+    pass
+
+from compas_vibro.vibro.rayleigh import RADIATION_MAX_MEMORY
+from compas_vibro.vibro.rayleigh import RADIATION_BYTES_PER_ENTRY
+from compas_vibro.vibro.rayleigh import calculate_pressure_batch_np
+from compas_vibro.vibro.rayleigh import calculate_pressure_blocked_np
+from compas_vibro.vibro.rayleigh import calculate_rayleigh_rad_power_batch_np
+from compas_vibro.vibro.cache import cached_distance_matrix_np
+
+
+__author__     = ['Tomas Mendez Echenagucia <tmendeze@uw.edu>']
+__copyright__  = 'Copyright 2020, Design Machine Group - University of Washington'
+__license__    = 'MIT License'
+__email__      = 'tmendeze@uw.edu'
+
+
+__all__ = ['ChebyshevRadiation',
+           'chebyshev_lobatto_points',
+           'calculate_pressure_chebyshev_np',
+           ]
+
+
+def chebyshev_lobatto_points(a, b, n):
+    """The ``n + 1`` Chebyshev extreme points of ``[a, b]``, from ``a`` to ``b``.
+    Doubling ``n`` keeps the previous points.
+    """
+    t = -np.cos(np.pi * np.arange(n + 1) / n)
+    return (a + b) / 2. + (b - a) / 2. * t
+
+
+def _barycentric_matrix(nodes, x):
+    # L[i, j] is the j-th Lagrange polynomial on the Chebyshev extreme points
+    # at x[i], in barycentric form
+    n = nodes.shape[0] - 1
+    w = (-1.) ** np.arange(n + 1)
+    w[0] /= 2.
+    w[-1] /= 2.
+    d = x[:, None] - nodes[None, :]
+    exact = d == 0
+    d[exact] = 1.
+    L = w / d
+    L /= np.sum(L, axis=1)[:, None]
+    rows = np.any(exact, axis=1)
+    L[rows] = exact[rows]
+    return L
+
+
+def _chebyshev_tail(Y):
+    # magnitude of the two highest Chebyshev coefficients of values at the
+    # extreme points, along the first axis
+    n = Y.shape[0] - 1
+    j = np.arange(n - 1, n + 1)
+    T = np.cos(np.pi * j[:, None] * np.arange(n + 1)[None, :] / n)
+    T[:, 0] /= 2.
+    T[:, -1] /= 2.
+    C = np.tensordot(T, Y, axes=(1, 0)) * 2. / n
+    return np.max(np.abs(C))
+
+
+class ChebyshevRadiation(object):
+    """Radiation operator interpolated across frequency.
+
+    Within a band of wavenumbers ``Z(k) * v`` is a smooth function of ``k``,
+    approximated by interpolation between a few anchor wavenumbers at the
+    Chebyshev extreme points of the band. The velocities of all frequencies
+    of the band are applied to each anchor matrix at once, so a band costs
+    one matrix build and one matrix product per anchor.
+
+    Each band starts with 3 anchors, doubled while the highest Chebyshev
+    coefficients are above ``tol`` times the pressures. When ``max_anchors``
+    is reached the band is split in two. Bands with fewer frequencies than
+    anchors are evaluated exactly.
+
+    This only pays off when the velocities are the same at every wavenumber,
+    see ``pressures_fixed``, e.g. mode shapes in ``modal_radiation``: then
+    only the anchors cost O(N^2). With velocities that change with frequency
+    each anchor matrix is applied to every velocity of its band, which takes
+    more matrix products than the exact batch engine and is usually slower
+    than ``calculate_pressure_batch_np``.
+
+    Parameters
+    ----------
+    rho : float
+        Density of air.
+    c : float
+        Speed of sound.
+    s : list
+        Radiating face areas.
+    face_centers : list
+        Radiating face centers.
+    tol : float
+        Relative accuracy of the interpolated pressures.
+    max_anchors : int
+        Maximum number of anchors in a band, as ``2 ** i + 1``.
+    max_memory : int, optional
+        Bytes of the anchor pressures of a band, defaults to ``RADIATION_MAX_MEMORY``.
+    """
+
+    def __init__(self, rho, c, s, face_centers, tol=1e-6, max_anchors=33, max_memory=None):
+
+        self.rho            = rho
+        self.c              = c
+        self.s              = np.asarray(s, dtype=np.float64)
+        self.face_centers   = np.asarray(face_centers, dtype=np.float64)
+        self.tol            = tol
+        self.max_anchors    = max_anchors
+        self.max_memory     = RADIATION_MAX_MEMORY if max_memory is None else max_memory
+        self.bands          = []
+        self.num_builds     = 0
+
+    def __str__(self):
+        return 'ChebyshevRadiation {0} faces, {1} bands, {2} matrix builds'.format(
+            self.s.shape[0], len(self.bands), self.num_builds)
+
+    def exact(self, k, V):
+        """``Z(k) * V`` for velocities ``V`` (n_faces x n_cases).
+        """
+        self.num_builds += 1
+        m = self.s.shape[0]
+        V = V[None, :, :]
+        if RADIATION_BYTES_PER_ENTRY * m ** 2 > self.max_memory:
+            P = calculate_pressure_blocked_np([k], self.rho, self.c, self.s, self.face_centers, V,
+                                              max_memory=self.max_memory)
+        else:
+            D = cached_distance_matrix_np(self.face_centers)
+            P = calculate_pressure_batch_np([k], self.rho, self.c, self.s, D, V,
+                                            max_memory=self.max_memory)
+        return P[0]
+
+    def pressures(self, ks, V):
+        """Complex face pressures for a sweep of wavenumbers.
+
+        Each anchor matrix is applied to the velocities of every frequency of
+        its band, so this saves matrix builds at the cost of more matrix
+        products, and is usually slower than the exact batch engine. Use
+        ``pressures_fixed`` when the velocities do not change with frequency.
+
+        Parameters
+        ----------
+        ks : list
+            Wavenumbers, one per frequency.
+        V : array
+            Complex face velocities (n_freq x n_faces).
+
+        Returns
+        -------
+        array
+            Complex face pressures (n_freq x n_faces).
+        """
+        ks = np.asarray(ks, dtype=np.float64).reshape(-1)
+        V = np.asarray(V, dtype=np.complex128).reshape(ks.shape[0], self.s.shape[0])
+        P = np.empty(V.shape, dtype=np.complex128)
+        per_band = max(1, int(self.max_memory // (16 * self.s.shape[0] * self.max_anchors)))
+        for fi, L, Y in self._bands(ks, per_band, lambda fi: V[fi].T):
+            P[fi] = np.einsum('fl,lmf->fm', L, Y)
+        return P
+
+    def pressures_fixed(self, ks, V):
+        """Complex face pressures of velocities that are the same at every
+        wavenumber, e.g. mode shapes. Only the anchors are computed exactly.
+
+        Parameters
+        ----------
+        ks : list
+            Wavenumbers, one per frequency.
+        V : array
+            Complex face velocities (n_faces) or (n_faces x n_cases).
+
+        Returns
+        -------
+        array
+            Complex face pressures (n_freq x n_faces) or (n_freq x n_faces x n_cases).
+        """
+        ks = np.asarray(ks, dtype=np.float64).reshape(-1)
+        V = np.asarray(V, dtype=np.complex128)
+        V2 = V.reshape(self.s.shape[0], -1)
+        P = np.empty((ks.shape[0],) + V2.shape, dtype=np.complex128)
+        for fi, L, Y in self._bands(ks, ks.shape[0], lambda fi: V2):
+            P[fi] = np.tensordot(L, Y, axes=(1, 0))
+        return P.reshape((ks.shape[0],) + V.shape)
+
+    def power_fixed(self, ks, V):
+        """Total radiated power ``v^H * R(k) * v`` of velocities that are the
+        same at every wavenumber, see ``pressures_fixed``.
+
+        Returns
+        -------
+        array
+            Total radiated power (n_freq) or (n_freq x n_cases).
+        """
+        V = np.asarray(V, dtype=np.complex128)
+        P = self.pressures_fixed(ks, V)
+        return calculate_rayleigh_rad_power_batch_np(self.s, P, V[None], axis=1)[1]
+
+    def _bands(self, ks, per_band, velocities):
+        # first guess of the bands, the phase of exp(-ikD) turns by dk * D over
+        # a band, which takes about dk * D / 2 anchors to resolve
+        order = np.argsort(ks, kind='mergesort')
+        diameter = np.linalg.norm(np.ptp(self.face_centers, axis=0))
+        width = self.max_anchors / max(diameter, 1e-12)
+        stack = []
+        start = 0
+        for i in range(1, order.shape[0] + 1):
+            if (i == order.shape[0] or i - start == per_band or
+                    ks[order[i]] - ks[order[start]] > width):
+                stack.append(order[start:i])
+                start = i
+        stack = stack[::-1]
+        while stack:
+            fi = stack.pop()
+            band = self._band(ks[fi], velocities(fi))
+            if band is None:
+                half = fi.shape[0] // 2
+                stack.extend([fi[half:], fi[:half]])
+                continue
+            yield (fi,) + band
+
+    def _band(self, ks, Vb):
+        # Z * Vb at the anchors (n_anchors x n_faces x n_cols) and the
+        # interpolation matrix from the anchors to ks, or None if the band
+        # needs more than max_anchors
+        a, b = ks[0], ks[-1]
+        if ks.shape[0] <= 3 or a == b:
+            self.bands.append((a, b, ks.shape[0]))
+            return np.eye(ks.shape[0]), np.array([self.exact(k, Vb) for k in ks])
+
+        n = 2
+        Y = [self.exact(k, Vb) for k in chebyshev_lobatto_points(a, b, n)]
+        while True:
+            Ya = np.array(Y)
+            if _chebyshev_tail(Ya) <= self.tol * np.max(np.abs(Ya)):
+                break
+            if 2 * n + 1 > min(self.max_anchors, ks.shape[0]):
+                return None
+            points = chebyshev_lobatto_points(a, b, 2 * n)
+            Y_ = [None] * (2 * n + 1)
+            Y_[::2] = Y
+            Y_[1::2] = [self.exact(k, Vb) for k in points[1::2]]
+            Y = Y_
+            n *= 2
+
+        self.bands.append((a, b, n + 1))
+        return _barycentric_matrix(chebyshev_lobatto_points(a, b, n), ks), Ya
+
+
+def calculate_pressure_chebyshev_np(ks, rho, c, s, face_centers, V, tol=1e-6, max_anchors=33,
+                                    max_memory=None):
+    """Frequency interpolated version of ``calculate_pressure_batch_np``, see
+    ``ChebyshevRadiation``. Velocities that change with frequency make it
+    slower than the exact batch engine, it is not picked by default.
+    """
+    radiation = ChebyshevRadiation(rho, c, s, face_centers, tol=tol, max_anchors=max_anchors,
+                                   max_memory=max_memory)
+    return radiation.pressures(ks, V)
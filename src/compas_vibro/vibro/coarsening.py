@@ -0,0 +1,194 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+try:
+    import numpy as np
+    import scipy.sparse as sps
+except:
+    pass
+
+from compas_vibro.vibro.rayleigh import RADIATION_MAX_MEMORY
+from compas_vibro.vibro.rayleigh import RADIATION_BYTES_PER_ENTRY
+from compas_vibro.vibro.rayleigh import calculate_pressure_batch_np
+from compas_vibro.vibro.rayleigh import calculate_pressure_blocked_np
+from compas_vibro.vibro.cache import cached_distance_matrix_np
+
+
+__author__     = ['Tomas Mendez Echenagucia <tmendeze@uw.edu>']
+__copyright__  = 'Copyright 2020, Design Machine Group - University of Washington'
+__license__    = 'MIT License'
+__email__      = 'tmendeze@uw.edu'
+
+
+__all__ = ['RadiationPatches',
+           'cluster_faces_np',
+           'radiation_bands',
+           'calculate_pressure_coarse_np',
+           ]
+
+
+ELEMENTS_PER_WAVELENGTH = 6
+
+
+def cluster_faces_np(face_centers, size):
+    """Labels of the faces grouped in cubic cells of side ``size``.
+
+    Returns
+    -------
+    array
+        Patch index of every face, from 0 to the number of patches.
+    """
+    xyz = np.asarray(face_centers, dtype=np.float64)
+    cells = np.floor((xyz - np.min(xyz, axis=0)) / size).astype(np.int64)
+    _, labels = np.unique(cells, axis=0, return_inverse=True)
+    return labels.reshape(-1)
+
+
+class RadiationPatches(object):
+    """Radiating faces clustered into patches of about ``size``, to evaluate
+    the Rayleigh integral on a coarser set of sources.
+
+    A patch has the total area of its faces, their area weighted centroid
+    and their area weighted velocity, which keeps the volume velocity of
+    the patch. Pressures computed on the patches are given back to each of
+    their faces.
+
+    Parameters
+    ----------
+    s : list
+        Radiating face areas.
+    face_centers : list
+        Radiating face centers.
+    size : float
+        Side of the cells the faces are grouped in.
+    """
+
+    def __init__(self, s, face_centers, size):
+
+        s = np.asarray(s, dtype=np.float64)
+        xyz = np.asarray(face_centers, dtype=np.float64)
+        self.size           = size
+        self.labels         = cluster_faces_np(xyz, size)
+        num = int(self.labels.max()) + 1 if self.labels.shape[0] else 0
+        self.s              = np.bincount(self.labels, weights=s, minlength=num)
+        self.aggregation    = sps.csr_matrix((s / self.s[self.labels], (self.labels, np.arange(s.shape[0]))),
+                                             shape=(num, s.shape[0]))
+        self.face_centers   = self.aggregation * xyz
+
+    def __str__(self):
+        return 'RadiationPatches {0} faces in {1} patches of {2:.3f}'.format(
+            self.labels.shape[0], self.s.shape[0], self.size)
+
+    def velocities(self, V):
+        """Area weighted patch velocities of face velocities (n_freq x n_faces).
+        """
+        return np.ascontiguousarray((self.aggregation * np.asarray(V).T).T)
+
+    def face_pressures(self, P):
+        """Face pressures (n_freq x n_faces) of patch pressures (n_freq x n_patches).
+        """
+        return P[:, self.labels]
+
+
+def radiation_bands(ks, s, elements_per_wavelength=ELEMENTS_PER_WAVELENGTH):
+    """Groups wavenumbers in bands that share a patch size.
+
+    The patch size of a band is the face size (the square root of the mean
+    face area) times a power of two, the largest that still gives
+    ``elements_per_wavelength`` patches per wavelength at the highest
+    wavenumber of the band. Level 0 is the original mesh.
+
+    Returns
+    -------
+    list
+        ``(level, size, indices)`` per band, from the finest to the coarsest.
+    """
+    ks = np.asarray(ks, dtype=np.float64).reshape(-1)
+    face_size = np.sqrt(np.mean(s))
+    wavelengths = 2. * np.pi / np.maximum(ks, 1e-12)
+    ratio = wavelengths / elements_per_wavelength / face_size
+    levels = np.floor(np.log2(np.maximum(ratio, 1.))).astype(int)
+    bands = []
+    for level in np.unique(levels).tolist():
+        indices = np.nonzero(levels == level)[0]
+        bands.append((level, face_size * 2. ** level, indices))
+    return bands
+
+
+def calculate_pressure_coarse_np(ks, rho, c, s, face_centers, V, elements_per_wavelength=ELEMENTS_PER_WAVELENGTH,
+                                 max_memory=None):
+    """Multi-resolution version of ``calculate_pressure_batch_np``.
+
+    Each band of ``radiation_bands`` is evaluated on the faces clustered into
+    ``RadiationPatches`` of the band's size, with the dense engine or the
+    blocked one when the patch distance matrix does not fit in
+    ``max_memory``. At low frequencies a few patches stand in for the
+    whole mesh. The pressures are mapped back to the faces, so powers are
+    computed on the original faces as usual.
+
+    Only the acoustic wavelength sets the patch size. Velocity patterns
+    that change sign within a patch (short structural wavelengths) radiate
+    little and their power has a larger relative error, raise
+    ``elements_per_wavelength`` for those. Bands on the original mesh can
+    report fewer elements per wavelength than asked, if the mesh itself is
+    coarser.
+
+    Parameters
+    ----------
+    ks : list
+        Wavenumbers, one per frequency.
+    rho : float
+        Density of air.
+    c : float
+        Speed of sound.
+    s : list
+        Radiating face areas.
+    face_centers : list
+        Radiating face centers.
+    V : array
+        Complex face velocities (n_freq x n_faces).
+    elements_per_wavelength : float
+        Minimum number of patches per acoustic wavelength.
+    max_memory : int, optional
+        Bytes the radiation matrices may use, defaults to ``RADIATION_MAX_MEMORY``.
+
+    Returns
+    -------
+    array
+        Complex face pressures (n_freq x n_faces).
+    list
+        Resolution of every band, as dictionaries with the frequency range,
+        the patch size, the number of patches and the elements per wavelength
+        at the top of the band.
+    """
+    if max_memory is None:
+        max_memory = RADIATION_MAX_MEMORY
+    ks = np.asarray(ks, dtype=np.float64).reshape(-1)
+    s = np.asarray(s, dtype=np.float64)
+    V = np.asarray(V, dtype=np.complex128).reshape(ks.shape[0], s.shape[0])
+    xyz = np.asarray(face_centers, dtype=np.float64)
+
+    P = np.empty(V.shape, dtype=np.complex128)
+    report = []
+    for level, size, fi in radiation_bands(ks, s, elements_per_wavelength):
+        if level == 0:
+            sb, xyzb, Vb = s, xyz, V[fi]
+        else:
+            patches = RadiationPatches(s, xyz, size)
+            sb, xyzb, Vb = patches.s, patches.face_centers, patches.velocities(V[fi])
+        m = sb.shape[0]
+        if RADIATION_BYTES_PER_ENTRY * m ** 2 > max_memory:
+            Pb = calculate_pressure_blocked_np(ks[fi], rho, c, sb, xyzb, Vb, max_memory=max_memory)
+        else:
+            D = cached_distance_matrix_np(xyzb)
+            Pb = calculate_pressure_batch_np(ks[fi], rho, c, sb, D, Vb, max_memory=max_memory)
+        P[fi] = Pb if level == 0 else patches.face_pressures(Pb)
+
+        kmin, kmax = ks[fi].min(), ks[fi].max()
+        report.append({'frequencies': (kmin * c / 2. / np.pi, kmax * c / 2. / np.pi),
+                       'level': level,
+                       'size': size,
+                       'num_faces': m,
+                       'elements_per_wavelength': 2. * np.pi / kmax / np.sqrt(np.mean(sb))})
+    return P, report
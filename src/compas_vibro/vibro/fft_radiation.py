@@ -0,0 +1,180 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+try:
+    import numpy as np
+except:
+    pass
+
+from compas_vibro.vibro.rayleigh import RADIATION_MAX_MEMORY
+from compas_vibro.vibro.rayleigh import calculate_radiation_self_term_np
+
+
+__author__     = ['Tomas Mendez Echenagucia <tmendeze@uw.edu>']
+__copyright__  = 'Copyright 2020, Design Machine Group - University of Washington'
+__license__    = 'MIT License'
+__email__      = 'tmendeze@uw.edu'
+
+
+__all__ = ['detect_planar_grid',
+           'fft_bytes_per_frequency',
+           'calculate_pressure_fft_np',
+           ]
+
+
+# complex G, Q, their two transforms, the product and its inverse transform,
+# per cell of the zero padded grid
+FFT_BYTES_PER_CELL = 6 * 16
+
+
+def detect_planar_grid(face_centers, tol=1e-5):
+    """Checks if the face centers lie on a uniform, planar, rectangular grid.
+
+    Cells of the grid may be missing, the remaining faces still produce a
+    block-Toeplitz distance matrix with Toeplitz blocks.
+
+    Parameters
+    ----------
+    face_centers : list
+        Radiating face centers.
+    tol : float
+        Tolerance, relative to the grid spacing.
+
+    Returns
+    -------
+    dict
+        ``indices`` (n_faces x 2) grid cell of each face, ``shape`` (nx, ny)
+        and ``spacing`` (du, dw) of the grid, or ``None`` if the face centers
+        are not a uniform planar grid.
+    """
+    xyz = np.asarray(face_centers, dtype=np.float64)
+    if xyz.shape[0] < 2:
+        return None
+
+    d0 = np.linalg.norm(xyz[1:] - xyz[0], axis=1)
+    du = float(np.min(d0))
+    if du == 0:
+        return None
+    e1 = (xyz[1 + int(np.argmin(d0))] - xyz[0]) / du
+
+    X = xyz - xyz[0]
+    X_ = X - np.outer(np.dot(X, e1), e1)
+    norms = np.linalg.norm(X_, axis=1)
+    if np.max(norms) <= tol * du:
+        e2 = np.cross(e1, [0., 0., 1.]) if abs(e1[2]) < .9 else np.cross(e1, [1., 0., 0.])
+        e2 /= np.linalg.norm(e2)
+    else:
+        e2 = X_[int(np.argmax(norms))] / np.max(norms)
+    normal = np.cross(e1, e2)
+    if np.max(np.abs(np.dot(X, normal))) > tol * du:
+        return None
+
+    u = np.dot(X, e1)
+    w = np.dot(X, e2)
+    i = np.round((u - np.min(u)) / du)
+    du = _fit_spacing(u, i, du)
+    if np.max(np.abs(u - np.min(u) - i * du)) > tol * du:
+        return None
+
+    ws = np.sort(w)
+    gaps = np.diff(ws)
+    gaps = gaps[gaps > tol * du]
+    dw = float(np.min(gaps)) if gaps.shape[0] else du
+    j = np.round((w - np.min(w)) / dw)
+    dw = _fit_spacing(w, j, dw)
+    if np.max(np.abs(w - np.min(w) - j * dw)) > tol * du:
+        return None
+
+    indices = np.column_stack((i, j)).astype(int)
+    shape = (int(np.max(indices[:, 0])) + 1, int(np.max(indices[:, 1])) + 1)
+    if np.unique(indices[:, 0] * shape[1] + indices[:, 1]).shape[0] != xyz.shape[0]:
+        return None
+
+    return {'indices': indices, 'shape': shape, 'spacing': (du, dw)}
+
+
+def _fit_spacing(u, i, du):
+    # least squares spacing of the grid lines, the first guess comes from a
+    # single pair of faces and carries all of its rounding
+    if np.max(i) == 0:
+        return du
+    i_ = i - np.mean(i)
+    return float(np.dot(i_, u - np.mean(u)) / np.dot(i_, i_))
+
+
+def fft_bytes_per_frequency(grid):
+    """Peak bytes ``calculate_pressure_fft_np`` needs for one frequency on
+    the zero padded (2 nx x 2 ny) grid of ``detect_planar_grid``.
+    """
+    nx, ny = grid['shape']
+    return FFT_BYTES_PER_CELL * 4 * nx * ny
+
+
+def calculate_pressure_fft_np(ks, rho, c, s, face_centers, V, grid=None, max_memory=None):
+    """FFT version of ``calculate_pressure_batch_np`` for radiating faces on a
+    uniform planar grid.
+
+    On such a grid the Green's function only depends on the cell offset, so
+    ``Z * v`` is a 2D convolution that is evaluated with zero padded FFTs in
+    O(N log N), giving the same pressures as the dense radiation matrix.
+
+    Parameters
+    ----------
+    ks : list
+        Wavenumbers, one per frequency.
+    rho : float
+        Density of air.
+    c : float
+        Speed of sound.
+    s : list
+        Radiating face areas.
+    face_centers : list
+        Radiating face centers.
+    V : array
+        Complex face velocities (n_freq x n_faces).
+    grid : dict, optional
+        Output of ``detect_planar_grid``, detected if not given.
+    max_memory : int, optional
+        Bytes a chunk of frequencies may use, defaults to ``RADIATION_MAX_MEMORY``.
+
+    Returns
+    -------
+    array
+        Complex face pressures (n_freq x n_faces).
+    """
+    if max_memory is None:
+        max_memory = RADIATION_MAX_MEMORY
+    if grid is None:
+        grid = detect_planar_grid(face_centers)
+    if grid is None:
+        raise ValueError('The radiating faces are not a uniform planar grid')
+
+    ks = np.asarray(ks, dtype=np.float64).reshape(-1)
+    s = np.asarray(s, dtype=np.float64)
+    V = np.asarray(V, dtype=np.complex128).reshape(ks.shape[0], s.shape[0])
+
+    ii, jj = grid['indices'][:, 0], grid['indices'][:, 1]
+    nx, ny = grid['shape']
+    du, dw = grid['spacing']
+
+    a = np.fft.fftfreq(2 * nx, 1. / (2 * nx)) * du
+    b = np.fft.fftfreq(2 * ny, 1. / (2 * ny)) * dw
+    R = np.sqrt(a[:, None] ** 2 + b[None, :] ** 2)
+    R[0, 0] = 1.
+
+    P = np.empty(V.shape, dtype=np.complex128)
+    step = max(1, int(max_memory // fft_bytes_per_frequency(grid)))
+    for i in range(0, ks.shape[0], step):
+        k = ks[i:i + step]
+        G = np.exp(-1j * k[:, None, None] * R) / R
+        G[:, 0, 0] = 0.
+        Q = np.zeros(G.shape, dtype=np.complex128)
+        Q[:, ii, jj] = s * V[i:i + step]
+        Q = np.fft.ifft2(np.fft.fft2(G) * np.fft.fft2(Q))
+        P[i:i + step] = Q[:, ii, jj]
+
+    P *= 1j * ks[:, None] / 2 / np.pi
+    P += calculate_radiation_self_term_np(ks[:, None], s) * V
+    P *= (rho * c)
+    return P
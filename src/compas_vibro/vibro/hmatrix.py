@@ -0,0 +1,234 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+try:
+    import numpy as np
+except:
+    pass
+
+from compas_vibro.vibro.rayleigh import calculate_radiation_block_np
+
+
+__author__     = ['Tomas Mendez Echenagucia <tmendeze@uw.edu>']
+__copyright__  = 'Copyright 2020, Design Machine Group - University of Washington'
+__license__    = 'MIT License'
+__email__      = 'tmendeze@uw.edu'
+
+
+__all__ = ['ClusterTree',
+           'HMatrix',
+           'calculate_pressure_hmatrix_np',
+           ]
+
+
+class ClusterTree(object):
+    """Binary tree of face centers, split along the longest side of the
+    bounding box of each cluster until clusters hold at most ``leaf_size`` faces.
+
+    Parameters
+    ----------
+    face_centers : list
+        Radiating face centers.
+    leaf_size : int
+        Maximum number of faces in a leaf cluster.
+    """
+
+    def __init__(self, face_centers, leaf_size=64, indices=None):
+        xyz = np.asarray(face_centers, dtype=np.float64)
+        if indices is None:
+            indices = np.arange(xyz.shape[0])
+
+        self.indices    = indices
+        self.bbox_min   = np.min(xyz[indices], axis=0)
+        self.bbox_max   = np.max(xyz[indices], axis=0)
+        self.diameter   = float(np.linalg.norm(self.bbox_max - self.bbox_min))
+        self.children   = []
+
+        if indices.shape[0] > leaf_size:
+            axis = int(np.argmax(self.bbox_max - self.bbox_min))
+            order = np.argsort(xyz[indices, axis], kind='mergesort')
+            half = indices.shape[0] // 2
+            self.children = [ClusterTree(xyz, leaf_size, indices[order[:half]]),
+                             ClusterTree(xyz, leaf_size, indices[order[half:]])]
+
+    @property
+    def is_leaf(self):
+        return not self.children
+
+    def distance(self, other):
+        gap = np.maximum(0., np.maximum(self.bbox_min - other.bbox_max,
+                                        other.bbox_min - self.bbox_max))
+        return float(np.linalg.norm(gap))
+
+    def is_admissible(self, other, eta):
+        return max(self.diameter, other.diameter) <= eta * self.distance(other)
+
+
+class HMatrix(object):
+    """Hierarchical low-rank approximation of the radiation matrix of
+    ``calculate_radiation_matrix_np``.
+
+    Well separated blocks of the cluster tree are compressed with adaptive
+    cross approximation (ACA) and stored as ``U * V``, the remaining near
+    field blocks are stored dense. The full matrix is never assembled.
+
+    Parameters
+    ----------
+    k : float
+        Wavenumber.
+    rho : float
+        Density of air.
+    c : float
+        Speed of sound.
+    s : list
+        Radiating face areas.
+    face_centers : list
+        Radiating face centers.
+    tol : float
+        Relative accuracy of each compressed block.
+    leaf_size : int
+        Maximum number of faces in a leaf cluster.
+    eta : float
+        Admissibility parameter, larger values compress more blocks.
+    """
+
+    def __init__(self, k, rho, c, s, face_centers, tol=1e-4, leaf_size=64, eta=2.):
+
+        self.k              = k
+        self.rho            = rho
+        self.c              = c
+        self.s              = np.asarray(s, dtype=np.float64)
+        self.face_centers   = np.asarray(face_centers, dtype=np.float64)
+        self.tol            = tol
+        self.eta            = eta
+        self.shape          = (self.s.shape[0], self.s.shape[0])
+        self.dense_blocks   = []
+        self.lowrank_blocks = []
+
+        tree = ClusterTree(self.face_centers, leaf_size=leaf_size)
+        self._partition(tree, tree)
+
+    def __str__(self):
+        return 'HMatrix {0}x{0}, {1} dense blocks, {2} low-rank blocks, compression {3:.3f}'.format(
+            self.shape[0], len(self.dense_blocks), len(self.lowrank_blocks), self.compression)
+
+    @property
+    def num_entries(self):
+        num = sum([B.size for _, _, B in self.dense_blocks])
+        num += sum([U.size + V.size for _, _, U, V in self.lowrank_blocks])
+        return num
+
+    @property
+    def compression(self):
+        return self.num_entries / float(self.shape[0] * self.shape[1])
+
+    def block(self, rows, cols):
+        return calculate_radiation_block_np(self.k, self.rho, self.c, self.s,
+                                            self.face_centers, rows, cols)
+
+    def _partition(self, t, s):
+        if t.is_admissible(s, self.eta):
+            UV = self._aca(t.indices, s.indices)
+            if UV is not None:
+                self.lowrank_blocks.append((t.indices, s.indices, UV[0], UV[1]))
+                return
+        if t.is_leaf and s.is_leaf:
+            self.dense_blocks.append((t.indices, s.indices, self.block(t.indices, s.indices)))
+        elif t.is_leaf:
+            for s_ in s.children:
+                self._partition(t, s_)
+        elif s.is_leaf:
+            for t_ in t.children:
+                self._partition(t_, s)
+        else:
+            for t_ in t.children:
+                for s_ in s.children:
+                    self._partition(t_, s_)
+
+    def _aca(self, rows, cols):
+        # adaptive cross approximation with partial pivoting, returns None when
+        # the block does not compress below half its full rank
+        m, n = rows.shape[0], cols.shape[0]
+        max_rank = min(m, n) // 2
+        U = np.zeros((m, max_rank), dtype=np.complex128)
+        V = np.zeros((max_rank, n), dtype=np.complex128)
+        free = np.ones(m, dtype=bool)
+        norm2 = 0.
+        i = 0
+        r = 0
+        while r < max_rank:
+            free[i] = False
+            row = self.block(rows[i:i + 1], cols)[0] - np.dot(U[i, :r], V[:r])
+            j = int(np.argmax(np.abs(row)))
+            if row[j] == 0:
+                if not np.any(free):
+                    break
+                i = int(np.argmax(free))
+                continue
+            v = row / row[j]
+            u = self.block(rows, cols[j:j + 1])[:, 0] - np.dot(U[:, :r], V[:r, j])
+            norm2 += 2. * np.real(np.dot(np.dot(np.conjugate(u), U[:, :r]),
+                                         np.dot(np.conjugate(V[:r]), v)))
+            uv = np.linalg.norm(u) * np.linalg.norm(v)
+            norm2 += uv ** 2
+            U[:, r] = u
+            V[r] = v
+            r += 1
+            if uv <= self.tol * np.sqrt(abs(norm2)):
+                return self._recompress(U[:, :r], V[:r])
+            ui = np.abs(u)
+            ui[~free] = -1.
+            i = int(np.argmax(ui))
+            if ui[i] < 0:
+                break
+        if r and not np.any(free):
+            return self._recompress(U[:, :r], V[:r])
+        return None
+
+    def _recompress(self, U, V):
+        Qu, Ru = np.linalg.qr(U)
+        Qv, Rv = np.linalg.qr(V.T)
+        W, sv, Xh = np.linalg.svd(np.dot(Ru, Rv.T))
+        keep = sv > self.tol * sv[0] if sv[0] > 0 else sv > 0
+        r = max(1, int(np.sum(keep)))
+        U = np.dot(Qu, W[:, :r] * sv[:r])
+        V = np.dot(Xh[:r], Qv.T)
+        return U, V
+
+    def matvec(self, v):
+        """Computes ``Z * v`` without assembling ``Z``.
+        """
+        v = np.asarray(v, dtype=np.complex128)
+        p = np.zeros(self.shape[0], dtype=np.complex128)
+        for rows, cols, B in self.dense_blocks:
+            p[rows] += np.dot(B, v[cols])
+        for rows, cols, U, V in self.lowrank_blocks:
+            p[rows] += np.dot(U, np.dot(V, v[cols]))
+        return p
+
+    def quadratic_form(self, v):
+        """Computes ``v^H * Z * v``.
+        """
+        v = np.asarray(v, dtype=np.complex128)
+        return np.vdot(v, self.matvec(v))
+
+    def to_dense(self):
+        Z = np.zeros(self.shape, dtype=np.complex128)
+        for rows, cols, B in self.dense_blocks:
+            Z[np.ix_(rows, cols)] = B
+        for rows, cols, U, V in self.lowrank_blocks:
+            Z[np.ix_(rows, cols)] = np.dot(U, V)
+        return Z
+
+
+def calculate_pressure_hmatrix_np(ks, rho, c, s, face_centers, V, tol=1e-4, leaf_size=64):
+    """H-matrix version of ``calculate_pressure_batch_np``, one ``HMatrix`` per frequency.
+    """
+    ks = np.asarray(ks, dtype=np.float64).reshape(-1)
+    V = np.asarray(V, dtype=np.complex128).reshape(ks.shape[0], -1)
+    P = np.empty(V.shape, dtype=np.complex128)
+    for i, k in enumerate(ks):
+        Z = HMatrix(k, rho, c, s, face_centers, tol=tol, leaf_size=leaf_size)
+        P[i] = Z.matvec(V[i])
+    return P
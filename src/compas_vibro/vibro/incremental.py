@@ -0,0 +1,146 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+from collections import OrderedDict
+
+try:
+    import numpy as np
+except:
+    pass
+
+from compas_vibro.vibro.rayleigh import RADIATION_MAX_MEMORY
+from compas_vibro.vibro.rayleigh import calculate_pressure_blocked_np
+from compas_vibro.vibro.rayleigh import calculate_radiation_block_np
+from compas_vibro.vibro.rayleigh import calculate_rayleigh_rad_power_batch_np
+
+
+__author__     = ['Tomas Mendez Echenagucia <tmendeze@uw.edu>']
+__copyright__  = 'Copyright 2020, Design Machine Group - University of Washington'
+__license__    = 'MIT License'
+__email__      = 'tmendeze@uw.edu'
+
+
+__all__ = ['IncrementalRadiation',
+           ]
+
+
+class IncrementalRadiation(object):
+    """Face pressures and radiated power of a baseline velocity vector at one
+    frequency, updated in O(N * |dv|) when only a few face velocities change.
+
+    Only the columns of the radiation matrix at the changed faces are used.
+    They are taken from ``Z`` when it is given, otherwise computed from the
+    face centers and kept in a column cache of at most ``max_memory`` bytes.
+
+    Parameters
+    ----------
+    k : float
+        Wavenumber.
+    rho : float
+        Density of air.
+    c : float
+        Speed of sound.
+    s : list
+        Radiating face areas.
+    face_centers : list
+        Radiating face centers.
+    v : list
+        Baseline complex face velocities.
+    Z : array, optional
+        Radiation matrix of ``calculate_radiation_matrix_np``, if already assembled.
+    max_memory : int, optional
+        Bytes of the column cache, defaults to ``RADIATION_MAX_MEMORY``.
+    """
+
+    def __init__(self, k, rho, c, s, face_centers, v, Z=None, max_memory=None):
+
+        self.k              = k
+        self.rho            = rho
+        self.c              = c
+        self.s              = np.asarray(s, dtype=np.float64)
+        self.face_centers   = np.asarray(face_centers, dtype=np.float64)
+        self.Z              = Z
+        self.max_memory     = RADIATION_MAX_MEMORY if max_memory is None else max_memory
+        self.columns        = OrderedDict()
+        self.v              = np.array(v, dtype=np.complex128).reshape(-1)
+        if Z is None:
+            self.p = calculate_pressure_blocked_np([k], rho, c, self.s, self.face_centers, self.v[None, :],
+                                                   max_memory=self.max_memory)[0]
+        else:
+            self.p = np.dot(Z, self.v)
+        self._power()
+
+    def __str__(self):
+        return 'IncrementalRadiation {0} faces, k {1}, W {2}, {3} cached columns'.format(
+            self.s.shape[0], self.k, self.W_tot, len(self.columns))
+
+    def _power(self):
+        W, W_tot = calculate_rayleigh_rad_power_batch_np(self.s, self.p[None, :], self.v[None, :])
+        self.W = W[0]
+        self.W_tot = float(W_tot[0])
+
+    def radiation_columns(self, indices):
+        """Columns ``Z[:, indices]`` of the radiation matrix.
+        """
+        indices = np.asarray(indices, dtype=int).reshape(-1)
+        if self.Z is not None:
+            return self.Z[:, indices]
+
+        missing = [j for j in indices.tolist() if j not in self.columns]
+        if missing:
+            rows = np.arange(self.s.shape[0])
+            Zc = calculate_radiation_block_np(self.k, self.rho, self.c, self.s, self.face_centers, rows, missing)
+            for i, j in enumerate(missing):
+                self.columns[j] = Zc[:, i].copy()
+        C = np.empty((self.s.shape[0], indices.shape[0]), dtype=np.complex128)
+        for i, j in enumerate(indices.tolist()):
+            self.columns[j] = self.columns.pop(j)
+            C[:, i] = self.columns[j]
+
+        max_columns = max(indices.shape[0], int(self.max_memory // (16 * self.s.shape[0])))
+        while len(self.columns) > max_columns:
+            self.columns.popitem(last=False)
+        return C
+
+    def delta(self, indices, dv):
+        """Pressures and total power for the baseline plus ``dv`` at faces
+        ``indices``, without changing the baseline.
+
+        Parameters
+        ----------
+        indices : list
+            Indices of the faces whose velocity changes.
+        dv : list
+            Complex velocity changes at those faces.
+
+        Returns
+        -------
+        array
+            Complex face pressures.
+        float
+            Total radiated power.
+        """
+        indices = np.asarray(indices, dtype=int).reshape(-1)
+        dv = np.asarray(dv, dtype=np.complex128).reshape(-1)
+        p = self.p + np.dot(self.radiation_columns(indices), dv)
+        v = self.v.copy()
+        np.add.at(v, indices, dv)
+        W_tot = calculate_rayleigh_rad_power_batch_np(self.s, p[None, :], v[None, :])[1]
+        return p, float(W_tot[0])
+
+    def update(self, indices, dv):
+        """Adds ``dv`` to the baseline velocities at faces ``indices`` and
+        updates the pressures and powers.
+
+        Returns
+        -------
+        float
+            Total radiated power of the new baseline.
+        """
+        indices = np.asarray(indices, dtype=int).reshape(-1)
+        dv = np.asarray(dv, dtype=np.complex128).reshape(-1)
+        self.p += np.dot(self.radiation_columns(indices), dv)
+        np.add.at(self.v, indices, dv)
+        self._power()
+        return self.W_tot
@@ -10,12 +10,16 @@ except:
     pass
 
 import os
+import shutil
 import compas_vibro
 from compas_vibro.structure.load import PointLoad
-from compas_vibro.vibro.rayleigh import calculate_radiation_matrix_np
-from compas_vibro.vibro.utilities import calculate_distance_matrix_np
-from compas_vibro.vibro.utilities import make_area_matrix
-from compas_vibro.vibro.utilities import make_diagonal_area_matrix
+from compas_vibro.fea.utilities.scheduler import job_workers
+from compas_vibro.fea.utilities.scheduler import isolated_structure
+from compas_vibro.fea.utilities.scheduler import run_jobs
+from compas_vibro.vibro.cache import GEOMETRY_CACHE
+from compas_vibro.vibro.cache import geometry_key
+from compas_vibro.vibro.cache import cached_distance_matrix_np
+from compas_vibro.vibro.workspace import RadiationWorkspace
 
 from compas.geometry import length_vector
 from compas.utilities import geometric_key
@@ -23,8 +27,28 @@ from compas.utilities import geometric_key
 
 #TODO: Should this function output the velocities for all nodes or just rad nodes?
 
-def compute_mobility_matrices(structure, freq_list, fx, fy, fz, damping=.02, backend='ansys', write_files=False):
+def compute_mobility_matrices(structure, freq_list, fx, fy, fz, damping=.02, backend='ansys', write_files=False,
+                              method='fea', workers=None, licenses=None, exe=None):
     #TODO: SHould this function output the velocities for all nodes or just rad nodes?
+    if method == 'fea' and (workers or licenses):
+        mob_mats = compute_mobility_matrices_concurrent(structure, freq_list, fx, fy, fz, damping=damping,
+                                                        backend=backend, workers=workers, licenses=licenses,
+                                                        exe=exe)
+        if write_files:
+            write_mob_mat_files(structure, freq_list, mob_mats, write_files)
+        return mob_mats
+    if method == 'modal' or method == 'cases':
+        if method == 'modal':
+            mob_mats = compute_mobility_matrices_modal(structure, freq_list, fx, fy, fz, damping=damping)
+        else:
+            H = structure.analyze_harmonic_mobility(freq_list, fx, fy, fz, damping=damping, backend=backend, exe=exe)
+            mob_mats = list(H)
+        if write_files:
+            write_mob_mat_files(structure, freq_list, mob_mats, write_files)
+        return mob_mats
+    elif method != 'fea':
+        raise NameError('This mobility method is not implemented')
+
     rad_nks = structure.radiating_nodes()
     inc_nks = structure.incident_nodes()
 
@@ -39,14 +63,11 @@ def compute_mobility_matrices(structure, freq_list, fx, fy, fz, damping=.02, bac
         structure.analyze_harmonic(freq_list,
                                    fields=['u'],
                                    backend=backend, 
-                                   damping=damping)
+                                   damping=damping,
+                                   exe=exe)
         fkeys = structure.results['harmonic']
         for fkey in fkeys:
-            structure.results['harmonic'][fkey].compute_node_velocities()
-            vr = [structure.results['harmonic'][fkey].velocities[nkey].real for nkey in rad_nks]
-            vi = [structure.results['harmonic'][fkey].velocities[nkey].imag for nkey in rad_nks]
-            v = [complex(vr[j], vi[j]) for j in range(len(vr))]
-            v = [vi / fvl for vi in v]
+            v = structure.results['harmonic'][fkey].velocity_array(rad_nks) / fvl
             mm[fkey].append(v)
 
     mob_mats = []
@@ -59,6 +80,132 @@ def compute_mobility_matrices(structure, freq_list, fx, fy, fz, damping=.02, bac
     return mob_mats
 
 
+def compute_mobility_matrices_concurrent(structure, freq_list, fx, fy, fz, damping=.02, backend='ansys',
+                                         workers=None, licenses=None, exe=None, cpus_per_job=4, keep_files=False):
+    """Mobility matrices of ``compute_mobility_matrices`` with the harmonic
+    analyses of the incident nodes running at the same time.
+
+    Every incident node is a job on an ``isolated_structure``, named
+    ``<name>_inc_<i>`` in its own folder ``<path>/<name>_jobs/inc_<i>``, so
+    that the solver runs do not share or delete each other's files. Jobs
+    run in a process pool of ``job_workers(workers, cpus_per_job, licenses)``
+    and the results are put back in the order of the incident nodes. If a
+    job fails its error is raised, after the job folders are removed.
+
+    Parameters
+    ----------
+    structure : obj
+        Structure object.
+    freq_list : list
+        Frequencies.
+    fx, fy, fz : float
+        Components of the point load.
+    damping : float
+        Damping ratio.
+    backend : str
+        FE backend.
+    workers : int, optional
+        Maximum number of jobs at once, all cores by default.
+    licenses : int, optional
+        Number of solver licenses available.
+    exe : str, optional
+        Solver executable, see ``ansys_launch_process``.
+    cpus_per_job : int
+        Cores used by each solver run, ``ansys_harmonic`` uses 4.
+    keep_files : bool
+        Keep the job folders after reading their results.
+
+    Returns
+    -------
+    list
+        Complex mobility matrices (n_inc x n_rad), one per frequency.
+    """
+    rad_nks = structure.radiating_nodes()
+    inc_nks = structure.incident_nodes()
+    root = os.path.join(structure.path, '{}_jobs'.format(structure.name))
+
+    jobs = []
+    for i, ink in enumerate(inc_nks):
+        s = isolated_structure(structure, '{}_inc_{}'.format(structure.name, i), os.path.join(root, 'inc_{}'.format(i)))
+        jobs.append((s, ink, rad_nks, freq_list, fx, fy, fz, damping, backend, exe, keep_files))
+    num = job_workers(workers, cpus_per_job, licenses)
+    try:
+        V = run_jobs(_mobility_job, jobs, workers=num)
+    finally:
+        if not keep_files:
+            shutil.rmtree(root, ignore_errors=True)
+    return list(np.transpose(np.array(V), (1, 0, 2)))
+
+
+def _mobility_job(structure, ink, rad_nks, freq_list, fx, fy, fz, damping, backend, exe, keep_files):
+    # velocities of the radiating nodes (n_freq x n_rad) for a load at ink
+    load = PointLoad(name='pload', nodes=[ink], x=fx, y=fy, z=fz, xx=0, yy=0, zz=0)
+    structure.add(load)
+    structure.analyze_harmonic(freq_list, fields=['u'], backend=backend, damping=damping, exe=exe)
+    fvl = length_vector([fx, fy, fz])
+    fkeys = sorted(structure.results['harmonic'])
+    V = np.array([structure.results['harmonic'][fkey].velocity_array(rad_nks) / fvl for fkey in fkeys])
+    if not keep_files:
+        shutil.rmtree(structure.path, ignore_errors=True)
+    return V
+
+
+def compute_mobility_matrices_modal(structure, freq_list, fx, fy, fz, damping=.02, modes=None):
+    """Mobility matrices by modal synthesis, from the shapes and frequencies
+    of ``results['modal']`` instead of one harmonic analysis per incident node.
+
+    The displacements of the radiating nodes for a load at each incident
+    node are ``Phi_rad * diag(1 / (w_m^2 - w^2 + 2j * damping * w_m * w)) *
+    Phi_inc^T * F`` for mass normalized mode shapes, one matrix product per
+    frequency for all node pairs. They are turned into velocities as in
+    ``Result.velocity_array``, so the matrices match those of
+    ``compute_mobility_matrices`` up to the modal truncation.
+
+    Parameters
+    ----------
+    structure : obj
+        Structure object with modal results, displacements included.
+    freq_list : list
+        Frequencies.
+    fx, fy, fz : float
+        Components of the point load.
+    damping : float
+        Modal damping ratio.
+    modes : list, optional
+        Keys of the modes, all modal results by default.
+
+    Returns
+    -------
+    list
+        Complex mobility matrices (n_inc x n_rad), one per frequency.
+    """
+    rad_nks = structure.radiating_nodes()
+    inc_nks = structure.incident_nodes()
+    if modes is None:
+        modes = sorted(structure.results['modal'])
+
+    wm = 2 * np.pi * np.array([float(structure.results['modal'][mk].frequency) for mk in modes])
+    Phi_rad = np.empty((len(modes), len(rad_nks), 3))
+    Phi_inc = np.empty((len(modes), len(inc_nks), 3))
+    for j, mk in enumerate(modes):
+        d = structure.results['modal'][mk].displacements
+        Phi_rad[j] = [[d['ux'][nk], d['uy'][nk], d['uz'][nk]] for nk in rad_nks]
+        Phi_inc[j] = [[d['ux'][nk], d['uy'][nk], d['uz'][nk]] for nk in inc_nks]
+
+    fvl = length_vector([fx, fy, fz])
+    a = np.dot(Phi_inc, [fx, fy, fz]).T
+    Phi_rad = Phi_rad.reshape(len(modes), -1)
+
+    mob_mats = []
+    for f in freq_list:
+        w = 2 * np.pi * float(f)
+        g = 1. / (wm ** 2 - w ** 2 + 2j * damping * wm * w)
+        U = np.dot(a * g, Phi_rad).reshape(len(inc_nks), len(rad_nks), 3)
+        x = np.linalg.norm(U.real, axis=2) + 1j * np.linalg.norm(U.imag, axis=2)
+        mob_mats.append(w * x * 1j / fvl)
+    return mob_mats
+
+
 def write_mob_mat_files(structure, freq_list, mob_mats, files_path):
     #TODO: SHould this function output the velocities for all nodes or just rad nodes?
     if not os.path.isdir(files_path):
@@ -88,23 +235,22 @@ def write_mob_mat_files(structure, freq_list, mob_mats, files_path):
                 fh.close()
 
 
-def compute_radiation_matrices(structure):
+def compute_radiation_matrices(structure, freq_list=None):
     rad_mesh = structure.radiating_mesh()
     rad_nks = structure.radiating_nodes()
     node_xyz = [structure.node_xyz(nk) for nk in rad_nks]
-    fkeys = structure.results['harmonic']
+    if freq_list is None:
+        freq_list = [structure.results['harmonic'][fkey].frequency for fkey in structure.results['harmonic']]
 
     areas = [rad_mesh.vertex_area(nk) for nk in rad_nks]
-    S = make_area_matrix(areas)
-    D = calculate_distance_matrix_np(node_xyz)
-    
+    D = cached_distance_matrix_np(node_xyz)
+    workspace = RadiationWorkspace(structure.rho, structure.c, areas, D)
+
     rms = []
-    for fkey in fkeys:
-        f = structure.results['harmonic'][fkey].frequency
+    for f in freq_list:
         wlen = structure.c / f
         k = (2. * np.pi) / wlen
-        Z = calculate_radiation_matrix_np(k, structure.rho, structure.c, S, D)
-        rms.append(Z)
+        rms.append(workspace.radiation_matrix(k).copy())
     return rms
 
 
@@ -115,30 +261,29 @@ def compute_radiation_matrices_measured(rad_mesh, frequencies, c, rho):
     node_xyz = [rad_mesh.vertex_coordinates(nk) for nk in rad_nks]
 
     areas = [rad_mesh.vertex_area(nk) for nk in rad_nks]
-    S = make_area_matrix(areas)
-    D = calculate_distance_matrix_np(node_xyz)
+    D = cached_distance_matrix_np(node_xyz)
+    workspace = RadiationWorkspace(rho, c, areas, D)
 
     rms = []
     for f in frequencies:
         wlen = c / f
         k = (2. * np.pi) / wlen
-        Z = calculate_radiation_matrix_np(k, rho, c, S, D)
-        rms.append(Z)
+        rms.append(workspace.radiation_matrix(k).copy())
     return rms
 
 
-def compute_cross_spectral_matrices(structure):
+def compute_cross_spectral_matrices(structure, freq_list=None):
     # rad_nks = structure.radiating_nodes()
     inc_nks = structure.incident_nodes()
 
     # node_xyz = [structure.node_xyz(nk) for nk in rad_nks]
     node_xyz = [structure.node_xyz(nk) for nk in inc_nks]
+    if freq_list is None:
+        freq_list = [structure.results['harmonic'][fkey].frequency for fkey in structure.results['harmonic']]
 
-    D = calculate_distance_matrix_np(node_xyz)
-    fkeys = structure.results['harmonic']
+    D = cached_distance_matrix_np(node_xyz)
     csm = []
-    for fkey in fkeys:
-        f = structure.results['harmonic'][fkey].frequency
+    for f in freq_list:
         wlen = structure.c / f
         k = (2. * np.pi) / wlen
         Gd = np.sin(k * np.abs(D)) / k * np.abs(D)
@@ -150,7 +295,7 @@ def compute_cross_spectral_matrices(structure):
 def compute_cross_spectral_matrices_measured(inc_mesh, frequencies, c):
     inc_nks = list(inc_mesh.vertices())
     node_xyz = [inc_mesh.vertex_coordinates(nk) for nk in inc_nks]
-    D = calculate_distance_matrix_np(node_xyz)
+    D = cached_distance_matrix_np(node_xyz)
 
     csm = []
     for f in frequencies:
@@ -162,15 +307,184 @@ def compute_cross_spectral_matrices_measured(inc_mesh, frequencies, c):
     return csm
 
 
+def calculate_cross_spectral_factors_np(k, D, tol=1e-10):
+    """Truncated factorization ``Gd = I + L * diag(sign) * L^T`` of the cross
+    spectral matrix of ``compute_cross_spectral_matrices``.
+
+    The off-diagonal part ``sin(k * D) / k * D`` is of low numerical rank at
+    low frequencies, the unit diagonal is kept apart. Since that part is
+    symmetric but not positive definite, its eigenvalues are kept with their
+    sign, those under ``tol`` times the largest are dropped.
+
+    Returns
+    -------
+    array
+        Factor ``L`` (m x r).
+    array
+        Signs of the kept eigenvalues (r).
+    """
+    D = np.array(D, dtype=np.float64)
+    np.fill_diagonal(D, 0)
+    G = np.sin(k * D) / k * D
+    w, U = np.linalg.eigh(G)
+    keep = np.abs(w) > tol * np.max(np.abs(w))
+    L = U[:, keep] * np.sqrt(np.abs(w[keep]))
+    return L, np.sign(w[keep])
+
+
+def cached_cross_spectral_factors(node_xyz, freq_list, c, tol=1e-10, cache=None):
+    """``calculate_cross_spectral_factors_np`` of every frequency, kept in a
+    ``GeometryCache``, ``GEOMETRY_CACHE`` by default, keyed on the incident
+    node coordinates and the wavenumber. Transmission loss runs on the same
+    incident mesh reuse them.
+
+    Returns
+    -------
+    list
+        ``(L, sign)`` per frequency.
+    """
+    if cache is None:
+        cache = GEOMETRY_CACHE
+    D = None
+    factors = []
+    for f in freq_list:
+        k = (2. * np.pi) / (c / f)
+        key = 'cross_spectral_{}'.format(geometry_key(node_xyz, [k, tol]))
+        L = cache.get(key + '_factor')
+        sign = cache.get(key + '_sign')
+        if L is None or sign is None:
+            if D is None:
+                D = cached_distance_matrix_np(node_xyz, cache=cache)
+            L, sign = calculate_cross_spectral_factors_np(k, D, tol=tol)
+            L = cache.put(key + '_factor', L)
+            sign = cache.put(key + '_sign', sign)
+        factors.append((L, sign))
+    return factors
+
+
+def compute_cross_spectral_factors(structure, freq_list=None, tol=1e-10):
+    inc_nks = structure.incident_nodes()
+    node_xyz = [structure.node_xyz(nk) for nk in inc_nks]
+    if freq_list is None:
+        freq_list = [structure.results['harmonic'][fkey].frequency for fkey in structure.results['harmonic']]
+    return cached_cross_spectral_factors(node_xyz, freq_list, structure.c, tol=tol)
+
+
+def compute_cross_spectral_factors_measured(inc_mesh, frequencies, c, tol=1e-10):
+    inc_nks = list(inc_mesh.vertices())
+    node_xyz = [inc_mesh.vertex_coordinates(nk) for nk in inc_nks]
+    return cached_cross_spectral_factors(node_xyz, frequencies, c, tol=tol)
+
+
+def calculate_mobility_power_trace_np(rad_mats, mob_mats, spec_mats, areas_rad=None, areas_inc=None):
+    """Trace of ``Re(dS_rad * Z * H * dS_inc * Gd * dS_inc * H^H)`` for every
+    frequency, the power term of the mobility based transmission loss.
+
+    The diagonal area matrices are applied as row and column scalings and the
+    trace is taken as the element-wise sum of ``dS_rad * Z * H`` with the
+    conjugate of ``H * dS_inc * Gd * dS_inc``, since ``Gd`` is real and
+    symmetric. Only ``Z * H`` is a full product, so a frequency costs
+    O(N^2 * m) instead of several O(N^3) products, with N radiating and m
+    incident nodes.
+
+    Parameters
+    ----------
+    rad_mats : list
+        Radiation matrices, one (N x N) per frequency.
+    mob_mats : list
+        Mobility matrices, one (m x N) per frequency.
+    spec_mats : list
+        Cross spectral matrices, one (m x m) per frequency.
+    areas_rad : list, optional
+        Areas of the radiating nodes, ones by default.
+    areas_inc : list, optional
+        Areas of the incident nodes, ones by default.
+
+    Returns
+    -------
+    array
+        Traces (n_freq).
+    """
+    Z = np.asarray(rad_mats)
+    H = np.transpose(np.asarray(mob_mats), (0, 2, 1))
+    Gd = np.asarray(spec_mats)
+    if areas_rad is None:
+        areas_rad = np.ones(H.shape[1])
+    if areas_inc is None:
+        areas_inc = np.ones(H.shape[2])
+    s_rad = np.asarray(areas_rad, dtype=np.float64)
+    s_inc = np.asarray(areas_inc, dtype=np.float64)
+
+    ZH = np.matmul(Z, H)
+    HW = np.einsum('fri,i,fij,j->frj', H, s_inc, Gd, s_inc, optimize=True)
+    return np.real(np.einsum('r,frj,frj->f', s_rad, ZH, np.conjugate(HW), optimize=True))
+
+
+def calculate_mobility_power_factored_np(rad_mats, mob_mats, spec_factors, areas_rad=None, areas_inc=None,
+                                         spec_mats=None):
+    """Same as ``calculate_mobility_power_trace_np`` with the cross spectral
+    matrices given as the factors of ``cached_cross_spectral_factors``.
+
+    With ``W = dS_inc * Gd * dS_inc = dS_inc^2 + Y * diag(sign) * Y^T`` and
+    ``Y = dS_inc * L``, the trace is the unit diagonal term plus the sum of
+    ``Z * H * Y`` with the conjugate of ``H * Y``, thin (N x r) matrices.
+    ``H * W`` is not formed, which saves O(N * m^2) per frequency.
+
+    Without factors, as when none are cached and a single run would not pay
+    for the eigendecompositions, the dense cross spectral matrices
+    ``spec_mats`` go through ``calculate_mobility_power_trace_np``.
+
+    Parameters
+    ----------
+    rad_mats : list
+        Radiation matrices, one (N x N) per frequency.
+    mob_mats : list
+        Mobility matrices, one (m x N) per frequency.
+    spec_factors : list
+        ``(L, sign)`` per frequency, or None to use ``spec_mats``.
+    areas_rad : list, optional
+        Areas of the radiating nodes, ones by default.
+    areas_inc : list, optional
+        Areas of the incident nodes, ones by default.
+    spec_mats : list, optional
+        Cross spectral matrices, one (m x m) per frequency, used without
+        ``spec_factors``.
+
+    Returns
+    -------
+    array
+        Traces (n_freq).
+    """
+    if spec_factors is None:
+        if spec_mats is None:
+            raise ValueError('Either spec_factors or spec_mats are needed')
+        return calculate_mobility_power_trace_np(rad_mats, mob_mats, spec_mats, areas_rad, areas_inc)
+    Z = np.asarray(rad_mats)
+    H = np.transpose(np.asarray(mob_mats), (0, 2, 1))
+    if areas_rad is None:
+        areas_rad = np.ones(H.shape[1])
+    if areas_inc is None:
+        areas_inc = np.ones(H.shape[2])
+    s_rad = np.asarray(areas_rad, dtype=np.float64)
+    s_inc = np.asarray(areas_inc, dtype=np.float64)
+
+    ZH = np.matmul(Z, H)
+    traces = np.einsum('r,frj,frj,j->f', s_rad, ZH, np.conjugate(H), s_inc ** 2, optimize=True)
+    for i, (L, sign) in enumerate(spec_factors):
+        Y = s_inc[:, None] * L
+        traces[i] += np.einsum('rq,rq,q,r->', np.matmul(ZH[i], Y), np.conjugate(np.matmul(H[i], Y)), sign, s_rad)
+    return np.real(traces)
+
+
 def compute_mobility_based_r(structure, freq_list, damping, fx, fy, fz, backend='ansys', 
-                             num_modes=20, write_files=False):
+                             num_modes=20, write_files=False, method='fea'):
     
     structure.analyze_modal(['u'], backend=backend, num_modes=num_modes)
 
     mob_mats = compute_mobility_matrices(structure, freq_list, fx, fy, fz,
-                                         damping=damping, write_files=write_files)
-    rad_mats = compute_radiation_matrices(structure)
-    spec_mats = compute_cross_spectral_matrices(structure)
+                                         damping=damping, write_files=write_files, method=method)
+    rad_mats = compute_radiation_matrices(structure, freq_list)
+    spec_factors = compute_cross_spectral_factors(structure, freq_list)
     rad_mesh = structure.radiating_mesh()
     rad_nks = structure.radiating_nodes()
     inc_mesh = structure.inc_mesh
@@ -182,70 +496,26 @@ def compute_mobility_based_r(structure, freq_list, damping, fx, fy, fz, backend=
         gk_dict = {geometric_key(inc_mesh.vertex_coordinates(nk)): nk for nk in inc_mesh.vertices()}
         inc_nks_ = [gk_dict[geometric_key(structure.node_xyz(nk))] for nk in inc_nks]
         areas_inc = [inc_mesh.vertex_area(nk) for nk in inc_nks_]
-        dS_inc = make_diagonal_area_matrix(areas_inc)
-        S_inc = np.trace(dS_inc)
-
+        S_inc = np.sum(areas_inc)
         areas_rad = [rad_mesh.vertex_area(nk) for nk in rad_nks]
-        dS_rad = make_diagonal_area_matrix(areas_rad)
-        # S_rad = np.trace(dS_rad)
-        
-        # print('area check', S_inc, S_rad)
-
-        rho = structure.rho
-        c = structure.c
-
-        freqs = []
-        rs = []
-        structure.results['mob_radiation'] = {}
-        for i, fkey in enumerate(structure.results['harmonic']):
-            f = structure.results['harmonic'][fkey].frequency
-            H = mob_mats[i].transpose()
-            H_ = np.conjugate(np.transpose(H))
-            Z = rad_mats[i]
-            Gd = spec_mats[i]
-
-            A = np.matmul(Z, H)
-            A1 = np.matmul(A, dS_inc)
-            B = np.matmul(A1, Gd)
-            C = np.matmul(B, dS_inc)
-            D = np.matmul(C, H_)
-            E = np.matmul(dS_rad, np.real(D))
-            F = ((8 * rho * c ) / S_inc) * np.trace(E)
-            R = -10 * np.log10(F)
-        
-            freqs.append(f)
-            rs.append(R)
-
-            structure.results['mob_radiation'][fkey] = compas_vibro.structure.result.Result(f) 
-            structure.results['mob_radiation'][fkey].radiated_p = R
+        traces = calculate_mobility_power_factored_np(rad_mats, mob_mats, spec_factors, areas_rad, areas_inc)
+        F = ((8 * structure.rho * structure.c) / S_inc) * traces
     else:
-
         areas_ = [rad_mesh.vertex_area(nk) for nk in rad_nks]
-        dS_rad = make_diagonal_area_matrix(areas_)
-        S_rad = np.trace(dS_rad)
-
-        rho = structure.rho
-        c = structure.c
-        
-        freqs = []
-        rs = []
-        structure.results['mob_radiation'] = {}
-        for i, fkey in enumerate(structure.results['harmonic']):
-            f = structure.results['harmonic'][fkey].frequency
-            H = mob_mats[i].transpose()
-            H_ = np.conjugate(np.transpose(H))
-            Z = rad_mats[i]
-            Gd = spec_mats[i]
-
-            E = np.real(np.matmul(np.matmul(np.matmul(Z, H), Gd), H_))
-            F = ((8 * rho * c ) / S_rad**2) * np.trace(E) 
-            R = -10 * np.log10(F)
-
-            freqs.append(f)
-            rs.append(R)
-            
-            structure.results['mob_radiation'][fkey] = compas_vibro.structure.result.Result(f) 
-            structure.results['mob_radiation'][fkey].radiated_p = R
+        S_rad = np.sum(areas_)
+        traces = calculate_mobility_power_factored_np(rad_mats, mob_mats, spec_factors)
+        F = ((8 * structure.rho * structure.c) / S_rad**2) * traces
+
+    R = -10 * np.log10(F)
+    freqs = list(freq_list)
+    rs = [float(r) for r in R]
+    fkeys = list(structure.results.get('harmonic') or {})
+    if len(fkeys) != len(freq_list):
+        fkeys = list(range(len(freq_list)))
+    structure.results['mob_radiation'] = {}
+    for i, fkey in enumerate(fkeys):
+        structure.results['mob_radiation'][fkey] = compas_vibro.structure.result.Result(freqs[i])
+        structure.results['mob_radiation'][fkey].radiated_p = rs[i]
 
     return freqs, rs
 
@@ -277,7 +547,7 @@ def compute_mobility_based_r_measured(data, folders, rad_mesh, inc_mesh, c, rho)
 
 
     rad_mats = compute_radiation_matrices_measured(rad_mesh, frequencies, c, rho)
-    spec_mats = compute_cross_spectral_matrices_measured(inc_mesh, frequencies, c)
+    spec_factors = compute_cross_spectral_factors_measured(inc_mesh, frequencies, c)
 
     bnks = rad_mesh.vertices_on_boundary()
     rad_nks = [nk for nk in rad_mesh.vertices() if nk not in bnks]
@@ -286,33 +556,14 @@ def compute_mobility_based_r_measured(data, folders, rad_mesh, inc_mesh, c, rho)
     gk_dict = {geometric_key(inc_mesh.vertex_coordinates(nk)): nk for nk in inc_mesh.vertices()}
     inc_nks_ = [gk_dict[geometric_key(inc_mesh.vertex_coordinates(nk))] for nk in inc_nks]
     areas_inc = [inc_mesh.vertex_area(nk) for nk in inc_nks_]
-    dS_inc = make_diagonal_area_matrix(areas_inc)
-    S_inc = np.trace(dS_inc)
-
     areas_rad = [rad_mesh.vertex_area(nk) for nk in rad_nks]
-    dS_rad = make_diagonal_area_matrix(areas_rad)
-    S_rad = np.trace(dS_rad)
-
-    freqs = []
-    rs = []
-    for i, f in enumerate(frequencies):
-        H = mob_mats[i].transpose()
-        H_ = np.conjugate(np.transpose(H))
-        Z = rad_mats[i]
-        Gd = spec_mats[i]
-
-        A = np.matmul(Z, H)
-        A1 = np.matmul(A, dS_inc)
-        B = np.matmul(A1, Gd)
-        C = np.matmul(B, dS_inc)
-        D = np.matmul(C, H_)
-        E = np.matmul(dS_rad, np.real(D))
-        # F = ((8 * rho * c ) / S_inc) * np.trace(E)
-        F = ((8 * rho * c ) / S_rad) * np.trace(E)
-        R = -10 * np.log10(F)
-    
-        freqs.append(f)
-        rs.append(R)
+    S_rad = np.sum(areas_rad)
+
+    traces = calculate_mobility_power_factored_np(rad_mats, mob_mats, spec_factors, areas_rad, areas_inc)
+    F = ((8 * rho * c ) / S_rad) * traces
+    R = -10 * np.log10(F)
+    freqs = list(frequencies)
+    rs = [float(r) for r in R]
     return freqs, rs
 
 
@@ -350,7 +601,7 @@ def compute_mobility_based_r_measured_fea(data, folders, rad_mesh, inc_mesh, c,
 
 
     rad_mats = compute_radiation_matrices_measured(rad_mesh, frequencies, c, rho)
-    spec_mats = compute_cross_spectral_matrices_measured(inc_mesh, frequencies, c)
+    spec_factors = compute_cross_spectral_factors_measured(inc_mesh, frequencies, c)
 
     # print('num freq', num_freq)
     # print('num rad vertices', rad_mesh.number_of_vertices())
@@ -367,39 +618,15 @@ def compute_mobility_based_r_measured_fea(data, folders, rad_mesh, inc_mesh, c,
 
     gk_dict = {geometric_key(inc_mesh.vertex_coordinates(nk)): nk for nk in inc_mesh.vertices()}
     inc_nks_ = [gk_dict[geometric_key(inc_mesh.vertex_coordinates(nk))] for nk in inc_nks]
-    areas_inc = [inc_mesh.vertex_area(nk) for nk in inc_nks_]
-    dS_inc = make_diagonal_area_matrix(areas_inc)
-    dS_inc *= 1.5
-    S_inc = np.trace(dS_inc)
-
-    areas_rad = [rad_mesh.vertex_area(nk) for nk in rad_nks]
-    dS_rad = make_diagonal_area_matrix(areas_rad)
-    dS_rad *= 1.5
-    # S_rad = np.trace(dS_rad)
-
-    freqs = []
-    rs = []
-    for i, f in enumerate(frequencies):
-        H = mob_mats[i].transpose()
-        # H *= 2.
-        H_ = np.conjugate(np.transpose(H))
-        Z = rad_mats[i]
-        # Z *= 2.5
-        Gd = spec_mats[i]
-        # Gd *= .01
-
-
-        A = np.matmul(Z, H)
-        A1 = np.matmul(A, dS_inc)
-        B = np.matmul(A1, Gd)
-        C = np.matmul(B, dS_inc)
-        D = np.matmul(C, H_)
-        E = np.matmul(dS_rad, np.real(D))
-        F = ((8 * rho * c ) / S_inc) * np.trace(E)
-        R = -10 * np.log10(F)
-    
-        freqs.append(f)
-        rs.append(R)
+    areas_inc = 1.5 * np.array([inc_mesh.vertex_area(nk) for nk in inc_nks_])
+    S_inc = np.sum(areas_inc)
+    areas_rad = 1.5 * np.array([rad_mesh.vertex_area(nk) for nk in rad_nks])
+
+    traces = calculate_mobility_power_factored_np(rad_mats, mob_mats, spec_factors, areas_rad, areas_inc)
+    F = ((8 * rho * c ) / S_inc) * traces
+    R = -10 * np.log10(F)
+    freqs = list(frequencies)
+    rs = [float(r) for r in R]
     return freqs, rs
 
 
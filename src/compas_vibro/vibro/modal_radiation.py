@@ -0,0 +1,201 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+try:
+    import numpy as np
+except:
+    pass
+
+import compas_vibro
+
+from compas_vibro.vibro.rayleigh import calculate_wavenumbers_np
+from compas_vibro.vibro.chebyshev import ChebyshevRadiation
+from compas_vibro.vibro.cache import GEOMETRY_CACHE
+from compas_vibro.vibro.cache import geometry_key
+from compas_vibro.vibro.utilities import structure_face_surfaces
+from compas_vibro.vibro.utilities import structure_face_centers
+from compas_vibro.vibro.utilities import structure_face_normals
+from compas_vibro.vibro.utilities import structure_face_incidence_matrix
+
+
+__author__     = ['Tomas Mendez Echenagucia <tmendeze@uw.edu>']
+__copyright__  = 'Copyright 2020, Design Machine Group - University of Washington'
+__license__    = 'MIT License'
+__email__      = 'tmendeze@uw.edu'
+
+
+__all__ = ['compute_modal_rad_power_structure',
+           'structure_modal_face_shapes',
+           'structure_modal_coordinates',
+           'calculate_modal_resistance_np',
+           'calculate_modal_coordinate_rad_power_np',
+           ]
+
+
+def structure_modal_face_shapes(structure, modes=None):
+    """Normal displacements of the radiating faces for every mode shape, as
+    the average of the mode shape at their nodes along the face normal.
+
+    Parameters
+    ----------
+    structure : obj
+        Structure object with modal results.
+    modes : list, optional
+        Keys of the modes, all modal results by default.
+
+    Returns
+    -------
+    array
+        Mode shapes of the faces (n_faces x n_modes).
+    """
+    if modes is None:
+        modes = sorted(structure.results['modal'])
+    A, nkeys = structure_face_incidence_matrix(structure)
+    N = np.asarray(structure_face_normals(structure), dtype=np.float64)
+    Phi = np.empty((A.shape[0], len(modes)), dtype=np.float64)
+    for j, mk in enumerate(modes):
+        d = structure.results['modal'][mk].displacements
+        U = np.array([[d['ux'][nk], d['uy'][nk], d['uz'][nk]] for nk in nkeys], dtype=np.float64)
+        Phi[:, j] = np.sum((A * U) * N, axis=1)
+    return Phi
+
+
+def structure_modal_coordinates(structure, rkeys, modes):
+    """Complex modal coordinates (n_freq x n_modes) of mode superposition
+    harmonic results, see ``read_modal_coordinates``.
+    """
+    Q = np.empty((len(rkeys), len(modes)), dtype=np.complex128)
+    for i, rk in enumerate(rkeys):
+        mc = structure.results['harmonic'][rk].modal_coordinates
+        Q[i] = [mc[mk]['real'] + 1j * mc[mk]['imag'] for mk in modes]
+    return Q
+
+
+def calculate_modal_resistance_np(ks, rho, c, s, face_centers, Phi, tol=1e-6, cache=None):
+    """Modal radiation resistance matrices ``Phi^T * R(k) * Phi`` (n_freq x
+    n_modes x n_modes), with ``R`` the Hermitian resistance of
+    ``calculate_resistance_from_impedance``. With unequal face areas ``Z`` is
+    not symmetric, so the modal matrices are complex Hermitian rather than
+    real symmetric; ``q^H * R_modal * q`` is real either way.
+
+    ``Z(k) * Phi`` is interpolated across frequency with
+    ``ChebyshevRadiation.pressures_fixed``, since the mode shapes do not change
+    with frequency. The matrices are kept in a ``GeometryCache``,
+    ``GEOMETRY_CACHE`` by default, keyed on the geometry, mode shapes and
+    wavenumbers, so changing the damping or the loads reuses them.
+
+    Parameters
+    ----------
+    ks : list
+        Wavenumbers, one per frequency.
+    rho : float
+        Density of air.
+    c : float
+        Speed of sound.
+    s : list
+        Radiating face areas.
+    face_centers : list
+        Radiating face centers.
+    Phi : array
+        Mode shapes of the faces (n_faces x n_modes).
+    tol : float
+        Relative accuracy of the frequency interpolation.
+    cache : obj, optional
+        ``GeometryCache`` of the matrices.
+
+    Returns
+    -------
+    array
+        Modal resistance matrices (n_freq x n_modes x n_modes).
+    """
+    if cache is None:
+        cache = GEOMETRY_CACHE
+    ks = np.asarray(ks, dtype=np.float64).reshape(-1)
+    s = np.asarray(s, dtype=np.float64)
+    Phi = np.asarray(Phi, dtype=np.float64)
+    key = 'modal_resistance_{}'.format(geometry_key(face_centers, s, Phi, ks, [rho, c, tol]))
+    R = cache.get(key)
+    if R is None:
+        radiation = ChebyshevRadiation(rho, c, s, face_centers, tol=tol)
+        P = radiation.pressures_fixed(ks, Phi)
+        PhiP = np.einsum('im,fin->fmn', Phi, P)
+        PhiP_H = np.conjugate(np.transpose(PhiP, (0, 2, 1)))
+        R = np.sum(s) * (PhiP + PhiP_H) / (4. * int(np.sqrt(s.shape[0])))
+        R = cache.put(key, R)
+    return R
+
+
+def calculate_modal_coordinate_rad_power_np(R, Q, omegas):
+    """Total radiated power ``omega^2 * q^H * R_modal * q`` of the modal
+    coordinates of every frequency, in O(n_modes^2) per frequency.
+
+    Parameters
+    ----------
+    R : array
+        Modal resistance matrices (n_freq x n_modes x n_modes).
+    Q : array
+        Complex modal coordinates (n_freq x n_modes).
+    omegas : list
+        Angular frequencies.
+
+    Returns
+    -------
+    array
+        Total radiated power (n_freq).
+    """
+    omegas = np.asarray(omegas, dtype=np.float64)
+    w = np.einsum('fm,fmn,fn->f', np.conjugate(Q), R, Q)
+    return omegas ** 2 * np.real(w)
+
+
+def compute_modal_rad_power_structure(structure, modes=None, tol=1e-6, cache=None):
+    """Radiated power of mode superposition harmonic results, from the modal
+    coordinates of ``analyze_harmonic_super``.
+
+    Face velocities are the signed normal velocities ``1j * omega * Phi * q``,
+    so the power only needs the modal resistance matrices, computed once per
+    geometry and sweep by ``calculate_modal_resistance_np``. Running it again
+    after a change of damping or loads costs O(n_modes^2) per frequency.
+
+    ``compute_rad_power_structure`` uses node velocity magnitudes
+    (``|Re u| + 1j * |Im u|``) instead, which are not linear in the modal
+    coordinates. The two powers differ, so these are stored apart, as
+    ``results['modal_radiation']``. Only total powers are stored,
+    ``radiated_p_faces`` is left empty.
+
+    Parameters
+    ----------
+    structure : obj
+        Structure object with modal and ``'harmonic'`` results.
+    modes : list, optional
+        Keys of the modes, all modal results by default.
+    tol : float
+        Relative accuracy of the frequency interpolation.
+    cache : obj, optional
+        ``GeometryCache`` of the modal resistance matrices.
+
+    Returns
+    -------
+    array
+        Total radiated power (n_freq).
+    """
+    if modes is None:
+        modes = sorted(structure.results['modal'])
+    rkeys = list(structure.results['harmonic'].keys())
+    freqs = [structure.results['harmonic'][rk].frequency for rk in rkeys]
+    ks = calculate_wavenumbers_np(freqs, structure.c)
+
+    Phi = structure_modal_face_shapes(structure, modes)
+    s = structure_face_surfaces(structure)
+    face_centers = structure_face_centers(structure)
+    R = calculate_modal_resistance_np(ks, structure.rho, structure.c, s, face_centers, Phi, tol=tol, cache=cache)
+    Q = structure_modal_coordinates(structure, rkeys, modes)
+    W_tot = calculate_modal_coordinate_rad_power_np(R, Q, 2 * np.pi * np.asarray(freqs, dtype=np.float64))
+
+    structure.results['modal_radiation'] = {}
+    res = compas_vibro.structure.result.Result
+    for i, rk in enumerate(rkeys):
+        structure.results['modal_radiation'][rk] = res(freqs[i])
+        structure.results['modal_radiation'][rk].radiated_p = float(W_tot[i])
+    return W_tot
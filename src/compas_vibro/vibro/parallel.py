@@ -0,0 +1,246 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import os
+import warnings
+from contextlib import contextmanager
+
+try:
+    import numpy as np
+    from concurrent.futures import ProcessPoolExecutor
+    from concurrent.futures import ThreadPoolExecutor
+    from multiprocessing import get_context
+    from multiprocessing import shared_memory
+except:
+    pass
+
+try:
+    from threadpoolctl import threadpool_limits
+except ImportError:
+    threadpool_limits = None
+
+from compas_vibro.vibro.rayleigh import RADIATION_MAX_MEMORY
+from compas_vibro.vibro.rayleigh import RADIATION_BYTES_PER_ENTRY
+from compas_vibro.vibro.rayleigh import calculate_pressure_batch_np
+from compas_vibro.vibro.rayleigh import calculate_pressure_blocked_np
+from compas_vibro.vibro.cache import cached_distance_matrix_np
+
+
+__author__     = ['Tomas Mendez Echenagucia <tmendeze@uw.edu>']
+__copyright__  = 'Copyright 2020, Design Machine Group - University of Washington'
+__license__    = 'MIT License'
+__email__      = 'tmendeze@uw.edu'
+
+
+__all__ = ['SharedArrays',
+           'limit_blas_threads',
+           'calculate_pressure_parallel_np',
+           ]
+
+
+BLAS_THREAD_VARIABLES = ['OMP_NUM_THREADS',
+                         'OPENBLAS_NUM_THREADS',
+                         'MKL_NUM_THREADS',
+                         'VECLIB_MAXIMUM_THREADS',
+                         'NUMEXPR_NUM_THREADS',
+                         ]
+
+
+@contextmanager
+def limit_blas_threads(num):
+    """Limits the threads of the BLAS libraries to ``num`` inside the context.
+
+    Uses ``threadpoolctl`` when it is installed, which also works on libraries
+    already loaded. Otherwise the environment variables are set, which only
+    affect processes started inside the context.
+    """
+    if num is None:
+        yield
+        return
+    old = {name: os.environ.get(name) for name in BLAS_THREAD_VARIABLES}
+    for name in BLAS_THREAD_VARIABLES:
+        os.environ[name] = str(num)
+    try:
+        if threadpool_limits is not None:
+            with threadpool_limits(limits=num):
+                yield
+        else:
+            yield
+    finally:
+        for name, value in old.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+class SharedArrays(object):
+    """Numpy arrays published once in shared memory, so that worker processes
+    attach to them by name instead of receiving pickled copies.
+
+    Parameters
+    ----------
+    arrays : dict
+        Arrays to publish, by name.
+    """
+
+    def __init__(self, arrays):
+        self.blocks = []
+        self.spec = {}
+        for name, A in arrays.items():
+            A = np.ascontiguousarray(A)
+            block = shared_memory.SharedMemory(create=True, size=max(1, A.nbytes))
+            np.ndarray(A.shape, dtype=A.dtype, buffer=block.buf)[...] = A
+            self.blocks.append(block)
+            self.spec[name] = (block.name, A.shape, A.dtype.str)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @staticmethod
+    def attach(spec):
+        """Arrays of a ``spec``, and the blocks to close once done with them.
+        """
+        arrays = {}
+        blocks = []
+        for name, (block_name, shape, dtype) in spec.items():
+            block = shared_memory.SharedMemory(name=block_name)
+            arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+            blocks.append(block)
+        return arrays, blocks
+
+    def array(self, name):
+        block_name, shape, dtype = self.spec[name]
+        block = self.blocks[list(self.spec).index(name)]
+        return np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+
+    def close(self):
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
+
+
+def _init_worker(blas_threads):
+    if blas_threads is None:
+        return
+    for name in BLAS_THREAD_VARIABLES:
+        os.environ[name] = str(blas_threads)
+    if threadpool_limits is not None:
+        threadpool_limits(limits=blas_threads)
+
+
+def _radiation_worker(spec, rho, c, start, stop, max_memory, precision):
+    # pressures of frequencies start:stop, written into the shared P
+    arrays, blocks = SharedArrays.attach(spec)
+    try:
+        _radiation_chunk(arrays, rho, c, start, stop, max_memory, precision)
+    finally:
+        del arrays
+        for block in blocks:
+            block.close()
+
+
+def _radiation_chunk(arrays, rho, c, start, stop, max_memory, precision):
+    ks = arrays['ks'][start:stop]
+    V = arrays['V'][start:stop]
+    if 'D' in arrays:
+        P = calculate_pressure_batch_np(ks, rho, c, arrays['s'], arrays['D'], V,
+                                        max_memory=max_memory, precision=precision)
+    else:
+        P = calculate_pressure_blocked_np(ks, rho, c, arrays['s'], arrays['xyz'], V,
+                                          max_memory=max_memory, precision=precision)
+    arrays['P'][start:stop] = P
+
+
+def calculate_pressure_parallel_np(ks, rho, c, s, face_centers, V, workers=None, pool='process',
+                                   blas_threads=1, max_memory=None, precision='double'):
+    """Frequency parallel version of ``calculate_pressure_batch_np``.
+
+    Contiguous chunks of frequencies are fanned out to a pool of workers.
+    With processes, the face centers, areas, velocities, the distance matrix
+    (when it fits in ``max_memory``) and the output pressures are published
+    once in shared memory, so nothing of size N or N^2 is pickled. Processes
+    are spawned rather than forked, forking after the numba kernels of
+    ``compas_vibro.hpc`` are compiled can hang the interpreter at exit. Each
+    worker runs the dense or blocked engine with its share of ``max_memory``
+    and ``blas_threads`` BLAS threads, to avoid oversubscribing the cores.
+    Thread pools can only limit BLAS through ``threadpoolctl``, without it a
+    ``RuntimeWarning`` is raised and the threads are left as they are.
+
+    Parameters
+    ----------
+    ks : list
+        Wavenumbers, one per frequency.
+    rho : float
+        Density of air.
+    c : float
+        Speed of sound.
+    s : list
+        Radiating face areas.
+    face_centers : list
+        Radiating face centers.
+    V : array
+        Complex face velocities (n_freq x n_faces).
+    workers : int, optional
+        Number of workers, defaults to the number of CPUs.
+    pool : str
+        ``'process'`` or ``'thread'``.
+    blas_threads : int, optional
+        BLAS threads per worker, ``None`` to leave them as they are.
+    max_memory : int, optional
+        Bytes all workers may use together, defaults to ``RADIATION_MAX_MEMORY``.
+    precision : str
+        ``'double'`` or ``'single'``.
+
+    Returns
+    -------
+    array
+        Complex face pressures (n_freq x n_faces).
+    """
+    if max_memory is None:
+        max_memory = RADIATION_MAX_MEMORY
+    if workers is None:
+        workers = os.cpu_count() or 1
+    ks = np.asarray(ks, dtype=np.float64).reshape(-1)
+    s = np.asarray(s, dtype=np.float64)
+    V = np.asarray(V, dtype=np.complex128).reshape(ks.shape[0], s.shape[0])
+    xyz = np.asarray(face_centers, dtype=np.float64)
+    m = s.shape[0]
+
+    arrays = {'ks': ks, 's': s, 'xyz': xyz, 'V': V, 'P': np.zeros(V.shape, dtype=np.complex128)}
+    if 8 * m ** 2 + workers * RADIATION_BYTES_PER_ENTRY * m ** 2 <= max_memory:
+        arrays['D'] = cached_distance_matrix_np(xyz, precision=precision)
+    worker_memory = max(1, int(max_memory - arrays.get('D', s).nbytes) // workers)
+
+    step = max(1, int(np.ceil(ks.shape[0] / float(2 * workers))))
+    chunks = [(i, min(i + step, ks.shape[0])) for i in range(0, ks.shape[0], step)]
+
+    if pool == 'thread':
+        if blas_threads is not None and threadpool_limits is None:
+            warnings.warn('threadpoolctl is not installed, the BLAS threads of a thread pool are not limited',
+                          RuntimeWarning)
+        with limit_blas_threads(blas_threads):
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(_radiation_chunk, arrays, rho, c, a, b, worker_memory, precision)
+                           for a, b in chunks]
+                for future in futures:
+                    future.result()
+        return arrays['P']
+
+    elif pool == 'process':
+        # the workers inherit the BLAS variables when they are spawned
+        with SharedArrays(arrays) as shared, limit_blas_threads(blas_threads):
+            with ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn'),
+                                     initializer=_init_worker, initargs=(blas_threads,)) as executor:
+                futures = [executor.submit(_radiation_worker, shared.spec, rho, c, a, b, worker_memory,
+                                           precision) for a, b in chunks]
+                for future in futures:
+                    future.result()
+            return shared.array('P').copy()
+
+    raise NameError('This pool type is not implemented')
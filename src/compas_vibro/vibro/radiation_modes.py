@@ -0,0 +1,217 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+try:
+    import numpy as np
+except:
+    pass
+
+import compas_vibro
+
+from compas_vibro.vibro.rayleigh import calculate_radiation_matrix_np
+from compas_vibro.vibro.rayleigh import calculate_resistance_from_impedance
+from compas_vibro.vibro.rayleigh import eigenvalue_decomposition
+from compas_vibro.vibro.cache import GEOMETRY_CACHE
+from compas_vibro.vibro.cache import geometry_key
+from compas_vibro.vibro.cache import cached_area_matrix
+from compas_vibro.vibro.cache import cached_distance_matrix_np
+
+
+__author__     = ['Tomas Mendez Echenagucia <tmendeze@uw.edu>']
+__copyright__  = 'Copyright 2020, Design Machine Group - University of Washington'
+__license__    = 'MIT License'
+__email__      = 'tmendeze@uw.edu'
+
+
+__all__ = ['RadiationModes',
+           'calculate_radiation_modes_np',
+           'calculate_modal_rad_power_np',
+           ]
+
+
+def calculate_radiation_modes_np(k, rho, c, s, face_centers, cache=None):
+    """Eigenvalues and eigenvectors (radiation modes) of the radiation
+    resistance matrix of ``calculate_resistance_from_impedance``, sorted by
+    decreasing eigenvalue magnitude.
+
+    The decomposition is stored in a ``GeometryCache``, ``GEOMETRY_CACHE`` by
+    default, keyed on the geometry, wavenumber and air properties.
+
+    Parameters
+    ----------
+    k : float
+        Wavenumber.
+    rho : float
+        Density of air.
+    c : float
+        Speed of sound.
+    s : list
+        Radiating face areas.
+    face_centers : list
+        Radiating face centers.
+    cache : GeometryCache, optional
+        Cache the decomposition is stored in.
+
+    Returns
+    -------
+    array
+        Eigenvalues (n_faces).
+    array
+        Eigenvectors as columns (n_faces x n_faces).
+    """
+    if cache is None:
+        cache = GEOMETRY_CACHE
+    s = np.asarray(s, dtype=np.float64)
+    key = 'radiation_modes_{}'.format(geometry_key(face_centers, s, [k, rho, c]))
+    w = cache.get(key + '_values')
+    Phi = cache.get(key + '_vectors')
+    if w is None or Phi is None:
+        S = cached_area_matrix(s, cache=cache)
+        D = cached_distance_matrix_np(face_centers, cache=cache)
+        Z = calculate_radiation_matrix_np(k, rho, c, S, D)
+        R = calculate_resistance_from_impedance(Z, s, int(np.sqrt(s.shape[0])))
+        W, Phi = eigenvalue_decomposition(R, hermitian=True)
+        w = cache.put(key + '_values', np.diag(W).copy())
+        Phi = cache.put(key + '_vectors', Phi)
+    return w, Phi
+
+
+def calculate_modal_rad_power_np(w, Phi, V):
+    """Total radiated power ``v^H * R * v`` from radiation modes, in O(N * m)
+    for ``m`` modes.
+
+    Parameters
+    ----------
+    w : array
+        Eigenvalues of the kept modes (m).
+    Phi : array
+        Kept radiation modes as columns (n_faces x m).
+    V : array
+        Complex face velocities (n_faces) or (n_cases x n_faces).
+
+    Returns
+    -------
+    float or array
+        Total radiated power, one per velocity vector.
+    """
+    C = np.dot(np.asarray(V, dtype=np.complex128), np.conjugate(Phi))
+    return np.dot(np.abs(C) ** 2, w)
+
+
+class RadiationModes(object):
+    """Radiation modes of a radiating mesh, for repeated sound power queries
+    at the same geometry, e.g. during optimization of the face velocities.
+
+    The resistance matrix and its eigen-decomposition are computed once per
+    frequency and cached, each power query then only projects the velocities
+    on the ``m`` modes kept, in O(N * m) instead of O(N^2).
+
+    Modes are kept until the discarded eigenvalues add up to less than ``tol``
+    times the sum of all of them. Since the error of a query is bounded by the
+    largest discarded eigenvalue times the squared norm of the velocity
+    outside the kept modes, queries can check this bound and add modes until
+    the power is converged.
+
+    Parameters
+    ----------
+    s : list
+        Radiating face areas.
+    face_centers : list
+        Radiating face centers.
+    rho : float
+        Density of air.
+    c : float
+        Speed of sound.
+    tol : float
+        Fraction of the eigenvalue sum that may be discarded.
+    cache : GeometryCache, optional
+        Cache the decompositions are stored in, ``GEOMETRY_CACHE`` by default.
+    """
+
+    def __init__(self, s, face_centers, rho, c, tol=1e-6, cache=None):
+
+        self.s              = np.asarray(s, dtype=np.float64)
+        self.face_centers   = np.asarray(face_centers, dtype=np.float64)
+        self.rho            = rho
+        self.c              = c
+        self.tol            = tol
+        self.cache          = cache
+        self.num_modes      = {}
+
+    def __str__(self):
+        return 'RadiationModes {0} faces, modes kept {1}'.format(self.s.shape[0], self.num_modes)
+
+    @classmethod
+    def from_structure(cls, structure, tol=1e-6, cache=None):
+        utilities = compas_vibro.vibro.utilities
+        return cls(utilities.structure_face_surfaces(structure),
+                   utilities.structure_face_centers(structure),
+                   structure.rho, structure.c, tol=tol, cache=cache)
+
+    def wavenumber(self, frequency):
+        return 2. * np.pi * frequency / self.c
+
+    def decomposition(self, frequency):
+        """All eigenvalues and radiation modes at a frequency.
+        """
+        return calculate_radiation_modes_np(self.wavenumber(frequency), self.rho, self.c,
+                                            self.s, self.face_centers, cache=self.cache)
+
+    def modes(self, frequency):
+        """Eigenvalues (m) and radiation modes (n_faces x m) kept at a frequency.
+        """
+        w, Phi = self.decomposition(frequency)
+        m = self.num_modes.get(frequency)
+        if m is None:
+            a = np.abs(w)
+            discarded = np.cumsum(a[::-1])[::-1]
+            m = int(np.sum(discarded > self.tol * discarded[0])) if discarded[0] > 0 else 1
+            m = max(1, m)
+            self.num_modes[frequency] = m
+        return w[:m], Phi[:, :m]
+
+    def error_bound(self, frequency, V):
+        """Upper bound of the error of the truncated power for each velocity vector.
+        """
+        w, Phi = self.decomposition(frequency)
+        m = self.num_modes.get(frequency) or self.modes(frequency)[0].shape[0]
+        if m == w.shape[0]:
+            return np.zeros(np.shape(V)[:-1])
+        V = np.asarray(V, dtype=np.complex128)
+        C = np.dot(V, np.conjugate(Phi[:, :m]))
+        residual = np.maximum(0., np.sum(np.abs(V) ** 2, axis=-1) - np.sum(np.abs(C) ** 2, axis=-1))
+        return np.abs(w[m]) * residual
+
+    def power(self, frequency, V, check=False, rtol=1e-3):
+        """Total radiated power for one or several velocity vectors.
+
+        Parameters
+        ----------
+        frequency : float
+            Frequency of the velocities.
+        V : array
+            Complex face velocities (n_faces) or (n_cases x n_faces).
+        check : bool
+            Doubles the number of modes kept at this frequency until the error
+            bound is below ``rtol`` times the power of every vector.
+        rtol : float
+            Relative error allowed by ``check``.
+
+        Returns
+        -------
+        float or array
+            Total radiated power, one per velocity vector.
+        """
+        w, Phi = self.modes(frequency)
+        W = calculate_modal_rad_power_np(w, Phi, V)
+        if check:
+            num = self.decomposition(frequency)[0].shape[0]
+            while np.any(self.error_bound(frequency, V) > rtol * np.abs(W)):
+                if self.num_modes[frequency] == num:
+                    break
+                self.num_modes[frequency] = min(num, 2 * self.num_modes[frequency])
+                w, Phi = self.modes(frequency)
+                W = calculate_modal_rad_power_np(w, Phi, V)
+        return W
+
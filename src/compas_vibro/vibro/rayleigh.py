@@ -2,12 +2,7 @@
 
 try:
     import numpy as np
-    from numba import jit
-    from compas_vibro.hpc import diag_complex_numba
-    # from compas_vibro.hpc import ew_cmatrix_cscalar_division_numba as msdc
-    from compas_vibro.hpc import scale_matrix_complex_numba as msxc
-    from compas_vibro.hpc import divide_matrices_complex_numba as mmdcf
-    from compas_vibro.hpc import multiply_matrices_complex_numba as mmxc
+    from compas_vibro.hpc import rayleigh_pressure_numba
 
 except:
     pass
@@ -17,8 +12,11 @@ import compas_vibro
 
 from compas_vibro.vibro.utilities import structure_face_surfaces
 from compas_vibro.vibro.utilities import structure_face_centers
+from compas_vibro.vibro.utilities import structure_face_incidence_matrix
 from compas_vibro.vibro.utilities import make_area_matrix
 from compas_vibro.vibro.utilities import calculate_distance_matrix_np
+from compas_vibro.vibro.utilities import calculate_distance_block_np
+from compas_vibro.vibro.cache import cached_distance_matrix_np
 # from compas_vibro.vibro.utilities import from_W_to_dB
 
 
@@ -29,32 +27,43 @@ __license__    = 'MIT License'
 __email__      = 'tmendeze@uw.edu'
 
 
-# TODO: track down what is slowing Numba down!
 # TODO: why is the R matrix producing wrong results?
 # TODO: rename Z matrix to impedance matrix
 # TODO: when two approaches are the same, find out the fastest.
 
 
+RADIATION_MAX_MEMORY = 2 ** 29
+RADIATION_BYTES_PER_ENTRY = 40
+RECURRENCE_ANCHOR = 32
+RADIATION_ACCUMULATION_BLOCK = 256
+
+
 def compute_structure_face_velocities(structure, rkey):
-    eks = structure.radiating_faces()
+    return compute_structure_face_velocities_batch(structure, [rkey])[0].tolist()
+
+
+def compute_structure_face_velocities_batch(structure, rkeys):
+    """Complex velocities of the radiating faces (n_freq x n_faces), as the
+    average of the velocities of their nodes.
+
+    The node velocities of all frequencies are gathered in one complex array
+    and averaged onto the faces with one sparse product, see
+    ``structure_face_incidence_matrix``.
+    """
     if structure.step['harmonic']:
         result_type = 'harmonic'
     else:
         result_type = 'harmonic_field'
-    structure.results[result_type][rkey].compute_node_velocities()
-    velocities = []
-    for ek in eks:
-        nkeys = structure.elements[ek].nodes
-        vr = [structure.results[result_type][rkey].velocities[nkey].real for nkey in nkeys]
-        vi = [structure.results[result_type][rkey].velocities[nkey].imag for nkey in nkeys]
-        real = np.average(vr, axis=0)
-        imag = np.average(vi, axis=0)
-        velocities.append(complex(real, imag))
-    return velocities
-
-
-def compute_rad_power_structure(structure):
-    
+    A, nkeys = structure_face_incidence_matrix(structure)
+    results = [structure.results[result_type][rkey] for rkey in rkeys]
+    Vn = compas_vibro.structure.result.node_velocity_array(results, nkeys)
+    return np.ascontiguousarray((A * Vn.T).T)
+
+
+def compute_rad_power_structure(structure, engine=None, max_memory=None, tol=1e-4, precision='double',
+                                spot_checks=2, workers=None, pool='process', elements_per_wavelength=None,
+                                output=False):
+
     if structure.step['harmonic']:
         result_type = 'harmonic'
     else:
@@ -63,40 +72,117 @@ def compute_rad_power_structure(structure):
     eks = structure.radiating_faces()
     sareas = structure_face_surfaces(structure)
     face_centers = structure_face_centers(structure)
-    rkeys = structure.results[result_type].keys()
+    rkeys = list(structure.results[result_type].keys())
     structure.results['radiation'] = {}
 
-    S = make_area_matrix(sareas)
-    D = calculate_distance_matrix_np(face_centers)
-
-    for rk in rkeys:
-        f = structure.results[result_type][rk].frequency
-        res = compas_vibro.structure.result.Result
-        structure.results['radiation'][rk] = res(f) 
-        wlen = structure.c / f
-        k = (2. * np.pi) / wlen
-        # omega = k * structure.c
-
-        # S = make_area_matrix(sareas)
-        # D = calculate_distance_matrix_np(face_centers)
-        n = int(np.sqrt(np.shape(S)[0]))
-        v = compute_structure_face_velocities(structure, rk)
-        # vr = np.real(v)
-        # I = np.eye(np.shape(D)[0])
-        # Ii = 1 - I
-        Z = calculate_radiation_matrix_np(k, structure.rho, structure.c, S, D)
-        p = calculate_pressure_np(Z, v)
-        W, W_tot = calculate_rayleigh_rad_power_np(sareas, p, v, n, sum=True)
-        # lw = from_W_to_dB(W_tot)
-        W = W.tolist()
+    freqs = [structure.results[result_type][rk].frequency for rk in rkeys]
+    ks = calculate_wavenumbers_np(freqs, structure.c)
+    V = compute_structure_face_velocities_batch(structure, rkeys)
+
+    if max_memory is None:
+        max_memory = RADIATION_MAX_MEMORY
+    grid = None
+    if (engine is None and precision == 'double' and not workers) or engine == 'fft':
+        grid = compas_vibro.vibro.fft_radiation.detect_planar_grid(face_centers)
+    if precision != 'double':
+        radiation_dtypes(precision)
+        if engine is None:
+            bytes_per_entry = RADIATION_BYTES_PER_ENTRY // 2
+            engine = 'blocked' if bytes_per_entry * len(eks) ** 2 > max_memory else 'dense'
+        elif engine not in ('dense', 'blocked'):
+            raise NameError('This radiation engine is not implemented in {} precision'.format(precision))
+    if engine is None and workers:
+        engine = 'dense'
+    if engine is None:
+        fft_radiation = compas_vibro.vibro.fft_radiation
+        if grid is not None and fft_radiation.fft_bytes_per_frequency(grid) <= max_memory:
+            engine = 'fft'
+        elif len(eks) >= compas_vibro.vibro.treecode.TREECODE_MIN_FACES and not is_uniform_sweep(ks):
+            engine = 'treecode'
+        elif RADIATION_BYTES_PER_ENTRY * len(eks) ** 2 > max_memory:
+            engine = 'blocked'
+        else:
+            engine = 'dense'
+
+    if workers and engine in ('dense', 'blocked'):
+        parallel = compas_vibro.vibro.parallel
+        P = parallel.calculate_pressure_parallel_np(ks, structure.rho, structure.c, sareas, face_centers, V,
+                                                    workers=workers, pool=pool, max_memory=max_memory,
+                                                    precision=precision)
+    elif workers:
+        raise NameError('This radiation engine is not implemented in parallel')
+    elif engine == 'dense':
+        D = cached_distance_matrix_np(face_centers, precision=precision)
+        P = calculate_pressure_batch_np(ks, structure.rho, structure.c, sareas, D, V,
+                                        max_memory=max_memory, precision=precision)
+    elif engine == 'blocked':
+        P = calculate_pressure_blocked_np(ks, structure.rho, structure.c, sareas, face_centers, V,
+                                          max_memory=max_memory, precision=precision)
+    elif engine == 'numba':
+        P = calculate_pressure_numba(ks, structure.rho, structure.c, sareas, face_centers, V)
+    elif engine == 'fft':
+        fft_radiation = compas_vibro.vibro.fft_radiation
+        P = fft_radiation.calculate_pressure_fft_np(ks, structure.rho, structure.c, sareas, face_centers, V,
+                                                    grid=grid, max_memory=max_memory)
+    elif engine == 'treecode':
+        treecode = compas_vibro.vibro.treecode
+        P = treecode.calculate_pressure_treecode_np(ks, structure.rho, structure.c, sareas, face_centers, V,
+                                                    tol=tol, max_memory=max_memory)
+    elif engine == 'chebyshev':
+        chebyshev = compas_vibro.vibro.chebyshev
+        P = chebyshev.calculate_pressure_chebyshev_np(ks, structure.rho, structure.c, sareas, face_centers, V,
+                                                      tol=tol, max_memory=max_memory)
+    elif engine == 'hmatrix':
+        hmatrix = compas_vibro.vibro.hmatrix
+        P = hmatrix.calculate_pressure_hmatrix_np(ks, structure.rho, structure.c, sareas, face_centers, V,
+                                                  tol=tol)
+    elif engine == 'coarse':
+        coarsening = compas_vibro.vibro.coarsening
+        if elements_per_wavelength is None:
+            elements_per_wavelength = coarsening.ELEMENTS_PER_WAVELENGTH
+        P, bands = coarsening.calculate_pressure_coarse_np(ks, structure.rho, structure.c, sareas, face_centers,
+                                                           V, elements_per_wavelength=elements_per_wavelength,
+                                                           max_memory=max_memory)
+        structure.results['radiation_bands'] = bands
+        for band in bands:
+            if output:
+                print('Radiation band {0:.1f}-{1:.1f} Hz on {2} faces, {3:.1f} elements per wavelength'.format(
+                    band['frequencies'][0], band['frequencies'][1], band['num_faces'],
+                    band['elements_per_wavelength']))
+    else:
+        raise NameError('This radiation engine is not implemented')
+    W, W_tot = calculate_rayleigh_rad_power_batch_np(sareas, P, V)
+
+    error_db = None
+    if precision != 'double' and spot_checks:
+        fi = np.unique(np.linspace(len(freqs) - 1, 0, spot_checks).round().astype(int))
+        P_ = calculate_pressure_blocked_np(ks[fi], structure.rho, structure.c, sareas, face_centers, V[fi],
+                                           max_memory=max_memory, anchor=None)
+        W_ = calculate_rayleigh_rad_power_batch_np(sareas, P_, V[fi])[1]
+        error_db = float(np.max(np.abs(10. * np.log10(W_tot[fi] / W_))))
+        if output:
+            print('Radiated power in {0} precision, max deviation {1:.4f} dB at {2} spot check frequencies'.format(
+                precision, error_db, len(fi)))
+    structure.results['radiation_error_db'] = error_db
+
+    res = compas_vibro.structure.result.Result
+    for i, rk in enumerate(rkeys):
+        structure.results['radiation'][rk] = res(freqs[i])
+        W_ = W[i].tolist()
         #TODO: This line of code fails when no_rad elements are in the middle of rad elements
-        W_ = {ek:W[ek] for ek in eks}
+        W_ = {ek:W_[ek] for ek in eks}
         structure.results['radiation'][rk].radiated_p_faces = W_
-        structure.results['radiation'][rk].radiated_p = W_tot
+        structure.results['radiation'][rk].radiated_p = float(W_tot[i])
+    return error_db
 
 
-def compute_rad_power_mesh_vel(mesh, f, c, rho, S=None, D=None, Z=None):
+def compute_rad_power_mesh_vel(mesh, f, c, rho, S=None, D=None, Z=None, V=None):
+    """Total radiated power of the face velocities of a mesh at frequency ``f``.
 
+    ``V`` (n_faces x n_cases) replaces the face ``'velocity'`` attributes with
+    several load cases, which are applied in one matrix product and return
+    one power per case.
+    """
     sareas = [mesh.face_area(fk) for fk in mesh.faces()]
     face_centers = [mesh.face_centroid(fk) for fk in mesh.faces()]
     
@@ -109,7 +195,10 @@ def compute_rad_power_mesh_vel(mesh, f, c, rho, S=None, D=None, Z=None):
         D = calculate_distance_matrix_np(face_centers)
 
     n = int(np.sqrt(np.shape(S)[0]))
-    v = [mesh.face_attribute(fk, 'velocity') for fk in mesh.faces()]
+    if V is None:
+        v = [mesh.face_attribute(fk, 'velocity') for fk in mesh.faces()]
+    else:
+        v = np.asarray(V, dtype=np.complex128)
 
     if Z is None:
         Z = calculate_radiation_matrix_np(k, rho, c, S, D)
@@ -119,8 +208,276 @@ def compute_rad_power_mesh_vel(mesh, f, c, rho, S=None, D=None, Z=None):
     return W_tot
 
 
+def calculate_wavenumbers_np(frequencies, c):
+    wlen = c / np.asarray(frequencies, dtype=np.float64)
+    k = (2. * np.pi) / wlen
+    return k
+
+
+def calculate_rayleigh_rad_power_batch_np(s, P, V, axis=-1):
+    """Radiated power per face and in total for a batch of pressure and
+    velocity vectors (n_freq x n_faces), as in ``calculate_rayleigh_rad_power_np``.
+    ``axis`` is the face axis, e.g. ``1`` for (n_freq x n_faces x n_cases).
+    """
+    s = np.asarray(s, dtype=np.float64)
+    n = int(np.sqrt(s.shape[0]))
+    area = np.sum(s)
+    vp = np.conjugate(V) * P
+    shape = [1] * vp.ndim
+    shape[axis] = s.shape[0]
+    W = s.reshape(shape) * np.real(vp) / 2.0
+    W_tot = area * np.real(np.sum(vp, axis=axis)) / (2 * n)
+    return W, W_tot
+
+
+def calculate_pressure_batch_np(ks, rho, c, s, D, V, max_memory=None, anchor=RECURRENCE_ANCHOR,
+                                precision='double'):
+    """Computes the surface pressures of a full frequency sweep at once.
+
+    The impedance matrices are built and applied for several frequencies at
+    a time, as many as fit in ``max_memory``. For uniformly spaced sweeps the
+    phase term is stepped from one frequency to the next instead, see
+    ``green_function_sweep_np``.
+
+    Parameters
+    ----------
+    ks : list
+        Wavenumbers, one per frequency.
+    rho : float
+        Density of air.
+    c : float
+        Speed of sound.
+    s : list
+        Radiating face areas.
+    D : array
+        Distance matrix of the radiating face centers.
+    V : array
+        Complex face velocities (n_freq x n_faces), or (n_freq x n_faces x
+        n_cases) for several load cases, applied with one matrix product.
+    max_memory : int, optional
+        Bytes a chunk of frequencies may use, defaults to ``RADIATION_MAX_MEMORY``.
+    anchor : int, optional
+        Frequencies between exact evaluations of the phase term of a uniform
+        sweep, ``0`` or ``None`` to always evaluate it exactly.
+    precision : str
+        ``'double'`` or ``'single'``, the precision of the Green's function
+        matrices. Sums over faces are accumulated in double either way.
+
+    Returns
+    -------
+    array
+        Complex face pressures, same shape as ``V``.
+    """
+    if max_memory is None:
+        max_memory = RADIATION_MAX_MEMORY
+
+    ks, s, V = _as_sweep_arrays(ks, s, V)
+    real = radiation_dtypes(precision)[0]
+    D = np.asarray(D).astype(real, copy=False)
+
+    SD = (s / D).astype(real, copy=False)
+    np.fill_diagonal(SD, 0.)
+
+    P = calculate_green_products_np(ks, D, SD, V, max_memory, anchor)
+    return _add_self_term(P, ks, rho, c, s, V)
+
+
+def calculate_pressure_blocked_np(ks, rho, c, s, face_centers, V, max_memory=None,
+                                  anchor=RECURRENCE_ANCHOR, precision='double'):
+    """Matrix-free version of ``calculate_pressure_batch_np``.
+
+    The impedance matrix is never assembled, not even the distance matrix.
+    Row tiles of the Green's function are streamed and applied to the
+    velocities, so that peak memory is proportional to n_faces * tile and
+    not n_faces ** 2.
+
+    Parameters
+    ----------
+    ks : list
+        Wavenumbers, one per frequency.
+    rho : float
+        Density of air.
+    c : float
+        Speed of sound.
+    s : list
+        Radiating face areas.
+    face_centers : list
+        Radiating face centers.
+    V : array
+        Complex face velocities (n_freq x n_faces), or (n_freq x n_faces x
+        n_cases) for several load cases, applied with one matrix product.
+    max_memory : int, optional
+        Bytes a row tile may use, defaults to ``RADIATION_MAX_MEMORY``.
+    anchor : int, optional
+        Frequencies between exact evaluations of the phase term of a uniform
+        sweep, ``0`` or ``None`` to always evaluate it exactly.
+    precision : str
+        ``'double'`` or ``'single'``, the precision of the Green's function
+        tiles. Sums over faces are accumulated in double either way.
+
+    Returns
+    -------
+    array
+        Complex face pressures, same shape as ``V``.
+    """
+    if max_memory is None:
+        max_memory = RADIATION_MAX_MEMORY
+
+    ks, s, V = _as_sweep_arrays(ks, s, V)
+    m = V.shape[1]
+    xyz = np.asarray(face_centers, dtype=np.float64)
+    real = radiation_dtypes(precision)[0]
+
+    P = np.empty(V.shape, dtype=np.complex128)
+    tile = min(m, radiation_chunk_size(m, max_memory, precision))
+    for i in range(0, m, tile):
+        rows = np.arange(i, min(i + tile, m))
+        Dt = calculate_distance_block_np(xyz[rows], xyz)
+        Dt[np.arange(rows.shape[0]), rows] = 1.
+        SDt = (s / Dt).astype(real, copy=False)
+        SDt[np.arange(rows.shape[0]), rows] = 0.
+        Dt = Dt.astype(real, copy=False)
+        P[:, rows] = calculate_green_products_np(ks, Dt, SDt, V, max_memory, anchor)
+    return _add_self_term(P, ks, rho, c, s, V)
+
+
+def calculate_pressure_numba(ks, rho, c, s, face_centers, V, anchor=RECURRENCE_ANCHOR):
+    """Numba version of ``calculate_pressure_batch_np``, see
+    ``compas_vibro.hpc.rayleigh_pressure_numba``.
+
+    Needs O(N) memory besides the velocities and pressures, and runs on all
+    threads available to numba.
+    """
+    ks, s, V = _as_sweep_arrays(ks, s, V)
+    xyz = np.ascontiguousarray(face_centers, dtype=np.float64)
+    Q = np.ascontiguousarray((s * V).T)
+    if not anchor or not is_uniform_sweep(ks):
+        anchor = 1
+    return rayleigh_pressure_numba(ks, float(rho), float(c), s, xyz, Q, np.ascontiguousarray(V), int(anchor))
+
+
+def is_uniform_sweep(ks, rtol=1e-9):
+    ks = np.asarray(ks, dtype=np.float64).reshape(-1)
+    if ks.shape[0] < 3:
+        return False
+    dk = np.diff(ks)
+    return bool(dk[0] > 0 and np.all(np.abs(dk - dk[0]) <= rtol * dk[0]))
+
+
+def green_function_sweep_np(ks, D, SD, anchor=RECURRENCE_ANCHOR):
+    """Yields ``SD * exp(-1j * k * D)`` for each wavenumber of a uniform sweep.
+
+    Since ``exp(-1j * (k + dk) * D) = exp(-1j * k * D) * exp(-1j * dk * D)``
+    each matrix is the previous one times a constant matrix, which replaces
+    the complex exponentials with complex multiplications. Every ``anchor``
+    frequencies the phase term is evaluated exactly again to bound the
+    rounding drift. The yielded array is updated in place.
+    """
+    real = D.dtype.type
+    workspace = compas_vibro.vibro.workspace
+    E = np.exp(-1j * real(ks[1] - ks[0]) * D)
+    G = np.empty(E.shape, dtype=E.dtype)
+    T = np.empty(D.shape, dtype=D.dtype)
+    for i, k in enumerate(ks):
+        if i % anchor == 0:
+            workspace.green_function_np([k], D, SD, out=G[None], phase=T[None])
+        else:
+            G *= E
+        yield G
+
+
+def radiation_chunk_size(num_entries, max_memory, precision='double'):
+    # complex G, its exponent and the real phase, per matrix entry
+    bytes_per_entry = RADIATION_BYTES_PER_ENTRY
+    if radiation_dtypes(precision)[0] == np.float32:
+        bytes_per_entry //= 2
+    num = int(max_memory // (bytes_per_entry * num_entries))
+    return max(1, num)
+
+
+def radiation_dtypes(precision):
+    """Real and complex dtypes of the radiation matrices for ``'double'`` or
+    ``'single'`` precision.
+    """
+    if precision == 'double':
+        return np.float64, np.complex128
+    elif precision == 'single':
+        return np.float32, np.complex64
+    raise NameError('This radiation precision is not implemented')
+
+
+def calculate_green_products_np(ks, D, SD, V, max_memory=None, anchor=RECURRENCE_ANCHOR):
+    """Computes ``(SD * exp(-1j * k * D)) * v`` for every wavenumber, the
+    off-diagonal part of the pressures without the ``rho * c * 1j * k / 2 / pi``
+    factor. ``D`` can be any rectangular block of distances (or phases).
+
+    Runs in the precision of ``D`` and applies a (n_freq x n_faces x n_cases)
+    ``V`` with one matrix product per frequency.
+    """
+    if max_memory is None:
+        max_memory = RADIATION_MAX_MEMORY
+    num_f = ks.shape[0]
+    precision = 'single' if D.dtype == np.float32 else 'double'
+    V = V.astype(radiation_dtypes(precision)[1], copy=False)
+    V3 = V if V.ndim == 3 else V[:, :, None]
+    P = np.empty((num_f, D.shape[0], V3.shape[2]), dtype=np.complex128)
+    if anchor and is_uniform_sweep(ks):
+        for i, G in enumerate(green_function_sweep_np(ks, D, SD, anchor)):
+            P[i] = _matmul_double(G, V3[i])
+    else:
+        workspace = compas_vibro.vibro.workspace
+        step = min(num_f, radiation_chunk_size(D.size, max_memory, precision))
+        G = np.empty((step,) + D.shape, dtype=radiation_dtypes(precision)[1])
+        T = np.empty((step,) + D.shape, dtype=D.dtype)
+        for i in range(0, num_f, step):
+            k = ks[i:i + step]
+            workspace.green_function_np(k, D, SD, out=G[:k.shape[0]], phase=T[:k.shape[0]])
+            P[i:i + step] = _matmul_double(G[:k.shape[0]], V3[i:i + step])
+    return P if V.ndim == 3 else P[:, :, 0]
+
+
+def _matmul_double(A, B):
+    # single precision products are summed over blocks of columns in double
+    if A.dtype == np.complex128:
+        return np.matmul(A, B)
+    C = np.zeros(A.shape[:-1] + B.shape[-1:], dtype=np.complex128)
+    for j in range(0, A.shape[-1], RADIATION_ACCUMULATION_BLOCK):
+        C += np.matmul(A[..., j:j + RADIATION_ACCUMULATION_BLOCK],
+                       B[..., j:j + RADIATION_ACCUMULATION_BLOCK, :])
+    return C
+
+
+def _as_sweep_arrays(ks, s, V):
+    # V is (n_freq x n_faces), or (n_freq x n_faces x n_cases) for several cases
+    ks = np.asarray(ks, dtype=np.float64).reshape(-1)
+    s = np.asarray(s, dtype=np.float64)
+    V = np.asarray(V, dtype=np.complex128)
+    if V.ndim < 3:
+        V = V.reshape(ks.shape[0], s.shape[0])
+    return ks, s, V
+
+
+def _add_self_term(P, ks, rho, c, s, V):
+    d = calculate_radiation_self_term_np(ks[:, None], s)
+    if P.ndim == 3:
+        ks = ks[:, None]
+        d = d[:, :, None]
+    P *= 1j * ks[:, None] / 2 / np.pi
+    P += d * V
+    P *= (rho * c)
+    return P
+
+
 def calculate_rayleigh_rad_power_np(s, p, v, n, sum=False):
     # TODO: both approaches to the sum W are the same (find out wich is faster)
+    if np.ndim(v) == 2:
+        # one column per load case (n_faces x n_cases)
+        vp = np.conjugate(v) * p
+        w = np.asarray(s)[:, None] * np.real(vp) / 2.0
+        if sum:
+            w_tot = np.sum(s) * np.real(np.sum(vp, axis=0)) / (2 * n)
+            return w, w_tot
+        return w
     vH = np.conjugate(np.transpose(v))
     w = s * np.real(vH * p)
     w /= 2.0
@@ -147,22 +504,54 @@ def calculate_rayleigh_rad_power_R_np(R, v):
 
 
 def calculate_pressure_np(Z, v):
+    # v can also be a velocity matrix (n_faces x n_cases), one column per case
     p = np.dot(Z, v)
     return p
 
 
 def calculate_radiation_matrix_np(k, rho, c, S, D):
     """This implementation comes from Bai and Tsao 2002 (Corrected signs)
+
+    Z is complex64 when D is float32, see ``cached_distance_matrix_np``.
     """
+    D = np.asarray(D)
+    if D.dtype == np.float32:
+        k = np.float32(k)
+        S = np.asarray(S, dtype=np.float32)
     Z = 1j * k * S / 2 / np.pi * np.exp(-1j * k * D) / D
-    tempvar = k * np.sqrt(np.diag(S) / np.pi)
-    d = 1.0 / 2.0 * (tempvar) ** 2.0 - 1j * 8.0 / 3.0 / np.pi * tempvar
+    d = calculate_radiation_self_term_np(k, np.diag(S))
     d_indices = np.diag_indices(np.shape(Z)[0])
     Z[d_indices] = d
     Z *= (rho * c)
     return Z
 
 
+def calculate_radiation_self_term_np(k, s):
+    """Diagonal of the Bai and Tsao radiation matrix, without the rho * c factor.
+    """
+    tempvar = k * np.sqrt(np.asarray(s) / np.pi)
+    d = 1.0 / 2.0 * (tempvar) ** 2.0 - 1j * 8.0 / 3.0 / np.pi * tempvar
+    return d
+
+
+def calculate_radiation_block_np(k, rho, c, s, face_centers, rows, cols):
+    """Block ``Z[rows, cols]`` of ``calculate_radiation_matrix_np``, computed
+    from the face centers without assembling the full matrix.
+    """
+    xyz = np.asarray(face_centers, dtype=np.float64)
+    s = np.asarray(s, dtype=np.float64)
+    rows = np.asarray(rows, dtype=int).reshape(-1)
+    cols = np.asarray(cols, dtype=int).reshape(-1)
+
+    D = calculate_distance_block_np(xyz[rows], xyz[cols])
+    si, sj = np.nonzero(rows[:, None] == cols[None, :])
+    D[si, sj] = 1.
+    Z = 1j * k * s[cols] / 2 / np.pi * np.exp(-1j * k * D) / D
+    Z[si, sj] = calculate_radiation_self_term_np(k, s[rows[si]])
+    Z *= (rho * c)
+    return Z
+
+
 def calculate_radiation_matrix_np_fahy(k, rho, omega, S, D):
     """This implementation comes from Fahy and Gardonio 2007 (page 168)
     """
@@ -190,53 +579,37 @@ def calculate_resistance_matrix_np(k, omega, rho, c, s, D):
 
 
 def calculate_resistance_from_impedance(Z, s, n):
-    # both versions of R return results equal to Z equation
+    """Radiation resistance matrix ``R`` such that ``v^H * R * v`` is the total
+    power of ``calculate_rayleigh_rad_power_np``.
+
+    ``R`` is the Hermitian part of ``Z``, which is ``Re(Z)`` when all faces
+    have the same area. With unequal areas ``Z`` is not symmetric and its
+    Hermitian part keeps an imaginary, antisymmetric ``cos(kr) / r * (s_j - s_i)``
+    term. Dropping it would change the power, so ``R`` is then complex and of
+    higher numerical rank.
+    """
     area = sum(s)
-    R = area * np.real(Z) / (2. * n)
-    # R = np.real(area * (Z + np.conjugate(Z.T)) / (4. * n))
+    R = area * (Z + np.conjugate(Z.T)) / (4. * n)
+    if not np.any(np.imag(R)):
+        R = np.real(R)
     return R
 
 
-def eigenvalue_decomposition(A):
-    w, V = np.linalg.eig(A)
+def eigenvalue_decomposition(A, hermitian=False):
+    """Eigenvalues (as a diagonal matrix) and eigenvectors of ``A``. Hermitian
+    matrices use ``eigh`` and are sorted by decreasing eigenvalue magnitude.
+    """
+    if hermitian:
+        w, V = np.linalg.eigh(A)
+        order = np.argsort(-np.abs(w), kind='mergesort')
+        w, V = w[order], V[:, order]
+    else:
+        w, V = np.linalg.eig(A)
     W = np.diag(w)
     # Vi = np.linalg.inv(V)
     return W, V
 
 
-# @jit(nogil=True, nopython=False, parallel=False, cache=True)
-# def calculate_radiation_matrix_numba(k, rho, c, S, D):
-#     # A = msdc(msxc(S, k * -1j), (complex(2) * np.pi))
-#     A = msxc(msxc(S, k * -1j), (1. / (complex(2) * np.pi)))
-#     B = mmdcf(np.exp(msxc(D, 1j * k)), D)
-#     Z = mmxc(A, B)
-#     tempvar = k * np.sqrt(np.diag(S) / np.pi)
-#     d = 1.0 / 2.0 * (tempvar) ** 2.0 - 1j * 8.0 / 3.0 / np.pi * tempvar
-#     Z = diag_complex_numba(Z, d)
-#     Z *= (rho * c)
-#     return Z
-
-
-# @jit(nopython=True)
-# def calculate_rayleigh_rad_power_numba(S, p, v):
-#     s = S[0].reshape(-1, 1)
-#     # vH = np.conjugate(np.transpose(v))
-#     vH = np.conj(v.T)
-#     vH = vH.reshape(-1, 1)
-#     x = p * vH
-#     W = s * x.real
-#     W /= 2.0
-#     W = np.sum(W)
-#     W = float(W)
-#     return W
-
-
-# @jit(nopython=True)
-# def calculate_pressure_numba(Z, v):
-#     p = np.dot(Z, v)
-#     return p
-
-
 if __name__ == '__main__':
 
     import os
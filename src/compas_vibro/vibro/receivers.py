@@ -0,0 +1,198 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+try:
+    import numpy as np
+except:
+    pass
+
+from compas_vibro.vibro.rayleigh import RADIATION_MAX_MEMORY
+from compas_vibro.vibro.rayleigh import calculate_wavenumbers_np
+from compas_vibro.vibro.rayleigh import calculate_green_products_np
+from compas_vibro.vibro.rayleigh import compute_structure_face_velocities_batch
+from compas_vibro.vibro.rayleigh import radiation_chunk_size
+from compas_vibro.vibro.utilities import calculate_distance_block_np
+from compas_vibro.vibro.utilities import structure_face_surfaces
+from compas_vibro.vibro.utilities import structure_face_centers
+
+
+__author__     = ['Tomas Mendez Echenagucia <tmendeze@uw.edu>']
+__copyright__  = 'Copyright 2020, Design Machine Group - University of Washington'
+__license__    = 'MIT License'
+__email__      = 'tmendeze@uw.edu'
+
+
+__all__ = ['compute_receiver_pressure_structure',
+           'calculate_receiver_pressure_np',
+           'calculate_far_field_pressure_np',
+           'calculate_spl_np',
+           'fibonacci_directions',
+           ]
+
+
+P_REF = 2e-5
+
+
+def compute_receiver_pressure_structure(structure, points=None, directions=None, distance=1.,
+                                        max_memory=None):
+    """Complex sound pressure of the harmonic results of a structure at
+    microphone points or, in the far field, along directions.
+
+    Parameters
+    ----------
+    structure : obj
+        Structure object with harmonic results.
+    points : list, optional
+        Receiver points (n_receivers x 3).
+    directions : list, optional
+        Far-field directions (n_receivers x 3), used if no points are given.
+    distance : float
+        Distance of the far-field receivers from the origin.
+    max_memory : int, optional
+        Bytes a chunk of receivers may use, defaults to ``RADIATION_MAX_MEMORY``.
+
+    Returns
+    -------
+    list
+        Frequencies.
+    array
+        Complex pressures (n_freq x n_receivers).
+    """
+    if structure.step['harmonic']:
+        result_type = 'harmonic'
+    else:
+        result_type = 'harmonic_field'
+    rkeys = list(structure.results[result_type].keys())
+    freqs = [structure.results[result_type][rk].frequency for rk in rkeys]
+    ks = calculate_wavenumbers_np(freqs, structure.c)
+    V = compute_structure_face_velocities_batch(structure, rkeys)
+    s = structure_face_surfaces(structure)
+    xyz = structure_face_centers(structure)
+    if points is not None:
+        P = calculate_receiver_pressure_np(ks, structure.rho, structure.c, s, xyz, V, points,
+                                           max_memory=max_memory)
+    elif directions is not None:
+        P = calculate_far_field_pressure_np(ks, structure.rho, structure.c, s, xyz, V, directions,
+                                            distance=distance, max_memory=max_memory)
+    else:
+        raise ValueError('Receiver points or far-field directions are needed')
+    return freqs, P
+
+
+def calculate_receiver_pressure_np(ks, rho, c, s, face_centers, V, points, max_memory=None):
+    """Complex pressure at receiver points from the Rayleigh integral of the
+    face velocities, ``rho * c * 1j * k / 2 / pi * sum(s * v * exp(-1j * k * r) / r)``.
+
+    Receivers are processed in tiles and frequencies in chunks, so that the
+    Green's function of a tile fits in ``max_memory``.
+
+    Parameters
+    ----------
+    ks : list
+        Wavenumbers, one per frequency.
+    rho : float
+        Density of air.
+    c : float
+        Speed of sound.
+    s : list
+        Radiating face areas.
+    face_centers : list
+        Radiating face centers.
+    V : array
+        Complex face velocities (n_freq x n_faces).
+    points : list
+        Receiver points (n_receivers x 3), off the radiating faces.
+    max_memory : int, optional
+        Bytes a tile may use, defaults to ``RADIATION_MAX_MEMORY``.
+
+    Returns
+    -------
+    array
+        Complex pressures (n_freq x n_receivers).
+    """
+    if max_memory is None:
+        max_memory = RADIATION_MAX_MEMORY
+    ks = np.asarray(ks, dtype=np.float64).reshape(-1)
+    s = np.asarray(s, dtype=np.float64)
+    V = np.asarray(V, dtype=np.complex128).reshape(ks.shape[0], s.shape[0])
+    xyz = np.asarray(face_centers, dtype=np.float64)
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+
+    P = np.empty((ks.shape[0], points.shape[0]), dtype=np.complex128)
+    tile = min(points.shape[0], radiation_chunk_size(s.shape[0], max_memory))
+    for i in range(0, points.shape[0], tile):
+        R = calculate_distance_block_np(points[i:i + tile], xyz)
+        P[:, i:i + tile] = calculate_green_products_np(ks, R, s / R, V, max_memory)
+    P *= rho * c * 1j * ks[:, None] / 2 / np.pi
+    return P
+
+
+def calculate_far_field_pressure_np(ks, rho, c, s, face_centers, V, directions, distance=1.,
+                                    max_memory=None):
+    """Complex far-field pressure along directions, at ``distance`` from the
+    origin, for directivity balloons.
+
+    In the far field ``r = distance - u * x`` in the phase and ``distance``
+    in the amplitude, so the pressure is the Rayleigh integral with the
+    phase factor ``exp(1j * k * u * x)`` per face.
+
+    Parameters
+    ----------
+    ks : list
+        Wavenumbers, one per frequency.
+    rho : float
+        Density of air.
+    c : float
+        Speed of sound.
+    s : list
+        Radiating face areas.
+    face_centers : list
+        Radiating face centers.
+    V : array
+        Complex face velocities (n_freq x n_faces).
+    directions : list
+        Directions (n_directions x 3), normalized here.
+    distance : float
+        Distance of the receivers from the origin.
+    max_memory : int, optional
+        Bytes a tile may use, defaults to ``RADIATION_MAX_MEMORY``.
+
+    Returns
+    -------
+    array
+        Complex pressures (n_freq x n_directions).
+    """
+    if max_memory is None:
+        max_memory = RADIATION_MAX_MEMORY
+    ks = np.asarray(ks, dtype=np.float64).reshape(-1)
+    s = np.asarray(s, dtype=np.float64)
+    V = np.asarray(V, dtype=np.complex128).reshape(ks.shape[0], s.shape[0])
+    xyz = np.asarray(face_centers, dtype=np.float64)
+    U = np.asarray(directions, dtype=np.float64).reshape(-1, 3)
+    U = U / np.linalg.norm(U, axis=1)[:, None]
+
+    P = np.empty((ks.shape[0], U.shape[0]), dtype=np.complex128)
+    tile = min(U.shape[0], radiation_chunk_size(s.shape[0], max_memory))
+    SD = np.broadcast_to(s, (tile, s.shape[0]))
+    for i in range(0, U.shape[0], tile):
+        D = -np.dot(U[i:i + tile], xyz.T)
+        P[:, i:i + tile] = calculate_green_products_np(ks, D, SD[:D.shape[0]], V, max_memory)
+    P *= rho * c * 1j * ks[:, None] / 2 / np.pi * np.exp(-1j * ks[:, None] * distance) / distance
+    return P
+
+
+def calculate_spl_np(P):
+    """Sound pressure level in dB re 20 uPa of complex pressure amplitudes.
+    """
+    return 20. * np.log10(np.abs(P) / np.sqrt(2.) / P_REF)
+
+
+def fibonacci_directions(num, hemisphere=False):
+    """Nearly uniform unit directions on the sphere (or the upper half, z >= 0).
+    """
+    i = np.arange(num) + .5
+    z = 1. - i / num if hemisphere else 1. - 2. * i / num
+    r = np.sqrt(1. - z ** 2)
+    phi = np.pi * (3. - np.sqrt(5.)) * i
+    return np.column_stack((r * np.cos(phi), r * np.sin(phi), z))
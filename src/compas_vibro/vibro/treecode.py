@@ -0,0 +1,241 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+try:
+    import numpy as np
+except:
+    pass
+
+from compas_vibro.vibro.hmatrix import ClusterTree
+from compas_vibro.vibro.rayleigh import RADIATION_MAX_MEMORY
+from compas_vibro.vibro.rayleigh import RADIATION_BYTES_PER_ENTRY
+from compas_vibro.vibro.rayleigh import calculate_radiation_self_term_np
+from compas_vibro.vibro.utilities import calculate_distance_block_np
+
+
+__author__     = ['Tomas Mendez Echenagucia <tmendeze@uw.edu>']
+__copyright__  = 'Copyright 2020, Design Machine Group - University of Washington'
+__license__    = 'MIT License'
+__email__      = 'tmendeze@uw.edu'
+
+
+__all__ = ['TreeCode',
+           'calculate_pressure_treecode_np',
+           ]
+
+
+# faces from which the tree code is picked by default, for non uniform sweeps
+# only, uniform sweeps are faster with the frequency recurrence of the blocked engine
+TREECODE_MIN_FACES = 20000
+
+
+class TreeCode(object):
+    """Tree-code for the Helmholtz kernel ``exp(-ikr) / r`` of the Rayleigh
+    integral on unstructured radiating meshes.
+
+    Clusters of faces are represented by proxy points on a tensor Chebyshev
+    grid over their bounding box, with Lagrange weights that move sources
+    onto the proxies and potentials back from them. Well separated cluster
+    pairs interact through their proxies only, a large cluster that is far
+    from a small one through the proxies of the large one, and the remaining
+    leaf pairs directly. The tree and interaction lists depend on the
+    geometry and on the highest wavenumber, so the same tree serves every
+    frequency up to ``k``.
+
+    Parameters
+    ----------
+    face_centers : list
+        Radiating face centers.
+    k : float
+        Highest wavenumber the tree-code will be evaluated at.
+    tol : float
+        Target relative accuracy, sets the Chebyshev order.
+    theta : float
+        Opening angle, two clusters are far when their diameters are below
+        ``theta`` times their distance.
+    leaf_size : int
+        Maximum number of faces in a leaf cluster.
+    """
+
+    def __init__(self, face_centers, k, tol=1e-4, theta=.5, leaf_size=128):
+
+        self.face_centers   = np.asarray(face_centers, dtype=np.float64)
+        self.k              = k
+        self.tol            = tol
+        self.theta          = theta
+        self.order          = max(2, int(np.ceil(np.log(tol) / np.log(theta / (2. + theta)))))
+        self.proxies        = {}
+        self.clusters       = {}
+        self.far            = {}
+        self.far_sources    = {}
+        self.near           = {}
+
+        tree = ClusterTree(self.face_centers, leaf_size=leaf_size)
+        self._traverse(tree, tree)
+
+    def __str__(self):
+        num = float(self.face_centers.shape[0]) ** 2
+        return 'TreeCode {0} faces, order {1}, far {2:.3f}, far sources {3:.3f}, near {4:.3f} of N^2'.format(
+            self.face_centers.shape[0], self.order,
+            sum([self._num_proxies(T) * self._num_proxies(S) for T, S in self._pairs(self.far)]) / num,
+            sum([T.indices.shape[0] * self._num_proxies(S) for T, S in self._pairs(self.far_sources)]) / num,
+            sum([T.indices.shape[0] * S.indices.shape[0] for T, S in self._pairs(self.near)]) / num)
+
+    def _pairs(self, interactions):
+        return [(self.clusters[t], self.clusters[s]) for t in interactions for s in interactions[t]]
+
+    def _num_proxies(self, S):
+        return self._proxies(S)[0].shape[0]
+
+    def _traverse(self, T, S):
+        stack = [(T, S)]
+        while stack:
+            T, S = stack.pop()
+            self.clusters[id(T)] = T
+            self.clusters[id(S)] = S
+            dist = T.distance(S)
+            if S.diameter <= self.theta * dist and self._num_proxies(S) < S.indices.shape[0]:
+                if T.diameter <= self.theta * dist and self._num_proxies(T) < T.indices.shape[0]:
+                    self.far.setdefault(id(T), []).append(id(S))
+                    continue
+                if T.is_leaf:
+                    self.far_sources.setdefault(id(T), []).append(id(S))
+                    continue
+            if T.is_leaf and S.is_leaf:
+                self.near.setdefault(id(T), []).append(id(S))
+            elif S.is_leaf or (not T.is_leaf and T.diameter >= S.diameter):
+                stack.extend([(T_, S) for T_ in T.children])
+            else:
+                stack.extend([(T, S_) for S_ in S.children])
+
+    def _proxies(self, S):
+        # Chebyshev points over the bounding box of S, and the Lagrange
+        # weights between the faces of S and the points
+        if id(S) in self.proxies:
+            return self.proxies[id(S)]
+        xyz = self.face_centers[S.indices]
+        extent = S.bbox_max - S.bbox_min
+        axes_pts = []
+        axes_L = []
+        for d in range(3):
+            a, b = S.bbox_min[d], S.bbox_max[d]
+            if extent[d] <= 1e-9 * max(S.diameter, 1e-12):
+                axes_pts.append(np.array([(a + b) / 2.]))
+                axes_L.append(np.ones((1, xyz.shape[0])))
+                continue
+            # thin sides of the box converge faster and need fewer points
+            p = int(np.ceil(self.order * extent[d] / np.max(extent)))
+            p = max(2, p + int(np.ceil(self.k * extent[d] / 2.)))
+            t = (a + b) / 2. + (b - a) / 2. * np.cos((2 * np.arange(p) + 1) * np.pi / (2 * p))
+            axes_pts.append(t)
+            axes_L.append(_lagrange_matrix(t, xyz[:, d]))
+        X, Y, Z = np.meshgrid(*axes_pts, indexing='ij')
+        pts = np.column_stack((X.ravel(), Y.ravel(), Z.ravel()))
+        W = np.einsum('in,jn,kn->ijkn', *axes_L).reshape(pts.shape[0], -1)
+        self.proxies[id(S)] = (pts, W)
+        return pts, W
+
+    def potential(self, ks, Q, max_memory=None):
+        """Computes ``sum_j exp(-ik r_ij) / r_ij * q_j`` for ``i != j``.
+
+        Parameters
+        ----------
+        ks : list
+            Wavenumbers, none above the ``k`` of the tree-code.
+        Q : array
+            Source strengths (n_freq x n_faces).
+        max_memory : int, optional
+            Bytes a chunk of frequencies may use, defaults to ``RADIATION_MAX_MEMORY``.
+
+        Returns
+        -------
+        array
+            Potentials (n_freq x n_faces).
+        """
+        if max_memory is None:
+            max_memory = RADIATION_MAX_MEMORY
+        ks = np.asarray(ks, dtype=np.float64).reshape(-1)
+        Q = np.asarray(Q, dtype=np.complex128).reshape(ks.shape[0], -1)
+        xyz = self.face_centers
+
+        far = {t: (np.vstack([self.proxies[s][0] for s in self.far[t]]), self.far[t]) for t in self.far}
+        far_sources = {t: (np.vstack([self.proxies[s][0] for s in self.far_sources[t]]), self.far_sources[t])
+                       for t in self.far_sources}
+        near = {t: np.concatenate([self.clusters[s].indices for s in self.near[t]]) for t in self.near}
+
+        entries = [self._num_proxies(self.clusters[t]) * far[t][0].shape[0] for t in far]
+        entries += [self.clusters[t].indices.shape[0] * far_sources[t][0].shape[0] for t in far_sources]
+        entries += [self.clusters[t].indices.shape[0] * near[t].shape[0] for t in near]
+        step = max(1, int(max_memory // (RADIATION_BYTES_PER_ENTRY * max(entries + [1]))))
+
+        sources = set([s for t in self.far for s in self.far[t]])
+        sources.update([s for t in self.far_sources for s in self.far_sources[t]])
+
+        F = np.zeros(Q.shape, dtype=np.complex128)
+        for i in range(0, ks.shape[0], step):
+            k = ks[i:i + step, None, None]
+            Fi = F[i:i + step]
+            Qi = Q[i:i + step]
+
+            q = {s: np.dot(Qi[:, self.clusters[s].indices], self.proxies[s][1].T) for s in sources}
+
+            for t, (pts, srcs) in far.items():
+                T = self.clusters[t]
+                pts_T, W_T = self.proxies[t]
+                G = _kernel(k, calculate_distance_block_np(pts_T, pts))
+                f = np.matmul(G, np.hstack([q[s] for s in srcs])[:, :, None])[:, :, 0]
+                Fi[:, T.indices] += np.dot(f, W_T)
+
+            for t, (pts, srcs) in far_sources.items():
+                T = self.clusters[t]
+                G = _kernel(k, calculate_distance_block_np(xyz[T.indices], pts))
+                Fi[:, T.indices] += np.matmul(G, np.hstack([q[s] for s in srcs])[:, :, None])[:, :, 0]
+
+            for t, srcs in near.items():
+                T = self.clusters[t]
+                R = calculate_distance_block_np(xyz[T.indices], xyz[srcs])
+                si, sj = np.nonzero(T.indices[:, None] == srcs[None, :])
+                R[si, sj] = 1.
+                G = _kernel(k, R)
+                G[:, si, sj] = 0.
+                Fi[:, T.indices] += np.matmul(G, Qi[:, srcs, None])[:, :, 0]
+        return F
+
+
+def _kernel(k, R):
+    return np.exp(-1j * k * R) / R
+
+
+def _lagrange_matrix(t, y):
+    # L[m, j] = prod_{q != m} (y_j - t_q) / (t_m - t_q)
+    L = np.ones((t.shape[0], y.shape[0]))
+    for m in range(t.shape[0]):
+        for q in range(t.shape[0]):
+            if q != m:
+                L[m] *= (y - t[q]) / (t[m] - t[q])
+    return L
+
+
+def calculate_pressure_treecode_np(ks, rho, c, s, face_centers, V, tol=1e-4, theta=.5,
+                                   leaf_size=128, max_memory=None):
+    """Tree-code version of ``calculate_pressure_batch_np``.
+
+    Frequencies are grouped in octave bands and one ``TreeCode`` is built per
+    band, the self term is the same as in ``calculate_radiation_matrix_np``.
+    """
+    ks = np.asarray(ks, dtype=np.float64).reshape(-1)
+    s = np.asarray(s, dtype=np.float64)
+    V = np.asarray(V, dtype=np.complex128).reshape(ks.shape[0], s.shape[0])
+
+    P = np.empty(V.shape, dtype=np.complex128)
+    bands = np.floor(np.log2(ks / np.min(ks)))
+    for band in np.unique(bands):
+        fi = np.nonzero(bands == band)[0]
+        tree = TreeCode(face_centers, np.max(ks[fi]), tol=tol, theta=theta, leaf_size=leaf_size)
+        P[fi] = tree.potential(ks[fi], s * V[fi], max_memory=max_memory)
+
+    P *= 1j * ks[:, None] / 2 / np.pi
+    P += calculate_radiation_self_term_np(ks[:, None], s) * V
+    P *= (rho * c)
+    return P
@@ -1,10 +1,14 @@
+import weakref
+
 from compas.geometry import area_polygon
 from compas.geometry import centroid_points
+from compas.geometry import normal_polygon
 
 
 try:
     import numpy as np
     import scipy.spatial.distance as sp
+    import scipy.sparse as sps
 except:
     pass
 
@@ -15,6 +19,7 @@ __email__      = 'tmendeze@uw.edu'
 
 
 all = ['calculate_distance_matrix_np',
+       'calculate_distance_block_np',
        'make_velocities_pattern_mesh',
        'get_mesh_data',
        'from_W_to_dB',
@@ -22,6 +27,8 @@ all = ['calculate_distance_matrix_np',
        'frequency_key',
        'structure_face_surfaces',
        'structure_face_centers',
+       'structure_face_normals',
+       'structure_face_incidence_matrix',
        ]
 
 
@@ -41,6 +48,14 @@ def calculate_distance_matrix_np(face_centers):
     return D.astype(np.float64)
 
 
+def calculate_distance_block_np(points, others):
+    # rows of the distance matrix, from a subset of points to all others
+    D = sp.cdist(np.asarray(points, dtype=np.float64),
+                 np.asarray(others, dtype=np.float64),
+                 metric='euclidean')
+    return D
+
+
 def make_velocities_pattern_mesh(mesh, f, amp, complex=False):
     faces = sorted(mesh.face, key=int)
     x = [mesh.face_center(fkey)[0] for fkey in faces]
@@ -116,6 +131,60 @@ def structure_face_centers(structure):
     return centers
 
 
+def structure_face_normals(structure):
+    eks = structure.radiating_faces()
+    normals = []
+    for ek in eks:
+        pl = [structure.nodes[nk].xyz() for nk in structure.elements[ek].nodes]
+        normals.append(normal_polygon(pl))
+    return normals
+
+
+_FACE_INCIDENCE = weakref.WeakKeyDictionary()
+
+
+def structure_face_incidence_matrix(structure):
+    """Sparse matrix that averages node values onto the radiating faces.
+
+    Row ``i`` holds ``1 / n`` at the columns of the ``n`` nodes of radiating
+    face ``i``, so that face velocities are ``A * v`` for the node velocities
+    ``v`` ordered as the returned node keys. The matrix is built once per
+    structure and rebuilt only when its radiating faces change.
+
+    Parameters
+    ----------
+    structure : obj
+        Structure object.
+
+    Returns
+    -------
+    csr_matrix
+        Averaging matrix (n_faces x n_nodes).
+    list
+        Node keys of the columns.
+    """
+    eks = tuple(structure.radiating_faces())
+    cached = _FACE_INCIDENCE.get(structure)
+    if cached is not None and cached[0] == eks:
+        return cached[1], cached[2]
+
+    nkeys = []
+    columns = {}
+    rows, cols, vals = [], [], []
+    for i, ek in enumerate(eks):
+        nks = structure.elements[ek].nodes
+        for nk in nks:
+            if nk not in columns:
+                columns[nk] = len(nkeys)
+                nkeys.append(nk)
+            rows.append(i)
+            cols.append(columns[nk])
+            vals.append(1. / len(nks))
+    A = sps.csr_matrix((vals, (rows, cols)), shape=(len(eks), len(nkeys)))
+    _FACE_INCIDENCE[structure] = (eks, A, nkeys)
+    return A, nkeys
+
+
 if __name__ == '__main__':
     import os
     import compas_vibro
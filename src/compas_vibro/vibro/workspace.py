@@ -0,0 +1,156 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+try:
+    import numpy as np
+except:
+    pass
+
+from compas_vibro.vibro.rayleigh import radiation_dtypes
+from compas_vibro.vibro.rayleigh import calculate_radiation_self_term_np
+
+
+__author__     = ['Tomas Mendez Echenagucia <tmendeze@uw.edu>']
+__copyright__  = 'Copyright 2020, Design Machine Group - University of Washington'
+__license__    = 'MIT License'
+__email__      = 'tmendeze@uw.edu'
+
+
+__all__ = ['RadiationWorkspace',
+           'green_function_np',
+           ]
+
+
+class RadiationWorkspace(object):
+    """Preallocated buffers for the radiation matrices of one geometry, filled
+    in place for each new wavenumber.
+
+    ``calculate_radiation_matrix_np``, ``calculate_radiation_matrix_berkhoff_np``
+    and ``calculate_resistance_matrix_np`` allocate a new N x N matrix and
+    several N x N temporaries per call. Here the geometry terms are computed
+    once and every call reuses the same buffers, so a frequency loop does not
+    allocate anything of size N^2.
+
+    The returned matrices are views of the buffers, overwritten by the next
+    call of the same kind. Copy them to keep them.
+
+    Parameters
+    ----------
+    rho : float
+        Density of air.
+    c : float
+        Speed of sound.
+    s : list
+        Radiating face areas.
+    D : array
+        Distance matrix, with ones on the diagonal as ``calculate_distance_matrix_np``.
+    precision : str
+        ``'double'`` or ``'single'``.
+    """
+
+    def __init__(self, rho, c, s, D, precision='double'):
+
+        real, complex_ = radiation_dtypes(precision)
+        self.rho        = rho
+        self.c          = c
+        self.precision  = precision
+        self.s          = np.asarray(s, dtype=real)
+        self.D          = np.asarray(D, dtype=real)
+        m = self.s.shape[0]
+
+        # S / (2 * pi * D), the geometry part of the off-diagonal terms
+        self.SD         = np.empty((m, m), dtype=real)
+        np.divide(self.s, self.D, out=self.SD)
+        self.SD /= 2 * np.pi
+        self.s2         = self.s ** 2
+        self.diagonal   = np.diag_indices(m)
+
+        self.Z          = np.empty((m, m), dtype=complex_)
+        self.R          = np.empty((m, m), dtype=real)
+        self.T          = np.empty((m, m), dtype=real)
+
+    def __str__(self):
+        return 'RadiationWorkspace {0} faces, {1} precision, {2} bytes'.format(
+            self.s.shape[0], self.precision, self.nbytes)
+
+    @property
+    def nbytes(self):
+        return self.SD.nbytes + self.Z.nbytes + self.R.nbytes + self.T.nbytes
+
+    def _green(self, k):
+        # Z = SD * exp(-1j * k * D), off the diagonal
+        green_function_np([k], self.D, self.SD, out=self.Z[None], phase=self.T[None])
+
+    def radiation_matrix(self, k):
+        """Same as ``calculate_radiation_matrix_np``, in the ``Z`` buffer.
+        """
+        self._green(k)
+        self.Z *= 1j * k * self.rho * self.c
+        self.Z[self.diagonal] = self.rho * self.c * calculate_radiation_self_term_np(k, self.s)
+        return self.Z
+
+    def radiation_matrix_berkhoff(self, k):
+        """Same as ``calculate_radiation_matrix_berkhoff_np``, in the ``Z`` buffer.
+        """
+        self._green(k)
+        self.Z *= 1j * k * self.rho * self.c
+        d = 1 - np.exp(1j * k * np.sqrt(self.s / np.pi))
+        self.Z[self.diagonal] = self.rho * self.c * d
+        return self.Z
+
+    def resistance_matrix(self, k, omega):
+        """Same as ``calculate_resistance_matrix_np``, in the ``R`` buffer.
+        """
+        k = self.R.dtype.type(k)
+        np.multiply(self.D, k, out=self.R)
+        np.sin(self.R, out=self.R)
+        self.R *= self.D
+        self.R /= k
+        self.R[self.diagonal] = 1
+        self.R *= self.s2
+        self.R *= (omega ** 2) * self.rho / (4 * np.pi * self.c)
+        return self.R
+
+
+def green_function_np(ks, D, SD, out=None, phase=None):
+    """Computes ``SD * exp(-1j * k * D)`` for each wavenumber (n_freq x
+    D.shape), in the precision of ``D``.
+
+    The exponential is written as cos and sin into the real and imaginary
+    views of ``out``, with ``phase`` holding ``k * D``. When both buffers are
+    given nothing of the size of ``D`` is allocated, which is how
+    ``RadiationWorkspace`` and the frequency loops of
+    ``calculate_green_products_np`` reuse their buffers.
+
+    Parameters
+    ----------
+    ks : list
+        Wavenumbers.
+    D : array
+        Distances, any rectangular block.
+    SD : array
+        Factor of each entry, same shape as ``D``.
+    out : array, optional
+        Complex buffer (n_freq x D.shape) for the result.
+    phase : array, optional
+        Real buffer (n_freq x D.shape).
+
+    Returns
+    -------
+    array
+        ``out``, filled.
+    """
+    real = D.dtype.type
+    ks = np.asarray(ks, dtype=real).reshape(-1)
+    shape = (ks.shape[0],) + D.shape
+    if out is None:
+        out = np.empty(shape, dtype=radiation_dtypes('single' if real == np.float32 else 'double')[1])
+    if phase is None:
+        phase = np.empty(shape, dtype=real)
+    np.multiply(ks[:, None, None], D, out=phase)
+    np.cos(phase, out=out.real)
+    np.sin(phase, out=out.imag)
+    np.negative(out.imag, out=out.imag)
+    out *= SD
+    return out
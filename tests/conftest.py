@@ -0,0 +1,83 @@
+import os
+
+import numpy as np
+import pytest
+
+from compas.datastructures import Mesh
+
+import compas_vibro
+
+from compas_vibro.structure import Structure
+from compas_vibro.structure import FixedDisplacement
+from compas_vibro.structure import ShellSection
+from compas_vibro.structure import ElasticIsotropic
+from compas_vibro.structure import ElementProperties
+from compas_vibro.structure.result import Result
+from compas_vibro.structure.step import HarmonicStep
+
+
+FREQ_LIST = [20., 60., 100., 140., 180.]
+
+
+def make_structure(path, freq_list=FREQ_LIST, seed=0):
+    """6x6 concrete slab with an incident quarter and random harmonic
+    displacements, so the radiation engines can run without a solver.
+    """
+    folder = os.path.join(compas_vibro.DATA, 'meshes', '5x4m')
+    mesh = Mesh.from_json(os.path.join(folder, '6x6_structure.json'))
+    inc_mesh = Mesh.from_json(os.path.join(folder, '6x6_quarter.json'))
+
+    s = Structure(path, 'test_6x6')
+    s.add_nodes_elements_from_mesh(mesh, 'ShellElement', elset='shell')
+    s.add(FixedDisplacement('boundary', mesh.vertices_on_boundary()))
+    s.add(ShellSection('shell_sec', t=.2))
+    s.add(ElasticIsotropic('concrete', E=30e9, v=.2, p=2400))
+    s.add(ElementProperties('concrete_shell', material='concrete', section='shell_sec', elset='shell',
+                            is_rad=True))
+    s.add_incident_elements_from_mesh(inc_mesh)
+    s.add(HarmonicStep(name='harmonic', displacements=['boundary'], loads=[], freq_list=list(freq_list),
+                       damping=.02))
+
+    rnd = np.random.RandomState(seed)
+    s.results['harmonic'] = {}
+    for i, f in enumerate(freq_list):
+        r = Result(f, type='harmonic')
+        for nk in s.nodes:
+            a = rnd.normal(size=6) * 1e-6
+            r.displacements[nk] = {'real': {'x': a[0], 'y': a[1], 'z': a[2]},
+                                   'imag': {'x': a[3], 'y': a[4], 'z': a[5]}}
+        s.results['harmonic'][i] = r
+    return s
+
+
+def add_modal_results(structure, num_modes=4, seed=0):
+    """Random mode shapes and modal coordinates of the harmonic results."""
+    rnd = np.random.RandomState(seed)
+    structure.results['modal'] = {}
+    for mk in range(num_modes):
+        r = Result(10. * (mk + 1), type='modal')
+        r.displacements = {'ux': {}, 'uy': {}, 'uz': {}}
+        for nk in structure.nodes:
+            for axis in ('ux', 'uy', 'uz'):
+                r.displacements[axis][nk] = rnd.normal()
+        structure.results['modal'][mk] = r
+    for rk in structure.results['harmonic']:
+        q = rnd.normal(size=(num_modes, 2))
+        structure.results['harmonic'][rk].modal_coordinates = {mk: {'real': q[mk, 0], 'imag': q[mk, 1]}
+                                                               for mk in range(num_modes)}
+    return structure
+
+
+@pytest.fixture
+def structure(tmpdir):
+    return make_structure(str(tmpdir))
+
+
+@pytest.fixture
+def modal_structure(structure):
+    return add_modal_results(structure)
+
+
+@pytest.fixture
+def fake_ansys():
+    return os.path.join(compas_vibro.HOME, 'scripts', 'fake_ansys.py')
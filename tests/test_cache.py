@@ -0,0 +1,39 @@
+import os
+
+import numpy as np
+
+from compas_vibro.vibro.cache import GeometryCache
+from compas_vibro.vibro.cache import cached_distance_matrix_np
+from compas_vibro.vibro.utilities import calculate_distance_matrix_np
+
+
+def test_cache_evicts_least_recently_used():
+    A = np.zeros(100)
+    cache = GeometryCache(max_memory=2 * A.nbytes)
+    cache.put('a', A.copy())
+    cache.put('b', A.copy())
+    cache.get('a')
+    cache.put('c', A.copy())
+    assert list(cache.data) == ['a', 'c']
+    assert cache.nbytes == 2 * A.nbytes
+
+
+def test_cache_disk_tier_is_capped(tmpdir):
+    A = np.zeros(100)
+    path = str(tmpdir)
+    cache = GeometryCache(path=path, max_disk=3 * A.nbytes)
+    for i in range(6):
+        cache.put('a{}'.format(i), A.copy())
+    files = [name for name in os.listdir(path) if name.endswith('.npy')]
+    assert 0 < len(files) < 6
+    assert sum(os.path.getsize(os.path.join(path, name)) for name in files) <= 3 * A.nbytes
+    assert 'a5.npy' in files
+
+
+def test_cached_distance_matrix_is_shared_and_read_only():
+    xyz = np.random.RandomState(0).rand(20, 3)
+    cache = GeometryCache()
+    D = cached_distance_matrix_np(xyz, cache=cache)
+    assert cached_distance_matrix_np(xyz, cache=cache) is D
+    assert not D.flags.writeable
+    assert np.array_equal(D, calculate_distance_matrix_np(xyz))
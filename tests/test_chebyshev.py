@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from compas_vibro.vibro.chebyshev import ChebyshevRadiation
+from compas_vibro.vibro.rayleigh import calculate_pressure_batch_np
+from compas_vibro.vibro.utilities import calculate_distance_matrix_np
+
+
+def sweep(n=200, num_freq=300, seed=0):
+    rnd = np.random.RandomState(seed)
+    xyz = np.c_[rnd.rand(n) * 2., rnd.rand(n) * 1.5, np.zeros(n)]
+    s = rnd.rand(n) * .02 + .01
+    ks = 2 * np.pi * np.linspace(20., 1000., num_freq) / 343.
+    V = rnd.normal(size=(num_freq, n)) + 1j * rnd.normal(size=(num_freq, n))
+    return ks, s, xyz, V
+
+
+def relative_errors(P, P_):
+    return np.linalg.norm(P - P_, axis=1) / np.linalg.norm(P_, axis=1)
+
+
+@pytest.mark.parametrize('tol', [1e-4, 1e-6])
+def test_interpolated_sweep_matches_batch_engine(tol):
+    ks, s, xyz, V = sweep()
+    D = calculate_distance_matrix_np(xyz)
+    radiation = ChebyshevRadiation(1.2, 343., s, xyz, tol=tol)
+    P = radiation.pressures(ks, V)
+    assert radiation.num_builds < ks.shape[0] // 3
+    assert np.max(relative_errors(P, calculate_pressure_batch_np(ks, 1.2, 343., s, D, V, anchor=None))) < tol
+
+    radiation = ChebyshevRadiation(1.2, 343., s, xyz, tol=tol)
+    P = radiation.pressures_fixed(ks, V[0])
+    V_ = np.tile(V[0], (ks.shape[0], 1))
+    assert radiation.num_builds < ks.shape[0] // 3
+    assert np.max(relative_errors(P, calculate_pressure_batch_np(ks, 1.2, 343., s, D, V_, anchor=None))) < tol
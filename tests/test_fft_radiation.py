@@ -0,0 +1,29 @@
+import tracemalloc
+
+import numpy as np
+
+from compas_vibro.vibro.fft_radiation import calculate_pressure_fft_np
+from compas_vibro.vibro.fft_radiation import detect_planar_grid
+from compas_vibro.vibro.fft_radiation import fft_bytes_per_frequency
+
+
+def grid(nx=60, ny=50):
+    x, y = np.meshgrid(np.arange(nx) * .1, np.arange(ny) * .12)
+    xyz = np.c_[x.ravel(), y.ravel(), np.zeros(x.size)]
+    return np.full(x.size, .012), xyz
+
+
+def test_fft_memory_estimate_matches_allocations():
+    s, xyz = grid()
+    g = detect_planar_grid(xyz)
+    ks = np.array([1., 2., 3., 4.])
+    V = np.random.RandomState(0).normal(size=(4, s.shape[0])) + 0j
+
+    tracemalloc.start()
+    P = calculate_pressure_fft_np(ks, 1.2, 343., s, xyz, V, grid=g, max_memory=1)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert fft_bytes_per_frequency(g) < peak < 1.5 * fft_bytes_per_frequency(g)
+
+    P_ = calculate_pressure_fft_np(ks, 1.2, 343., s, xyz, V, grid=g)
+    assert np.allclose(P, P_, rtol=1e-12, atol=0)
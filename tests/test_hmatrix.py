@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from compas_vibro.vibro.hmatrix import HMatrix
+from compas_vibro.vibro.hmatrix import calculate_pressure_hmatrix_np
+from compas_vibro.vibro.rayleigh import calculate_pressure_batch_np
+from compas_vibro.vibro.rayleigh import calculate_radiation_matrix_np
+from compas_vibro.vibro.utilities import calculate_distance_matrix_np
+from compas_vibro.vibro.utilities import make_area_matrix
+
+
+def plate(nx=20, ny=20, seed=0):
+    x, y = np.meshgrid(np.linspace(0, 5, nx), np.linspace(0, 4, ny))
+    xyz = np.c_[x.ravel(), y.ravel(), np.zeros(x.size)]
+    s = np.random.RandomState(seed).rand(x.size) * .05 + .03
+    return s, xyz
+
+
+@pytest.mark.parametrize('tol', [1e-4, 1e-6])
+@pytest.mark.parametrize('k', [.5, 8.])
+def test_hmatrix_compresses_within_tolerance(k, tol):
+    s, xyz = plate()
+    Z = calculate_radiation_matrix_np(k, 1.2, 343., make_area_matrix(s), calculate_distance_matrix_np(xyz))
+    H = HMatrix(k, 1.2, 343., s, xyz, tol=tol, leaf_size=8)
+    assert len(H.lowrank_blocks) > 0
+    assert H.compression < 1.
+    assert np.linalg.norm(H.to_dense() - Z) < tol * np.linalg.norm(Z)
+
+
+def test_hmatrix_pressures_match_dense():
+    s, xyz = plate()
+    ks = np.array([.5, 8.])
+    rnd = np.random.RandomState(1)
+    V = rnd.normal(size=(2, s.shape[0])) + 1j * rnd.normal(size=(2, s.shape[0]))
+    P = calculate_pressure_hmatrix_np(ks, 1.2, 343., s, xyz, V, tol=1e-6, leaf_size=8)
+    P_ = calculate_pressure_batch_np(ks, 1.2, 343., s, calculate_distance_matrix_np(xyz), V, anchor=None)
+    for p, p_ in zip(P, P_):
+        assert np.linalg.norm(p - p_) < 1e-6 * np.linalg.norm(p_)
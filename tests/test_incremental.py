@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from compas_vibro.vibro.incremental import IncrementalRadiation
+from compas_vibro.vibro.rayleigh import calculate_radiation_matrix_np
+from compas_vibro.vibro.rayleigh import calculate_rayleigh_rad_power_batch_np
+from compas_vibro.vibro.utilities import calculate_distance_matrix_np
+from compas_vibro.vibro.utilities import make_area_matrix
+
+
+@pytest.mark.parametrize('assembled', [True, False])
+def test_incremental_update_matches_full_evaluation(assembled):
+    rnd = np.random.RandomState(0)
+    n, k = 40, 2.
+    xyz = rnd.rand(n, 3)
+    s = rnd.rand(n) * .1 + .01
+    v = rnd.normal(size=n) + 1j * rnd.normal(size=n)
+    Z = calculate_radiation_matrix_np(k, 1.2, 343., make_area_matrix(s), calculate_distance_matrix_np(xyz))
+
+    radiation = IncrementalRadiation(k, 1.2, 343., s, xyz, v, Z=Z if assembled else None, max_memory=16 * n * 3)
+    for _ in range(4):
+        indices = rnd.choice(n, 3, replace=False)
+        dv = rnd.normal(size=3) + 1j * rnd.normal(size=3)
+        p, W_tot = radiation.delta(indices, dv)
+        radiation.update(indices, dv)
+        v[indices] += dv
+        p_ = np.dot(Z, v)
+        W_ = calculate_rayleigh_rad_power_batch_np(s, p_[None, :], v[None, :])[1][0]
+        assert np.allclose(p, p_, rtol=1e-10, atol=0)
+        assert np.allclose(radiation.p, p_, rtol=1e-10, atol=0)
+        assert np.isclose(W_tot, W_, rtol=1e-10, atol=0)
+        assert np.isclose(radiation.W_tot, W_, rtol=1e-10, atol=0)
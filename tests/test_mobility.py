@@ -0,0 +1,137 @@
+import numpy as np
+import pytest
+
+from compas_vibro.vibro.mobility import calculate_mobility_power_trace_np
+from compas_vibro.vibro.utilities import calculate_distance_matrix_np
+
+
+def random_chain(num_rad=30, num_inc=12, num_freq=3, seed=0):
+    rnd = np.random.RandomState(seed)
+    xyz = rnd.rand(num_inc, 3)
+    D = calculate_distance_matrix_np(xyz)
+    rad_mats, mob_mats, spec_mats = [], [], []
+    for k in np.linspace(1., 5., num_freq):
+        Z = rnd.rand(num_rad, num_rad) + 1j * rnd.rand(num_rad, num_rad)
+        rad_mats.append(Z + Z.T)
+        mob_mats.append(rnd.rand(num_inc, num_rad) + 1j * rnd.rand(num_inc, num_rad))
+        Gd = np.sin(k * D) / k * D
+        np.fill_diagonal(Gd, 1)
+        spec_mats.append(Gd)
+    areas_rad = rnd.rand(num_rad) + .5
+    areas_inc = rnd.rand(num_inc) + .5
+    return rad_mats, mob_mats, spec_mats, areas_rad, areas_inc
+
+
+def dense_traces(rad_mats, mob_mats, spec_mats, areas_rad, areas_inc):
+    dS_rad = np.diag(areas_rad)
+    dS_inc = np.diag(areas_inc)
+    traces = []
+    for Z, M, Gd in zip(rad_mats, mob_mats, spec_mats):
+        H = M.transpose()
+        D = np.matmul(np.matmul(np.matmul(np.matmul(np.matmul(Z, H), dS_inc), Gd), dS_inc), np.conjugate(H.T))
+        traces.append(np.trace(np.matmul(dS_rad, np.real(D))))
+    return np.array(traces)
+
+
+def test_mobility_power_trace_matches_dense_chain():
+    rad_mats, mob_mats, spec_mats, areas_rad, areas_inc = random_chain()
+    traces = calculate_mobility_power_trace_np(rad_mats, mob_mats, spec_mats, areas_rad, areas_inc)
+    dense = dense_traces(rad_mats, mob_mats, spec_mats, areas_rad, areas_inc)
+    assert np.allclose(traces, dense, rtol=1e-12, atol=0)
+
+
+def test_mobility_power_trace_unit_areas():
+    rad_mats, mob_mats, spec_mats, areas_rad, areas_inc = random_chain()
+    traces = calculate_mobility_power_trace_np(rad_mats, mob_mats, spec_mats)
+    dense = dense_traces(rad_mats, mob_mats, spec_mats, np.ones(len(areas_rad)), np.ones(len(areas_inc)))
+    assert np.allclose(traces, dense, rtol=1e-12, atol=0)
+
+
+def test_cross_spectral_factors_rebuild_dense_matrix():
+    from compas_vibro.vibro.mobility import calculate_cross_spectral_factors_np
+    rnd = np.random.RandomState(1)
+    D = calculate_distance_matrix_np(rnd.rand(40, 3))
+    for k in (.5, 2., 10.):
+        L, sign = calculate_cross_spectral_factors_np(k, D, tol=1e-12)
+        Gd = np.sin(k * D) / k * D
+        np.fill_diagonal(Gd, 1)
+        assert np.allclose(np.eye(40) + np.dot(L * sign, L.T), Gd, rtol=0, atol=1e-10)
+    L, sign = calculate_cross_spectral_factors_np(.5, D, tol=1e-8)
+    assert L.shape[1] < 30
+
+
+def test_mobility_power_factored_matches_dense_chain():
+    from compas_vibro.vibro.cache import GeometryCache
+    from compas_vibro.vibro.mobility import cached_cross_spectral_factors
+    from compas_vibro.vibro.mobility import calculate_mobility_power_factored_np
+    rnd = np.random.RandomState(2)
+    xyz = rnd.rand(12, 3)
+    freq_list = [20., 100., 400.]
+    c = 340.
+    cache = GeometryCache()
+    factors = cached_cross_spectral_factors(xyz, freq_list, c, cache=cache)
+    assert cached_cross_spectral_factors(xyz, freq_list, c, cache=cache)[1][0] is factors[1][0]
+
+    D = calculate_distance_matrix_np(xyz)
+    spec_mats = []
+    for f in freq_list:
+        k = 2 * np.pi * f / c
+        Gd = np.sin(k * D) / k * D
+        np.fill_diagonal(Gd, 1)
+        spec_mats.append(Gd)
+    rad_mats, mob_mats, _, areas_rad, areas_inc = random_chain(num_inc=12, num_freq=3, seed=3)
+    traces = calculate_mobility_power_factored_np(rad_mats, mob_mats, factors, areas_rad, areas_inc)
+    dense = dense_traces(rad_mats, mob_mats, spec_mats, areas_rad, areas_inc)
+    assert np.allclose(traces, dense, rtol=1e-8, atol=0)
+
+
+def test_harmonic_mobility_load_cases_match_single_runs(structure, fake_ansys):
+    from compas_vibro.vibro.mobility import compute_mobility_matrices
+
+    freq_list = [20., 40., 60.]
+    mob_mats = compute_mobility_matrices(structure, freq_list, 0, 0, 1., exe=fake_ansys)
+    step = structure.step['harmonic']
+    loads = list(structure.loads)
+    mob_cases = compute_mobility_matrices(structure, freq_list, 0, 0, 1., exe=fake_ansys, method='cases')
+
+    num_inc = len(structure.incident_nodes())
+    num_rad = len(structure.radiating_nodes())
+    assert structure.step['harmonic'] is step
+    assert list(structure.loads) == loads
+    assert np.array(mob_cases).shape == (3, num_inc, num_rad)
+    assert np.allclose(np.array(mob_cases), np.array(mob_mats), rtol=1e-12, atol=0)
+
+
+def test_modal_mobility_matches_mode_by_mode_sum(modal_structure):
+    from compas_vibro.vibro.mobility import compute_mobility_matrices
+
+    structure = modal_structure
+    freq_list = [15., 25., 45.]
+    fx, fy, fz = 0., .6, .8
+    mob_mats = compute_mobility_matrices(structure, freq_list, fx, fy, fz, damping=.03, method='modal')
+
+    modal = structure.results['modal']
+    rad_nks = structure.radiating_nodes()
+    inc_nks = structure.incident_nodes()
+    for f, H in zip(freq_list, mob_mats):
+        w = 2 * np.pi * f
+        for i, ink in enumerate(inc_nks):
+            U = np.zeros((len(rad_nks), 3), dtype=complex)
+            for mk in modal:
+                d = modal[mk].displacements
+                wm = 2 * np.pi * modal[mk].frequency
+                a = d['ux'][ink] * fx + d['uy'][ink] * fy + d['uz'][ink] * fz
+                shape = np.array([[d['ux'][nk], d['uy'][nk], d['uz'][nk]] for nk in rad_nks])
+                U += a * shape / (wm ** 2 - w ** 2 + 2j * .03 * wm * w)
+            v = 1j * w * (np.linalg.norm(U.real, axis=1) + 1j * np.linalg.norm(U.imag, axis=1))
+            assert np.allclose(H[i], v, rtol=1e-12, atol=0)
+
+
+def test_mobility_power_factored_falls_back_to_dense_matrices():
+    from compas_vibro.vibro.mobility import calculate_mobility_power_factored_np
+    rad_mats, mob_mats, spec_mats, areas_rad, areas_inc = random_chain()
+    traces = calculate_mobility_power_factored_np(rad_mats, mob_mats, None, areas_rad, areas_inc, spec_mats=spec_mats)
+    dense = dense_traces(rad_mats, mob_mats, spec_mats, areas_rad, areas_inc)
+    assert np.allclose(traces, dense, rtol=1e-12, atol=0)
+    with pytest.raises(ValueError):
+        calculate_mobility_power_factored_np(rad_mats, mob_mats, None)
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from compas_vibro.vibro.cache import GeometryCache
+from compas_vibro.vibro.modal_radiation import calculate_modal_coordinate_rad_power_np
+from compas_vibro.vibro.modal_radiation import calculate_modal_resistance_np
+from compas_vibro.vibro.modal_radiation import compute_modal_rad_power_structure
+from compas_vibro.vibro.modal_radiation import structure_modal_face_shapes
+from compas_vibro.vibro.rayleigh import calculate_radiation_matrix_np
+from compas_vibro.vibro.rayleigh import calculate_rayleigh_rad_power_np
+from compas_vibro.vibro.utilities import calculate_distance_matrix_np
+from compas_vibro.vibro.utilities import make_area_matrix
+from compas_vibro.vibro.utilities import structure_face_surfaces
+from compas_vibro.vibro.utilities import structure_face_centers
+
+
+def test_modal_rad_power_matches_face_velocities(modal_structure):
+    structure = modal_structure
+    W = compute_modal_rad_power_structure(structure, tol=1e-10)
+    assert 'modal_radiation' in structure.results
+    assert 'radiation' not in structure.results
+
+    Phi = structure_modal_face_shapes(structure)
+    s = np.array(structure_face_surfaces(structure))
+    n = int(np.sqrt(s.shape[0]))
+    D = calculate_distance_matrix_np(structure_face_centers(structure))
+    for i, rk in enumerate(structure.results['harmonic']):
+        result = structure.results['harmonic'][rk]
+        q = np.array([result.modal_coordinates[mk]['real'] + 1j * result.modal_coordinates[mk]['imag']
+                      for mk in sorted(structure.results['modal'])])
+        omega = 2 * np.pi * result.frequency
+        v = 1j * omega * np.dot(Phi, q)
+        Z = calculate_radiation_matrix_np(omega / structure.c, structure.rho, structure.c, make_area_matrix(s), D)
+        w_tot = calculate_rayleigh_rad_power_np(s, np.dot(Z, v), v, n, sum=True)[1]
+        assert np.isclose(W[i], w_tot, rtol=1e-6, atol=0)
+        assert structure.results['modal_radiation'][rk].radiated_p == W[i]
+
+
+@pytest.mark.parametrize('unequal', [False, True])
+def test_modal_resistance_matches_rayleigh_power(unequal):
+    rnd = np.random.RandomState(0)
+    xyz = rnd.rand(49, 3)
+    s = rnd.rand(49) * .05 + .01 if unequal else np.full(49, .03)
+    Phi = rnd.normal(size=(49, 5))
+    omegas = 2 * np.pi * np.array([50., 150., 400.])
+    ks = omegas / 343.
+    Q = rnd.normal(size=(3, 5)) + 1j * rnd.normal(size=(3, 5))
+
+    R = calculate_modal_resistance_np(ks, 1.2, 343., s, xyz, Phi, tol=1e-10, cache=GeometryCache())
+    assert np.allclose(R, np.conjugate(np.transpose(R, (0, 2, 1))), rtol=0, atol=1e-14 * np.abs(R).max())
+    W = calculate_modal_coordinate_rad_power_np(R, Q, omegas)
+
+    D = calculate_distance_matrix_np(xyz)
+    for i, (k, omega) in enumerate(zip(ks, omegas)):
+        v = 1j * omega * np.dot(Phi, Q[i])
+        Z = calculate_radiation_matrix_np(k, 1.2, 343., make_area_matrix(s), D)
+        w_tot = calculate_rayleigh_rad_power_np(s, np.dot(Z, v), v, 7, sum=True)[1]
+        assert np.isclose(W[i], w_tot, rtol=1e-8, atol=0)
@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+from compas_vibro.vibro import parallel
+from compas_vibro.vibro.rayleigh import calculate_pressure_batch_np
+from compas_vibro.vibro.utilities import calculate_distance_matrix_np
+
+
+def radiation_problem(n=60, num_freq=6, seed=0):
+    rnd = np.random.RandomState(seed)
+    xyz = rnd.rand(n, 3)
+    s = rnd.rand(n) * .1 + .01
+    ks = np.linspace(.5, 3., num_freq)
+    V = rnd.normal(size=(num_freq, n)) + 1j * rnd.normal(size=(num_freq, n))
+    return ks, s, xyz, V
+
+
+@pytest.mark.parametrize('pool', ['thread', 'process'])
+def test_parallel_pressures_match_dense(pool):
+    ks, s, xyz, V = radiation_problem()
+    P = calculate_pressure_batch_np(ks, 1.2, 343., s, calculate_distance_matrix_np(xyz), V)
+    P_ = parallel.calculate_pressure_parallel_np(ks, 1.2, 343., s, xyz, V, workers=2, pool=pool, blas_threads=None)
+    assert np.allclose(P_, P, rtol=1e-12, atol=0)
+
+
+def test_thread_pool_warns_without_threadpoolctl(monkeypatch):
+    monkeypatch.setattr(parallel, 'threadpool_limits', None)
+    ks, s, xyz, V = radiation_problem(n=10, num_freq=2)
+    with pytest.warns(RuntimeWarning):
+        parallel.calculate_pressure_parallel_np(ks, 1.2, 343., s, xyz, V, workers=2, pool='thread', blas_threads=1)
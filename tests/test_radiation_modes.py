@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from compas_vibro.vibro.cache import GeometryCache
+from compas_vibro.vibro.rayleigh import calculate_radiation_matrix_np
+from compas_vibro.vibro.rayleigh import calculate_rayleigh_rad_power_np
+from compas_vibro.vibro.rayleigh import calculate_resistance_from_impedance
+from compas_vibro.vibro.radiation_modes import RadiationModes
+from compas_vibro.vibro.utilities import calculate_distance_matrix_np
+from compas_vibro.vibro.utilities import make_area_matrix
+
+
+def grid(nx=12, ny=10):
+    x, y = np.meshgrid(np.linspace(0, 5, nx), np.linspace(0, 4, ny))
+    return np.c_[x.ravel(), y.ravel(), np.zeros(x.size)]
+
+
+def test_resistance_power_matches_rayleigh_with_unequal_areas():
+    xyz = grid()
+    n = xyz.shape[0]
+    s = np.random.RandomState(0).rand(n) * .1 + .02
+    Z = calculate_radiation_matrix_np(2., 1.2, 343., make_area_matrix(s), calculate_distance_matrix_np(xyz))
+    R = calculate_resistance_from_impedance(Z, s, int(np.sqrt(n)))
+    assert np.allclose(R, np.conjugate(R.T), rtol=0, atol=1e-12 * np.abs(R).max())
+
+    V = np.random.RandomState(1).normal(size=(3, n)) + 1j * np.random.RandomState(2).normal(size=(3, n))
+    for v in V:
+        w_tot = calculate_rayleigh_rad_power_np(s, np.dot(Z, v), v, int(np.sqrt(n)), sum=True)[1]
+        assert np.isclose(np.real(np.vdot(v, np.dot(R, v))), w_tot, rtol=1e-12, atol=0)
+
+
+@pytest.mark.parametrize('unequal', [False, True])
+@pytest.mark.parametrize('f', [50., 150., 400.])
+def test_radiation_modes_power_matches_rayleigh(f, unequal):
+    xyz = grid()
+    n = xyz.shape[0]
+    s = np.random.RandomState(3).rand(n) * .1 + .15 if unequal else np.full(n, .2)
+    rho, c = 1.2, 343.
+    k = 2 * np.pi * f / c
+    V = np.random.RandomState(1).normal(size=(3, n)) + 1j * np.random.RandomState(2).normal(size=(3, n))
+
+    Z = calculate_radiation_matrix_np(k, rho, c, make_area_matrix(s), calculate_distance_matrix_np(xyz))
+    dense = [calculate_rayleigh_rad_power_np(s, np.dot(Z, v), v, int(np.sqrt(n)), sum=True)[1] for v in V]
+
+    modes = RadiationModes(s, xyz, rho, c, tol=1e-12, cache=GeometryCache())
+    assert np.allclose(modes.power(f, V), dense, rtol=1e-8, atol=0)
+    modes = RadiationModes(s, xyz, rho, c, tol=1e-10, cache=GeometryCache())
+    assert np.allclose(modes.power(f, V, check=True, rtol=1e-6), dense, rtol=1e-6, atol=0)
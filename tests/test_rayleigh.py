@@ -0,0 +1,138 @@
+import numpy as np
+import pytest
+
+from compas.datastructures import Mesh
+
+from compas_vibro.vibro.rayleigh import calculate_pressure_batch_np
+from compas_vibro.vibro.rayleigh import calculate_radiation_matrix_np
+from compas_vibro.vibro.rayleigh import calculate_rayleigh_rad_power_np
+from compas_vibro.vibro.rayleigh import calculate_wavenumbers_np
+from compas_vibro.vibro.rayleigh import compute_rad_power_mesh_vel
+from compas_vibro.vibro.rayleigh import compute_rad_power_structure
+from compas_vibro.vibro.rayleigh import compute_structure_face_velocities
+from compas_vibro.vibro.rayleigh import compute_structure_face_velocities_batch
+from compas_vibro.vibro.utilities import calculate_distance_matrix_np
+from compas_vibro.vibro.utilities import make_area_matrix
+from compas_vibro.vibro.utilities import structure_face_centers
+from compas_vibro.vibro.utilities import structure_face_surfaces
+
+
+def radiated_db(structure):
+    radiation = structure.results['radiation']
+    return 10. * np.log10(np.array([radiation[rk].radiated_p for rk in sorted(radiation)]) / 1e-12)
+
+
+def reference_db(structure):
+    """Powers of the dense radiation matrix, one frequency at a time."""
+    rkeys = sorted(structure.results['harmonic'])
+    s = np.array(structure_face_surfaces(structure))
+    S = make_area_matrix(s)
+    D = calculate_distance_matrix_np(structure_face_centers(structure))
+    freqs = [structure.results['harmonic'][rk].frequency for rk in rkeys]
+    W = []
+    for rk, k in zip(rkeys, calculate_wavenumbers_np(freqs, structure.c)):
+        v = np.array(compute_structure_face_velocities(structure, rk))
+        Z = calculate_radiation_matrix_np(k, structure.rho, structure.c, S, D)
+        W.append(calculate_rayleigh_rad_power_np(s, np.dot(Z, v), v, int(np.sqrt(s.shape[0])), sum=True)[1])
+    return 10. * np.log10(np.array(W) / 1e-12)
+
+
+@pytest.mark.parametrize('engine, tol_db', [('dense', 1e-9),
+                                            ('blocked', 1e-9),
+                                            ('numba', 1e-9),
+                                            ('fft', 1e-6),
+                                            ('treecode', 1e-6),
+                                            ('chebyshev', 1e-6),
+                                            ('hmatrix', 1e-6)])
+def test_engines_match_dense_matrix(structure, engine, tol_db):
+    compute_rad_power_structure(structure, engine=engine, tol=1e-8)
+    assert np.max(np.abs(radiated_db(structure) - reference_db(structure))) < tol_db
+
+
+def test_default_engine_matches_dense_matrix(structure):
+    compute_rad_power_structure(structure)
+    assert np.max(np.abs(radiated_db(structure) - reference_db(structure))) < 1e-6
+
+
+def test_blocked_engine_in_small_blocks(structure):
+    compute_rad_power_structure(structure, engine='blocked', max_memory=2 ** 12)
+    assert np.max(np.abs(radiated_db(structure) - reference_db(structure))) < 1e-9
+
+
+def test_face_velocities_average_their_nodes(structure):
+    rkeys = sorted(structure.results['harmonic'])
+    V = compute_structure_face_velocities_batch(structure, rkeys)
+    for rk, v in zip(rkeys, V):
+        result = structure.results['harmonic'][rk]
+        result.compute_node_velocities()
+        for i, ek in enumerate(structure.radiating_faces()):
+            vn = [result.velocities[nk] for nk in structure.elements[ek].nodes]
+            assert np.isclose(v[i], np.mean(vn), rtol=1e-12, atol=0)
+
+
+def test_frequency_recurrence_matches_exact_phase():
+    rnd = np.random.RandomState(0)
+    xyz = rnd.rand(50, 3)
+    s = rnd.rand(50) * .1 + .01
+    ks = np.linspace(.5, 8., 70)
+    V = rnd.normal(size=(70, 50)) + 1j * rnd.normal(size=(70, 50))
+    D = calculate_distance_matrix_np(xyz)
+    P = calculate_pressure_batch_np(ks, 1.2, 343., s, D, V, anchor=32)
+    P_ = calculate_pressure_batch_np(ks, 1.2, 343., s, D, V, anchor=None)
+    assert np.allclose(P, P_, rtol=1e-10, atol=1e-12 * np.abs(P_).max())
+
+
+def test_load_cases_match_single_cases():
+    rnd = np.random.RandomState(1)
+    xyz = rnd.rand(40, 3)
+    s = rnd.rand(40) * .1 + .01
+    ks = np.array([.7, 1.9, 4.1])
+    V = rnd.normal(size=(3, 40, 5)) + 1j * rnd.normal(size=(3, 40, 5))
+    D = calculate_distance_matrix_np(xyz)
+    P = calculate_pressure_batch_np(ks, 1.2, 343., s, D, V)
+    for i in range(5):
+        P_ = calculate_pressure_batch_np(ks, 1.2, 343., s, D, np.ascontiguousarray(V[:, :, i]))
+        assert np.allclose(P[:, :, i], P_, rtol=1e-12, atol=0)
+
+
+def test_mesh_load_cases_match_structure_power(structure):
+    for result in structure.results['harmonic'].values():
+        result.frequency = 100.
+    rkeys = sorted(structure.results['harmonic'])
+    V = compute_structure_face_velocities_batch(structure, rkeys)
+    compute_rad_power_structure(structure, engine='dense')
+    W_ = [structure.results['radiation'][rk].radiated_p for rk in rkeys]
+
+    nkeys = {nk: i for i, nk in enumerate(structure.nodes)}
+    mesh = Mesh.from_vertices_and_faces([structure.nodes[nk].xyz() for nk in nkeys],
+                                        [[nkeys[nk] for nk in structure.elements[ek].nodes]
+                                         for ek in structure.radiating_faces()])
+    W = compute_rad_power_mesh_vel(mesh, 100., structure.c, structure.rho, V=V.T)
+    assert np.allclose(W, W_, rtol=1e-10, atol=0)
+
+    for fk, v in zip(mesh.faces(), V[0]):
+        mesh.face_attribute(fk, 'velocity', v)
+    assert np.isclose(compute_rad_power_mesh_vel(mesh, 100., structure.c, structure.rho), W_[0], rtol=1e-10, atol=0)
+
+
+def test_single_precision_is_quiet_and_stores_its_deviation(structure, capsys):
+    compute_rad_power_structure(structure, engine='dense')
+    reference = radiated_db(structure)
+    error_db = compute_rad_power_structure(structure, engine='dense', precision='single')
+    assert capsys.readouterr().out == ''
+    assert structure.results['radiation_error_db'] == error_db
+    assert error_db < 1e-4
+    assert np.max(np.abs(radiated_db(structure) - reference)) < 1e-4
+
+    compute_rad_power_structure(structure, engine='dense', precision='single', output=True)
+    assert 'single precision' in capsys.readouterr().out
+
+
+def test_coarse_engine_stores_its_bands(structure, capsys):
+    compute_rad_power_structure(structure, engine='dense')
+    reference = radiated_db(structure)
+    compute_rad_power_structure(structure, engine='coarse')
+    assert capsys.readouterr().out == ''
+    bands = structure.results['radiation_bands']
+    assert len(bands) > 1 and min(band['num_faces'] for band in bands) < 36
+    assert np.max(np.abs(radiated_db(structure) - reference)) < .2
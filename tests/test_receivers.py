@@ -0,0 +1,37 @@
+import numpy as np
+
+from compas_vibro.vibro.receivers import calculate_far_field_pressure_np
+from compas_vibro.vibro.receivers import calculate_receiver_pressure_np
+from compas_vibro.vibro.receivers import fibonacci_directions
+
+
+def sources(n=25, seed=0):
+    rnd = np.random.RandomState(seed)
+    xyz = np.c_[rnd.rand(n, 2), np.zeros(n)]
+    s = rnd.rand(n) * .1 + .01
+    ks = np.array([.5, 2., 6.])
+    V = rnd.normal(size=(3, n)) + 1j * rnd.normal(size=(3, n))
+    return ks, s, xyz, V
+
+
+def test_receiver_pressure_matches_rayleigh_sum():
+    ks, s, xyz, V = sources()
+    points = np.c_[np.random.RandomState(1).rand(7, 2), np.linspace(.5, 3., 7)]
+    P = calculate_receiver_pressure_np(ks, 1.2, 343., s, xyz, V, points, max_memory=2 ** 10)
+    for i, k in enumerate(ks):
+        for j, x in enumerate(points):
+            r = np.linalg.norm(xyz - x, axis=1)
+            p = 1.2 * 343. * 1j * k / 2 / np.pi * np.sum(s * V[i] * np.exp(-1j * k * r) / r)
+            assert np.isclose(P[i, j], p, rtol=1e-12, atol=0)
+
+
+def test_far_field_pressure_matches_rayleigh_sum():
+    ks, s, xyz, V = sources()
+    U = fibonacci_directions(12, hemisphere=True)
+    assert np.allclose(np.linalg.norm(U, axis=1), 1.)
+    P = calculate_far_field_pressure_np(ks, 1.2, 343., s, xyz, V, U, distance=10.)
+    for i, k in enumerate(ks):
+        for j, u in enumerate(U):
+            r = 10. - np.dot(xyz, u)
+            p = 1.2 * 343. * 1j * k / 2 / np.pi * np.sum(s * V[i] * np.exp(-1j * k * r)) / 10.
+            assert np.isclose(P[i, j], p, rtol=1e-12, atol=0)
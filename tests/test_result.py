@@ -0,0 +1,49 @@
+import pickle
+
+import numpy as np
+
+from compas_vibro.structure.result import Result
+
+
+def harmonic_result(value):
+    r = Result(100., type='harmonic')
+    r.displacements = {nk: {'real': {'x': value, 'y': 0., 'z': 0.}, 'imag': {'x': 0., 'y': 0., 'z': value}}
+                       for nk in range(4)}
+    return r
+
+
+def test_velocity_array_follows_displacements():
+    r = harmonic_result(1.)
+    v = r.velocity_array()
+    assert np.allclose(v, 2 * np.pi * 100. * 1j * (1. + 1j))
+
+    r.displacements = harmonic_result(2.).displacements
+    assert np.allclose(r.velocity_array(), 2 * v)
+
+    r.displacements[0]['real']['x'] = 3.
+    r.displacements_changed()
+    assert np.isclose(r.velocity_array()[0], 2 * np.pi * 100. * 1j * (3. + 2j))
+
+
+def test_result_pickle_drops_arrays():
+    r = harmonic_result(1.)
+    r.velocity_array()
+    r_ = pickle.loads(pickle.dumps(r))
+    assert '_arrays' not in r_.__dict__
+    assert np.allclose(r_.velocity_array(), r.velocity_array())
+
+
+def test_node_velocity_array_matches_each_result(structure):
+    from compas_vibro.structure.result import node_velocity_array
+
+    results = [structure.results['harmonic'][rk] for rk in sorted(structure.results['harmonic'])]
+    nkeys = sorted(structure.nodes)
+    V = node_velocity_array(results, nkeys)
+    for result, v in zip(results, V):
+        result.compute_node_velocities()
+        for nk, vn in zip(nkeys, v):
+            re = result.displacements[nk]['real']
+            im = result.displacements[nk]['imag']
+            x = np.linalg.norm([re['x'], re['y'], re['z']]) + 1j * np.linalg.norm([im['x'], im['y'], im['z']])
+            assert np.isclose(vn, 2 * np.pi * result.frequency * x * 1j, rtol=1e-12, atol=0)
+            assert result.velocities[nk] == vn
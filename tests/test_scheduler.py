@@ -0,0 +1,50 @@
+import os
+
+import numpy as np
+import pytest
+
+from compas_vibro.fea.utilities import scheduler
+from compas_vibro.fea.utilities.scheduler import job_workers
+from compas_vibro.fea.utilities.scheduler import run_jobs
+
+
+@pytest.mark.parametrize('pool', ['process', 'thread'])
+def test_jobs_keep_their_order(pool):
+    jobs = [('{}'.format(i), 16) for i in range(6)]
+    assert run_jobs(int, jobs, workers=3, pool=pool, output=False) == list(range(6))
+
+
+@pytest.mark.parametrize('workers, pool', [(1, 'process'), (2, 'process'), (2, 'thread')])
+def test_failing_job_raises_its_error(workers, pool):
+    with pytest.raises(ValueError, match='not_a_number'):
+        run_jobs(int, [('1',), ('not_a_number',), ('3',)], workers=workers, pool=pool, output=False)
+
+
+def test_job_workers_limits(monkeypatch):
+    monkeypatch.setattr(scheduler, 'cpu_count', lambda: 16)
+    assert job_workers() == 16
+    assert job_workers(cpus_per_job=4) == 4
+    assert job_workers(workers=2, cpus_per_job=4) == 2
+    assert job_workers(cpus_per_job=4, licenses=3) == 3
+    assert job_workers(cpus_per_job=32) == 1
+
+
+def test_concurrent_mobility_matches_serial(structure, fake_ansys, monkeypatch):
+    from compas_vibro.vibro.mobility import compute_mobility_matrices
+
+    monkeypatch.setattr(scheduler, 'cpu_count', lambda: 8)
+    freq_list = [20., 40., 60.]
+    mob_mats = compute_mobility_matrices(structure, freq_list, 0, 0, 1., exe=fake_ansys)
+    mob_jobs = compute_mobility_matrices(structure, freq_list, 0, 0, 1., exe=fake_ansys, workers=2)
+    assert np.allclose(np.array(mob_jobs), np.array(mob_mats), rtol=1e-12, atol=0)
+    assert not os.path.exists(os.path.join(structure.path, '{}_jobs'.format(structure.name)))
+
+
+def test_concurrent_mobility_raises_failing_job(structure, monkeypatch):
+    from compas_vibro.vibro.mobility import compute_mobility_matrices
+
+    monkeypatch.setattr(scheduler, 'cpu_count', lambda: 8)
+    exe = os.path.join(structure.path, 'missing_ansys.py')
+    with pytest.raises(OSError, match='missing_ansys'):
+        compute_mobility_matrices(structure, [20.], 0, 0, 1., exe=exe, workers=2)
+    assert not os.path.exists(os.path.join(structure.path, '{}_jobs'.format(structure.name)))
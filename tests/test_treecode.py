@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+from compas_vibro.vibro.rayleigh import calculate_pressure_batch_np
+from compas_vibro.vibro.treecode import TreeCode
+from compas_vibro.vibro.treecode import calculate_pressure_treecode_np
+from compas_vibro.vibro.utilities import calculate_distance_matrix_np
+
+
+def strip(n=600, seed=0):
+    """Unstructured faces on a 30 x 1 m strip, long enough for far clusters."""
+    rnd = np.random.RandomState(seed)
+    xyz = np.c_[rnd.rand(n) * 30., rnd.rand(n), np.zeros(n)]
+    s = rnd.rand(n) * .03 + .01
+    V = rnd.normal(size=(3, n)) + 1j * rnd.normal(size=(3, n))
+    return s, xyz, V
+
+
+@pytest.mark.parametrize('tol', [1e-3, 1e-4, 1e-6])
+@pytest.mark.parametrize('leaf_size', [8, 32])
+def test_treecode_far_field_within_tolerance(leaf_size, tol):
+    s, xyz, V = strip()
+    ks = np.array([.5, 1., 2.])
+    assert TreeCode(xyz, np.max(ks), tol=tol, leaf_size=leaf_size).far
+
+    P = calculate_pressure_treecode_np(ks, 1.2, 343., s, xyz, V, tol=tol, leaf_size=leaf_size)
+    P_ = calculate_pressure_batch_np(ks, 1.2, 343., s, calculate_distance_matrix_np(xyz), V, anchor=None)
+    for p, p_ in zip(P, P_):
+        assert np.linalg.norm(p - p_) < tol * np.linalg.norm(p_)
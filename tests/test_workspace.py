@@ -0,0 +1,60 @@
+import numpy as np
+
+from compas_vibro.vibro.rayleigh import calculate_radiation_matrix_np
+from compas_vibro.vibro.rayleigh import calculate_radiation_matrix_berkhoff_np
+from compas_vibro.vibro.rayleigh import calculate_resistance_matrix_np
+from compas_vibro.vibro.utilities import calculate_distance_matrix_np
+from compas_vibro.vibro.utilities import make_area_matrix
+from compas_vibro.vibro.workspace import RadiationWorkspace
+from compas_vibro.vibro.workspace import green_function_np
+
+
+def geometry(n=30, seed=0):
+    rnd = np.random.RandomState(seed)
+    return rnd.rand(n) * .1 + .01, calculate_distance_matrix_np(rnd.rand(n, 3))
+
+
+def test_workspace_matches_radiation_kernels():
+    s, D = geometry()
+    S = make_area_matrix(s)
+    ws = RadiationWorkspace(1.2, 343., s, D)
+    for k in (.5, 2., 7.):
+        omega = k * 343.
+        Z = calculate_radiation_matrix_np(k, 1.2, 343., S, D)
+        assert np.allclose(ws.radiation_matrix(k), Z, rtol=1e-12, atol=0)
+        Z = calculate_radiation_matrix_berkhoff_np(k, 1.2, 343., S, D)
+        assert np.allclose(ws.radiation_matrix_berkhoff(k), Z, rtol=1e-12, atol=0)
+        R = calculate_resistance_matrix_np(k, omega, 1.2, 343., s, D)
+        assert np.allclose(ws.resistance_matrix(k, omega), R, rtol=1e-12, atol=0)
+
+
+def test_workspace_reuses_its_buffers():
+    s, D = geometry()
+    ws = RadiationWorkspace(1.2, 343., s, D)
+    assert ws.radiation_matrix(1.) is ws.radiation_matrix(2.)
+    assert ws.nbytes == ws.SD.nbytes + ws.Z.nbytes + ws.R.nbytes + ws.T.nbytes
+
+
+def test_green_function_fills_its_buffers():
+    s, D = geometry()
+    SD = s / D
+    ks = np.array([.5, 2., 7.])
+    G = np.empty((3,) + D.shape, dtype=complex)
+    T = np.empty((3,) + D.shape)
+    assert green_function_np(ks, D, SD, out=G, phase=T) is G
+    assert np.allclose(G, SD * np.exp(-1j * ks[:, None, None] * D), rtol=1e-12, atol=0)
+
+
+def test_mobility_radiation_matrices_match_radiation_kernel(structure):
+    from compas_vibro.vibro.mobility import compute_radiation_matrices
+
+    freq_list = [20., 100., 180.]
+    rad_mesh = structure.radiating_mesh()
+    rad_nks = structure.radiating_nodes()
+    S = make_area_matrix([rad_mesh.vertex_area(nk) for nk in rad_nks])
+    D = calculate_distance_matrix_np([structure.node_xyz(nk) for nk in rad_nks])
+    rms = compute_radiation_matrices(structure, freq_list)
+    assert rms[0] is not rms[1]
+    for f, Z in zip(freq_list, rms):
+        k = 2 * np.pi * f / structure.c
+        assert np.allclose(Z, calculate_radiation_matrix_np(k, structure.rho, structure.c, S, D), rtol=1e-12, atol=0)